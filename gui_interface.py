@@ -1,7 +1,7 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from restaurant_manager import RestaurantManager
+from restaurant_backend import create_manager
 import json
 
 class ModernTheme:
@@ -339,7 +339,7 @@ class RatingDialog:
         self.dialog.destroy()
 
 class RestaurantGUI:
-    def __init__(self, root):
+    def __init__(self, root, backend=None):
         self.root = root
         self.root.title("🍽️ Sabor Express - Gerenciamento de Restaurantes")
         self.root.geometry("1200x800")
@@ -355,14 +355,17 @@ class RestaurantGUI:
         self.theme_manager = ModernTheme()
         self.is_dark_mode = True
         
-        # Manager
-        self.manager = RestaurantManager()
+        # Manager (o progresso da carga aparece no título da janela)
+        self._load_percent = -1
+        self.manager = create_manager(backend, progress=self.on_load_progress, index_cache=True)
+        self.root.title("🍽️ Sabor Express - Gerenciamento de Restaurantes")
         
         # Variáveis de controle
         self.filter_category = tk.StringVar(value="Todas")
         self.filter_status = tk.StringVar(value="Todos")
         self.filter_favorite = tk.StringVar(value="Todos")
         self.search_var = tk.StringVar()
+        self.search_term = ""
         
         # Aplicar tema e criar interface
         self.apply_theme()
@@ -372,6 +375,18 @@ class RestaurantGUI:
         # Bindings
         self.search_var.trace('w', self.on_search_change)
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Alterações feitas por outro processo (ex.: o console) no mesmo arquivo
+        self.root.after(2000, self.check_external_changes)
+
+    def on_load_progress(self, bytes_read, total):
+        """Mostra o progresso da carga do arquivo de restaurantes"""
+        percent = bytes_read * 100 // total if total else 100
+        # Redesenha só quando a porcentagem muda
+        if percent != self._load_percent:
+            self._load_percent = percent
+            self.root.title(f"🍽️ Sabor Express - Carregando restaurantes... {percent}%")
+            self.root.update_idletasks()
 
     def get_current_colors(self):
         """Retorna as cores do tema atual"""
@@ -580,19 +595,16 @@ class RestaurantGUI:
                 bg=colors['bg_secondary'],
                 fg=colors['text_primary']).pack(anchor='w')
         
-        search_entry = tk.Entry(search_frame,
-                               textvariable=self.search_var,
-                               font=('Segoe UI', 9),
-                               bg=colors['bg_tertiary'],
-                               fg=colors['text_primary'],
-                               insertbackground=colors['text_primary'],
-                               relief='flat',
-                               bd=1,
-                               highlightthickness=1,
-                               highlightcolor=colors['accent_blue'],
-                               highlightbackground=colors['border_color'],
-                               width=20)
-        search_entry.pack(pady=(2, 0), ipady=2)
+        # Combobox editável: a lista traz as sugestões do autocompletar e a
+        # busca completa só roda com Enter ou ao escolher uma sugestão
+        self.search_combo = ttk.Combobox(search_frame,
+                                        textvariable=self.search_var,
+                                        values=[],
+                                        width=20,
+                                        font=('Segoe UI', 9))
+        self.search_combo.pack(pady=(2, 0))
+        self.search_combo.bind('<Return>', self.on_search_commit)
+        self.search_combo.bind('<<ComboboxSelected>>', self.on_search_commit)
 
     def create_restaurant_list(self, parent, colors):
         """Cria a lista de restaurantes"""
@@ -695,8 +707,10 @@ class RestaurantGUI:
             # Obter restaurantes filtrados
             restaurants = self.get_filtered_restaurants()
             
-            # Adicionar à lista
+            # Adicionar à lista (a consulta é percorrida sob demanda)
+            total = 0
             for restaurant in restaurants:
+                total += 1
                 # Status
                 status = "✅ Ativo" if restaurant['ativo'] else "❌ Inativo"
                 
@@ -726,40 +740,23 @@ class RestaurantGUI:
             self.category_combo['values'] = categories
             
             # Atualizar status
-            total = len(restaurants)
             self.status_var.set(f"Exibindo {total} restaurante{'s' if total != 1 else ''}")
             
         except Exception as e:
             self.status_var.set(f"Erro ao atualizar lista: {str(e)}")
 
     def get_filtered_restaurants(self):
-        """Retorna lista filtrada de restaurantes"""
-        restaurants = self.manager.get_all_restaurants()
-        
-        # Filtro por categoria
-        if self.filter_category.get() != "Todas":
-            restaurants = [r for r in restaurants if r['categoria'] == self.filter_category.get()]
-        
-        # Filtro por status
-        if self.filter_status.get() == "Ativos":
-            restaurants = [r for r in restaurants if r['ativo']]
-        elif self.filter_status.get() == "Inativos":
-            restaurants = [r for r in restaurants if not r['ativo']]
-        
-        # Filtro por favoritos
-        if self.filter_favorite.get() == "Favoritos":
-            restaurants = [r for r in restaurants if r.get('favorito', False)]
-        elif self.filter_favorite.get() == "Não Favoritos":
-            restaurants = [r for r in restaurants if not r.get('favorito', False)]
-        
-        # Filtro por busca
-        search_term = self.search_var.get().strip()
-        if search_term:
-            restaurants = [r for r in restaurants if 
-                          search_term.lower() in r['nome'].lower() or 
-                          search_term.lower() in r['categoria'].lower()]
-        
-        return restaurants
+        """Retorna a consulta com os filtros atuais (avaliada ao percorrer)"""
+        # Cada variável é lida uma vez; a combinação dos filtros é feita
+        # pelos índices do manager em uma única passada
+        status = {"Ativos": True, "Inativos": False}.get(self.filter_status.get())
+        favorite = {"Favoritos": True, "Não Favoritos": False}.get(self.filter_favorite.get())
+        
+        return (self.manager.query()
+                .category(self.filter_category.get())
+                .active(status)
+                .favorite(favorite)
+                .text(self.search_term, ignore_accents=True))
 
     def get_selected_restaurant_id(self):
         """Retorna o ID do restaurante selecionado"""
@@ -986,13 +983,38 @@ class RestaurantGUI:
         self.refresh_restaurant_list()
 
     def on_search_change(self, *args):
-        """Callback para mudança na busca"""
+        """Callback para mudança na busca: atualiza as sugestões"""
+        term = self.search_var.get().strip()
+        if not term:
+            # Campo limpo: volta a exibir a lista sem busca
+            self.on_search_commit()
+            return
+        
+        suggestions = self.manager.autocomplete(term)
+        self.search_combo['values'] = suggestions
+        if suggestions:
+            self.status_var.set(f"Sugestões: {', '.join(suggestions[:3])} (Enter para buscar)")
+        else:
+            self.status_var.set("Nenhuma sugestão (Enter para buscar)")
+
+    def on_search_commit(self, event=None):
+        """Callback para confirmar a busca (Enter ou sugestão escolhida)"""
+        self.search_term = self.search_var.get().strip()
         self.refresh_restaurant_list()
 
     def on_double_click(self, event):
         """Callback para duplo clique"""
         self.edit_restaurant()
 
+    def check_external_changes(self):
+        """Atualiza a lista quando outro processo altera o arquivo de dados"""
+        try:
+            if self.manager.refresh():
+                self.refresh_restaurant_list()
+                self.status_var.set("Lista atualizada com alterações de outra janela")
+        finally:
+            self.root.after(2000, self.check_external_changes)
+
     def on_closing(self):
         """Callback para fechamento da aplicação"""
         if messagebox.askokcancel("Sair", "Deseja realmente sair do sistema?"):
@@ -6,7 +6,7 @@ Alternativa à interface gráfica
 
 import os
 import sys
-from restaurant_manager import RestaurantManager
+from restaurant_backend import backend_from_args, create_manager
 
 def limpar_tela():
     """Limpa a tela do terminal"""
@@ -29,13 +29,14 @@ def exibir_menu():
     print("5. 🔄 Ativar/Desativar restaurante")
     print("6. 🗑️  Excluir restaurante")
     print("7. 📊 Estatísticas")
-    print("8. 🚪 Sair")
+    print("8. 📥 Importar restaurantes (CSV/JSONL)")
+    print("9. 🚪 Sair")
     print()
 
 def obter_opcao():
     """Obtém a opção escolhida pelo usuário"""
     try:
-        opcao = int(input("👉 Escolha uma opção (1-8): "))
+        opcao = int(input("👉 Escolha uma opção (1-9): "))
         return opcao
     except ValueError:
         return None
@@ -69,6 +70,39 @@ def cadastrar_restaurante(manager):
     
     pausar()
 
+def importar_restaurantes(manager):
+    """Importa restaurantes de um arquivo CSV ou JSONL"""
+    limpar_tela()
+    print("📥 IMPORTAR RESTAURANTES")
+    print("-" * 30)
+    print("Colunas: nome, categoria, telefone, email, endereco, cnpj")
+    
+    caminho = input("Arquivo (.csv ou .jsonl): ").strip()
+    if not caminho:
+        print("❌ Operação cancelada.")
+        pausar()
+        return
+    
+    def progresso(lidos, total):
+        if total:
+            print(f"\r⏳ Lendo arquivo... {lidos * 100 // total}%", end="", flush=True)
+    
+    resultado = manager.import_restaurants(caminho, progress=progresso)
+    print()
+    if resultado is None:
+        print("❌ Erro ao importar o arquivo!")
+        pausar()
+        return
+    
+    print(f"✅ Restaurantes importados: {resultado['importados']}")
+    print(f"⚠️  Linhas rejeitadas: {resultado['rejeitados']}")
+    for linha, erros in resultado['erros'][:20]:
+        print(f"   • Linha {linha}: {'; '.join(erros)}")
+    if resultado['rejeitados'] > 20:
+        print(f"   ... e mais {resultado['rejeitados'] - 20} linha(s)")
+    
+    pausar()
+
 def listar_restaurantes(manager):
     """Lista todos os restaurantes"""
     limpar_tela()
@@ -104,10 +138,15 @@ def buscar_restaurantes(manager):
         pausar()
         return
     
-    resultados = manager.search_restaurants(termo)
+    resultados = manager.search_restaurants(termo, ignore_accents=True)
     
     if not resultados:
         print(f"📭 Nenhum restaurante encontrado para '{termo}'")
+        
+        # Sugere nomes parecidos (erros de digitação)
+        parecidos = manager.fuzzy_search(termo)
+        if parecidos:
+            print("💡 Você quis dizer: " + ", ".join(r['nome'] for r in parecidos[:5]) + "?")
         pausar()
         return
     
@@ -228,6 +267,7 @@ def exibir_estatisticas(manager):
     print(f"📈 Total de restaurantes: {stats['total']}")
     print(f"✅ Restaurantes ativos: {stats['ativos']}")
     print(f"❌ Restaurantes inativos: {stats['inativos']}")
+    print(f"⭐ Restaurantes favoritos: {stats['favoritos']}")
     
     if stats['categorias']:
         print("\n🏷️  DISTRIBUIÇÃO POR CATEGORIA:")
@@ -241,7 +281,12 @@ def exibir_estatisticas(manager):
 
 def main():
     """Função principal da aplicação console"""
-    manager = RestaurantManager()
+    # Backend: --backend sqlite ou variável SABOR_EXPRESS_BACKEND (padrão: JSON)
+    try:
+        manager = create_manager(backend_from_args(sys.argv[1:]), index_cache=True)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
     
     while True:
         limpar_tela()
@@ -265,13 +310,15 @@ def main():
         elif opcao == 7:
             exibir_estatisticas(manager)
         elif opcao == 8:
+            importar_restaurantes(manager)
+        elif opcao == 9:
             limpar_tela()
             print("👋 Obrigado por usar o Sabor Express!")
             print("🍽️  Até logo!")
             break
         else:
             limpar_tela()
-            print("❌ Opção inválida! Escolha um número entre 1 e 8.")
+            print("❌ Opção inválida! Escolha um número entre 1 e 9.")
             pausar()
 
 if __name__ == "__main__":
@@ -15,6 +15,7 @@ def main():
     try:
         # Importar a interface GUI
         from gui_interface import RestaurantGUI
+        from restaurant_backend import backend_from_args
         
         # Criar janela principal
         root = tk.Tk()
@@ -35,7 +36,8 @@ def main():
         root.geometry(f"{window_width}x{window_height}+{x}+{y}")
         
         # Inicializar aplicação
-        app = RestaurantGUI(root)
+        # Backend: --backend sqlite ou variável SABOR_EXPRESS_BACKEND (padrão: JSON)
+        app = RestaurantGUI(root, backend_from_args(sys.argv[1:]))
         
         # Iniciar loop principal
         root.mainloop()
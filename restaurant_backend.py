@@ -0,0 +1,42 @@
+"""
+Escolha do backend de armazenamento (arquivo JSON ou banco SQLite)
+"""
+
+import os
+from typing import Callable, List, Optional
+
+from restaurant_manager import RestaurantManager
+
+# Variável de ambiente consultada quando o backend não é informado
+BACKEND_ENV = 'SABOR_EXPRESS_BACKEND'
+BACKENDS = ('json', 'sqlite')
+
+
+def backend_from_args(argv: List[str]) -> Optional[str]:
+    """Backend pedido na linha de comando (--backend sqlite ou --backend=sqlite)"""
+    for i, arg in enumerate(argv):
+        if arg.startswith('--backend='):
+            return arg.split('=', 1)[1]
+        if arg == '--backend' and i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
+def create_manager(backend: Optional[str] = None,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   index_cache: bool = False):
+    """Cria o gerenciador de restaurantes do backend escolhido.
+
+    backend é 'json' (RestaurantManager, padrão) ou 'sqlite'
+    (SQLiteRestaurantManager, que na primeira execução importa o
+    restaurantes.json existente); sem ele, vale a variável de ambiente
+    SABOR_EXPRESS_BACKEND. progress e index_cache só se aplicam ao JSON.
+    """
+    backend = (backend or os.environ.get(BACKEND_ENV) or 'json').strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend} (use {' ou '.join(BACKENDS)})")
+    if backend == 'sqlite':
+        # Importado só aqui: o backend JSON não depende do sqlite3
+        from restaurant_sqlite import SQLiteRestaurantManager
+        return SQLiteRestaurantManager()
+    return RestaurantManager(progress=progress, index_cache=index_cache)
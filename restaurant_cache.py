@@ -0,0 +1,44 @@
+"""
+Cache em disco dos índices do RestaurantManager (partida a quente)
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Dict, Optional, Tuple
+
+CACHE_VERSION = 3
+
+
+def file_fingerprint(path: str) -> Tuple[int, int, str]:
+    """Tamanho, mtime e hash do conteúdo de um arquivo"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        stat = os.fstat(file.fileno())
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def load_cache(path: str, key: Dict) -> Optional[Dict]:
+    """Retorna o estado salvo se o cache existir e a chave conferir.
+
+    O arquivo tem dois pickles: o cabeçalho com a chave e o estado. Um cache
+    de outro arquivo ou versão é descartado sem ler o estado.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        header = pickle.load(file)
+        if header != dict(key, version=CACHE_VERSION):
+            return None
+        return pickle.load(file)
+
+
+def save_cache(path: str, key: Dict, state: Dict):
+    """Grava o estado com a chave que o valida"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        pickle.dump(dict(key, version=CACHE_VERSION), file, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
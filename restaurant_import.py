@@ -0,0 +1,107 @@
+"""
+Importação em lote de restaurantes a partir de arquivos CSV ou JSONL
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from restaurant_validation import validate_batch
+
+# Colunas (CSV) ou chaves (JSONL) lidas de cada linha
+IMPORT_FIELDS = ('nome', 'categoria', 'telefone', 'email', 'endereco', 'cnpj')
+INVALID_ROW = "Linha inválida"
+DUPLICATE_NAME = "Já existe um restaurante com este nome"
+# Linhas validadas de uma vez (validação vetorizada por bloco)
+VALIDATION_CHUNK = 10000
+# Intervalo, em bytes lidos, entre as chamadas de progresso
+PROGRESS_BYTES = 1 << 16
+
+# (número da linha no arquivo, registro normalizado, erros)
+Row = Tuple[int, Optional[Dict[str, str]], List[str]]
+
+
+def _lines(file: BinaryIO, progress: Optional[Callable[[int, int], None]], total: int) -> Iterator[str]:
+    """Linhas do arquivo decodificadas, com o progresso em bytes lidos"""
+    bytes_read = reported = 0
+    for number, raw in enumerate(file):
+        bytes_read += len(raw)
+        if progress is not None and bytes_read - reported >= PROGRESS_BYTES:
+            progress(bytes_read, total)
+            reported = bytes_read
+        # Planilhas costumam gravar o BOM no início do arquivo
+        yield raw.decode('utf-8-sig' if number == 0 else 'utf-8')
+    if progress is not None:
+        progress(bytes_read, total)
+
+
+def read_rows(path: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[int, object]]:
+    """Lê o arquivo linha a linha: (número da linha, dict de colunas).
+
+    Arquivos .csv precisam de cabeçalho; os demais são lidos como JSONL, um
+    objeto por linha. Uma linha de JSON inválido vem com None no lugar do dict.
+    """
+    total = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        lines = _lines(file, progress, total)
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(lines)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError:
+                    yield number, None
+
+
+def normalize(rows: Iterable[Tuple[int, object]]) -> Iterator[Row]:
+    """Mantém só os campos importados, como texto sem espaços nas pontas"""
+    for number, row in rows:
+        if not isinstance(row, dict):
+            yield number, None, [INVALID_ROW]
+            continue
+        record = {}
+        for field in IMPORT_FIELDS:
+            value = row.get(field)
+            if value is None:
+                value = ''
+            record[field] = (value if isinstance(value, str) else str(value)).strip()
+        yield number, record, []
+
+
+def validate(rows: Iterable[Row], chunk_size: int = VALIDATION_CHUNK) -> Iterator[Row]:
+    """Valida os registros em blocos, com as regras de validate_restaurant_data"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        records = [record for _, record, errors in chunk if not errors]
+        results = iter(validate_batch(
+            names=[record['nome'] for record in records],
+            categories=[record['categoria'] for record in records],
+            phones=[record['telefone'] for record in records],
+            emails=[record['email'] for record in records],
+            cnpjs=[record['cnpj'] for record in records],
+            workers=1))
+        for number, record, errors in chunk:
+            yield number, record, errors or next(results)
+
+
+def dedup(rows: Iterable[Row], exists: Callable[[str], bool]) -> Iterator[Row]:
+    """Rejeita nomes já cadastrados.
+
+    exists é consultado quando a linha chega a esta etapa; como as linhas
+    anteriores já foram incluídas, repetições dentro do arquivo também são
+    rejeitadas.
+    """
+    for number, record, errors in rows:
+        if not errors and exists(record['nome']):
+            errors = [DUPLICATE_NAME]
+        yield number, record, errors
@@ -0,0 +1,315 @@
+"""
+Índices auxiliares usados pelo RestaurantManager para acelerar buscas
+"""
+
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def fold_text(text: str) -> str:
+    """Normaliza um texto para comparação sem acentos e sem maiúsculas.
+
+    Cada etapa (lower, casefold, NFKD e remoção de marcas combinantes) atua
+    caractere a caractere, então se a é substring de b, fold_text(a) também
+    é substring de fold_text(b).
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower().casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+# Posições dos bits ligados em cada valor de byte (0-255)
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class Bitset:
+    """Conjunto de posições guardado em um bytearray (um bit por posição).
+
+    Ligar e desligar bits é O(1); para combinar filtros, as máscaras são
+    convertidas em int e combinadas com & em C, e iter_bits materializa o
+    resultado pulando os bytes zerados.
+    """
+
+    __slots__ = ('_bytes',)
+
+    def __init__(self):
+        self._bytes = bytearray()
+
+    def set(self, position: int):
+        """Liga o bit da posição"""
+        index = position >> 3
+        if index >= len(self._bytes):
+            self._bytes.extend(bytes(index - len(self._bytes) + 1))
+        self._bytes[index] |= 1 << (position & 7)
+
+    def clear(self, position: int):
+        """Desliga o bit da posição"""
+        index = position >> 3
+        if index < len(self._bytes):
+            self._bytes[index] &= ~(1 << (position & 7)) & 0xFF
+
+    def test(self, position: int) -> bool:
+        """Verifica se o bit da posição está ligado"""
+        index = position >> 3
+        return index < len(self._bytes) and bool(self._bytes[index] >> (position & 7) & 1)
+
+    def to_int(self) -> int:
+        """Máscara com os bits do conjunto (bit i = posição i)"""
+        return int.from_bytes(self._bytes, 'little')
+
+
+def iter_bits(mask: int) -> Iterable[int]:
+    """Posições dos bits ligados de uma máscara, em ordem crescente"""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+    for index, value in enumerate(data):
+        if value:
+            base = index << 3
+            for bit in _BYTE_BITS[value]:
+                yield base + bit
+
+
+class TrigramIndex:
+    """Índice invertido de trigramas para busca por substring.
+
+    Um termo com três ou mais caracteres só pode ser substring de um texto
+    que contenha todos os seus trigramas, então a interseção das listas de
+    ids de cada trigrama dá os candidatos, que depois são verificados.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        """Retorna o conjunto de trigramas de um texto"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, doc_id: int, texts: Iterable[str]):
+        """Indexa os textos de um documento"""
+        for trigram in set().union(*(self.trigrams(text) for text in texts)):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                postings = self._postings[trigram] = set()
+            postings.add(doc_id)
+
+    def remove(self, doc_id: int, texts: Iterable[str]):
+        """Remove um documento (os textos devem ser os mesmos indexados)"""
+        for trigram in set().union(*(self.trigrams(text) for text in texts)):
+            postings = self._postings.get(trigram)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[trigram]
+
+    def candidates(self, term: str) -> Optional[Set[int]]:
+        """Ids que podem conter o termo, ou None se o termo for curto demais"""
+        trigrams = self.trigrams(term)
+        if not trigrams:
+            return None
+
+        postings = []
+        for trigram in trigrams:
+            ids = self._postings.get(trigram)
+            if not ids:
+                return set()
+            postings.append(ids)
+
+        # Começa pela lista mais curta para reduzir o custo da interseção
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+
+class PrefixIndex:
+    """Array ordenado de chaves para autocompletar por prefixo.
+
+    Cada entrada é um par (chave normalizada, texto exibido); entradas
+    repetidas (várias lojas da mesma categoria) são contadas, e a entrada
+    só sai do array quando a contagem chega a zero. Entradas novas ficam em
+    uma lista à parte e são ordenadas de uma vez na próxima consulta, para
+    que inclusões em massa não desloquem o array a cada uma.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str]] = []
+        self._unsorted: List[Tuple[str, str]] = []
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def merge(self):
+        """Junta as entradas novas ao array ordenado.
+
+        Feito de qualquer forma na próxima consulta ou remoção; chamado antes
+        de o índice ser gravado, para que a cópia salva já esteja ordenada.
+        """
+        if self._unsorted:
+            self._entries.extend(self._unsorted)
+            self._entries.sort()
+            self._unsorted = []
+
+    def add(self, key: str, label: str):
+        """Inclui uma ocorrência de (chave, texto)"""
+        entry = (key, label)
+        count = self._counts.get(entry, 0)
+        if not count:
+            self._unsorted.append(entry)
+        self._counts[entry] = count + 1
+
+    def remove(self, key: str, label: str):
+        """Remove uma ocorrência de (chave, texto)"""
+        entry = (key, label)
+        count = self._counts.get(entry, 0)
+        if count > 1:
+            self._counts[entry] = count - 1
+        elif count == 1:
+            del self._counts[entry]
+            self.merge()
+            del self._entries[bisect_left(self._entries, entry)]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Textos cujas chaves começam com o prefixo, em ordem alfabética"""
+        self.merge()
+        results = []
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(results) < limit:
+            key, label = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            results.append(label)
+            i += 1
+        return results
+
+
+class RankingIndex:
+    """Restaurantes ordenados por pontuação, no total e por categoria.
+
+    Cada lista guarda pares (-pontuação, id) em ordem, então os K melhores
+    são os K primeiros: a atualização é uma busca binária mais o
+    deslocamento do array, e a consulta dos K melhores é O(K).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str, float]] = ()):
+        # Montagem em lote: uma ordenação por lista em vez de n inserções
+        self._entries: Dict[int, Tuple[str, Tuple[float, int]]] = {}
+        self._by_category: Dict[str, List[Tuple[float, int]]] = {}
+        for doc_id, category, score in entries:
+            entry = (-score, doc_id)
+            self._entries[doc_id] = (category, entry)
+            self._by_category.setdefault(category, []).append(entry)
+        self._all = sorted(entry for _, entry in self._entries.values())
+        for entries_list in self._by_category.values():
+            entries_list.sort()
+
+    def add(self, doc_id: int, category: str, score: float):
+        """Inclui (ou reposiciona) um restaurante"""
+        self.remove(doc_id)
+        entry = (-score, doc_id)
+        self._entries[doc_id] = (category, entry)
+        insort(self._all, entry)
+        insort(self._by_category.setdefault(category, []), entry)
+
+    def remove(self, doc_id: int):
+        """Remove um restaurante (ignora ids ausentes)"""
+        found = self._entries.pop(doc_id, None)
+        if found is None:
+            return
+        category, entry = found
+        del self._all[bisect_left(self._all, entry)]
+        entries_list = self._by_category[category]
+        del entries_list[bisect_left(entries_list, entry)]
+        if not entries_list:
+            del self._by_category[category]
+
+    def score(self, doc_id: int) -> Optional[float]:
+        """Pontuação atual de um restaurante"""
+        found = self._entries.get(doc_id)
+        return -found[1][0] if found is not None else None
+
+    def top(self, categories: Optional[Iterable[str]] = None) -> Iterator[int]:
+        """Ids em ordem decrescente de pontuação (empates por id).
+
+        Com categories, percorre só essas categorias, intercalando as listas
+        de cada uma (O(K log c) para os K primeiros).
+        """
+        if categories is None:
+            entries = self._all
+        else:
+            lists = [self._by_category[category] for category in categories
+                     if category in self._by_category]
+            entries = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+        return (doc_id for _, doc_id in entries)
+
+
+def edit_masks(pattern: str) -> Dict[str, int]:
+    """Máscara de cada caractere do texto (bit i ligado: pattern[i] é ele)"""
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | 1 << i
+    return masks
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None,
+                masks: Optional[Dict[str, int]] = None) -> int:
+    """Distância de edição entre dois textos.
+
+    Algoritmo de Myers: as diferenças entre células vizinhas de uma coluna
+    da matriz cabem em inteiros com um bit por caractere de a, então cada
+    caractere de b custa uma dezena de operações sobre inteiros. masks é
+    edit_masks(a), pré-calculado por quem compara a com muitos textos.
+    Com max_distance, o cálculo para assim que a distância certamente passa
+    do limite e retorna max_distance + 1.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if not a:
+        return len(b)
+    if masks is None:
+        masks = edit_masks(a)
+
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    # Bits de diferença +1/-1 entre linhas vizinhas da coluna atual; a
+    # distância acompanha a última linha
+    positive, negative, distance = full, 0, len(a)
+    remaining = len(b)
+    for char in b:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        up = negative | (full & ~(horizontal | positive))
+        down = positive & horizontal
+        if up & last:
+            distance += 1
+        elif down & last:
+            distance -= 1
+        up = (up << 1 | 1) & full
+        down = (down << 1) & full
+        positive = down | (full & ~(vertical | up))
+        negative = up & vertical
+        remaining -= 1
+        # Cada caractere restante de b reduz a distância em no máximo 1
+        if max_distance is not None and distance - remaining > max_distance:
+            return max_distance + 1
+    return distance
+
+
+def fuzzy_candidates(index: TrigramIndex, term: str, max_distance: int) -> Optional[Set[int]]:
+    """Ids cujos textos podem estar a até max_distance edições do termo.
+
+    Filtro de partição: cada edição altera no máximo um de max_distance + 1
+    pedaços do termo, então um texto próximo contém algum pedaço intacto, e
+    com ele todos os trigramas do pedaço. Retorna None se os pedaços forem
+    curtos demais para ter trigramas.
+    """
+    size = len(term) // (max_distance + 1)
+    if size < 3:
+        return None
+    result = set()
+    for i in range(max_distance + 1):
+        piece = term[i * size:(i + 1) * size] if i < max_distance else term[i * size:]
+        result |= index.candidates(piece)
+    return result
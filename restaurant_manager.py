@@ -1,259 +1,1375 @@
 
 import json
+import math
 import os
-import re
-from typing import List, Dict, Optional
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Callable, List, Dict, Mapping, Optional, Sequence
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem trava entre processos (a detecção de mudanças continua valendo)
+    fcntl = None
+
+from restaurant_cache import file_fingerprint, load_cache, save_cache
+from restaurant_import import dedup, normalize, read_rows, validate
+from restaurant_indexes import (Bitset, PrefixIndex, RankingIndex, TrigramIndex, edit_masks,
+                                fold_text, fuzzy_candidates, levenshtein)
+from restaurant_query import RestaurantQuery
+from restaurant_ratings import (EVENT, SEED, RatingSeries, RatingStore, collect_ratings, group_ratings,
+                                read_ratings)
+from restaurant_record import Restaurant
+from restaurant_snapshot import SnapshotReader, write_snapshot
+from restaurant_stream import iter_restaurants, read_header, write_restaurants
+from restaurant_validation import (CATEGORY_REQUIRED, INVALID_CNPJ, INVALID_EMAIL, INVALID_PHONE,
+                                   NAME_REQUIRED, validate_batch, validate_cnpj, validate_email,
+                                   validate_phone)
+
 class RestaurantManager:
-    def __init__(self, filename='restaurantes.json'):
+    # Estado derivado gravado no cache de índices (ver load_restaurants)
+    _CACHED_STATE = ('_restaurants', '_name_index', '_category_index', '_fold_keys',
+                     '_search_index', '_prefix_index', '_slots', '_slot_ids', '_free_slots',
+                     '_live_bits', '_active_bits', '_favorite_bits', '_category_bits',
+                     '_stats', 'next_id')
+    # Ranking bayesiano: peso (em avaliações) da média global usada como
+    # prior, e quanto a média global ou o tempo (fração da meia-vida)
+    # podem andar antes de o ranking ser remontado
+    RANKING_PRIOR_WEIGHT = 10
+    RANKING_PRIOR_TOLERANCE = 0.02
+    RANKING_DECAY_TOLERANCE = 0.02
+
+    def __init__(self, filename='restaurantes.json', journal: bool = False,
+                 compact_threshold: int = 500, compact: bool = False,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 binary_snapshot: bool = False, index_cache: bool = False,
+                 pretty: bool = False, ranking_half_life: Optional[float] = None):
         self.filename = filename
-        self.restaurants = []
+        # Modo compacto: registros guardados como Restaurant (__slots__)
+        # em vez de dicts, para catálogos grandes
+        self.compact = compact
+        # Restaurantes indexados por id; o dict mantém a ordem de inserção
+        # e permite busca e remoção em O(1). Os registros nunca são alterados
+        # no lugar (copy-on-write): cada alteração grava uma nova versão
+        self._restaurants = {}
+        # Visões somente leitura dos registros, entregues aos chamadores, e
+        # snapshot da lista completa, refeito só quando a geração muda
+        self._views = {}
+        self._snapshot = None
+        self.generation = 0
+        # Índice de nomes normalizados (casefold) -> quantidade de restaurantes
+        self._name_index = {}
+        # Índice invertido categoria -> ids e cache da lista ordenada de categorias
+        self._category_index = {}
+        self._sorted_categories = None
+        # Chaves de busca pré-calculadas (nome e categoria sem acentos) e
+        # índice de trigramas sobre elas para busca por substring (que
+        # também filtra os candidatos da busca aproximada)
+        self._fold_keys = {}
+        self._search_index = TrigramIndex()
+        # Nomes e categorias ordenados pela chave normalizada (autocompletar)
+        self._prefix_index = PrefixIndex()
+        # Bitmaps por posição (slot) para filtros combinados; slots de
+        # restaurantes removidos ficam vazios até a próxima compactação
+        self._reset_bitmaps()
+        # Agregados das estatísticas, atualizados a cada alteração
+        self._stats = self._empty_stats()
+        # Contador monotônico de ids, persistido no cabeçalho do arquivo
+        self.next_id = 1
         self.notifications = []
-        self.load_restaurants()
+        # Modo journal: alterações vão para um log append-only e são
+        # consolidadas no arquivo principal ao atingir compact_threshold
+        self.journal = journal
+        self.journal_filename = filename + '.journal'
+        # Snapshot binário do arquivo principal: dispensa o parse do JSON
+        # na carga e é regravado a cada salvamento
+        self.binary_snapshot = binary_snapshot
+        self.snapshot_filename = filename + '.snap'
+        # Cache dos índices já montados, validado pela impressão digital
+        # (tamanho, mtime e hash) do arquivo principal
+        self.index_cache = index_cache
+        self.cache_filename = filename + '.cache'
+        # Salvamento atômico: o arquivo anterior vira o backup (último estado
+        # válido); pretty=True grava o JSON indentado, para inspeção manual
+        self.backup_filename = filename + '.bak'
+        self.pretty = pretty
+        # Arquivo principal ilegível: é movido para .corrupt antes de qualquer
+        # gravação, para não ser sobrescrito nem virar backup
+        self.corrupt_filename = filename + '.corrupt'
+        self._file_valid = True
+        # Histórico de avaliações (log binário append-only); avaliacao e
+        # num_avaliacoes do registro são o resumo da série de cada restaurante
+        self.ratings = RatingStore(filename + '.ratings',
+                                   ranking_half_life * 86400 if ranking_half_life else None)
+        # Rankings (média bayesiana e, com ranking_half_life em dias, com
+        # decaimento), montados na primeira consulta e depois mantidos a
+        # cada alteração; a base é a média global e o instante usados
+        self._rankings = {}
+        self._ranking_basis = None
+        # Avaliações ainda não gravadas no log, já empacotadas (EVENT)
+        self._pending_ratings = bytearray()
+        self.compact_threshold = compact_threshold
+        self.journal_entries = 0
+        # Lotes (batch): pilha de snapshots para rollback e alterações pendentes
+        # (id -> 'insert', 'upsert' ou 'delete', ainda não gravadas)
+        self._batch_stack = []
+        self._pending = {}
+        # Vários processos podem usar o mesmo arquivo: as gravações são feitas
+        # sob uma trava (fcntl) e as leituras conferem se o arquivo mudou,
+        # comparando mtime/tamanho e a geração gravada no cabeçalho
+        self.lock_filename = filename + '.lock'
+        self._lock_file = None
+        self._lock_depth = 0
+        self._lock_error = None
+        self.file_generation = 0
+        self._journal_offset = 0
+        self._disk_token = None
+        self.load_restaurants(progress)
+
+    @property
+    def restaurants(self) -> Sequence[Mapping]:
+        """Restaurantes na ordem de cadastro (somente leitura)"""
+        return self.get_all_restaurants()
+
+    @restaurants.setter
+    def restaurants(self, restaurants: List[Mapping]):
+        self.next_id = max((r['id'] for r in restaurants if isinstance(r.get('id'), int)), default=0) + 1
+        seen = set()
+        records = []
+        for restaurant in restaurants:
+            # Registros sem id ou com id repetido recebem um novo id
+            if not isinstance(restaurant.get('id'), int) or restaurant['id'] in seen:
+                restaurant = dict(restaurant, id=self.next_id)
+                self.next_id += 1
+            seen.add(restaurant['id'])
+            records.append(self._make_record(restaurant))
+
+        # A ordem do catálogo é sempre a ordem dos ids (novos ids são sempre
+        # maiores), então os índices podem ordenar resultados apenas pelo id
+        records.sort(key=lambda r: r['id'])
+        self._restaurants = {r['id']: r for r in records}
+        self._rebuild_indexes()
+
+    @staticmethod
+    def _name_key(name: str) -> str:
+        """Chave normalizada usada para comparar nomes"""
+        return name.strip().casefold()
+
+    def _rebuild_indexes(self):
+        """Reconstrói todos os índices a partir dos restaurantes carregados"""
+        self._name_index = {}
+        self._category_index = {}
+        self._sorted_categories = None
+        self._fold_keys = {}
+        self._search_index = TrigramIndex()
+        self._prefix_index = PrefixIndex()
+        self._reset_bitmaps()
+        self._stats = self._empty_stats()
+        self._rankings = {}
+        for restaurant in self._restaurants.values():
+            self._index_restaurant(restaurant)
+        self._views = {rid: self._view(r) for rid, r in self._restaurants.items()}
+        self._new_generation()
+
+    def _make_record(self, data: Mapping) -> Mapping:
+        """Cria o registro interno na representação configurada"""
+        if self.compact and not isinstance(data, Restaurant):
+            return Restaurant(data)
+        return data
+
+    @staticmethod
+    def _view(restaurant: Mapping) -> Mapping:
+        """Visão somente leitura de um registro"""
+        # Restaurant já é somente leitura e não precisa de proxy
+        if isinstance(restaurant, Restaurant):
+            return restaurant
+        return MappingProxyType(restaurant)
+
+    def _new_generation(self):
+        """Marca o catálogo como alterado e descarta o snapshot anterior"""
+        self.generation += 1
+        self._snapshot = None
+
+    def _reset_bitmaps(self):
+        """Zera os slots e os bitmaps de filtros"""
+        self._slots = {}
+        self._slot_ids = []
+        self._free_slots = 0
+        self._live_bits = Bitset()
+        self._active_bits = Bitset()
+        self._favorite_bits = Bitset()
+        self._category_bits = {}
+
+    def _set_bits(self, restaurant: Dict, slot: int):
+        """Liga os bits de um restaurante nos bitmaps"""
+        self._live_bits.set(slot)
+        if restaurant['ativo']:
+            self._active_bits.set(slot)
+        if restaurant.get('favorito', False):
+            self._favorite_bits.set(slot)
+        bits = self._category_bits.get(restaurant['categoria'])
+        if bits is None:
+            bits = self._category_bits[restaurant['categoria']] = Bitset()
+        bits.set(slot)
+
+    def _compact_slots(self):
+        """Renumera os slots na ordem do catálogo, descartando os vazios"""
+        self._reset_bitmaps()
+        for slot, restaurant in enumerate(self._restaurants.values()):
+            self._slots[restaurant['id']] = slot
+            self._slot_ids.append(restaurant['id'])
+            self._set_bits(restaurant, slot)
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        """Agregados zerados das estatísticas"""
+        return {'total': 0, 'ativos': 0, 'favoritos': 0, 'num_avaliacoes': 0, 'soma_avaliacoes': 0.0}
+
+    def _count_restaurant(self, restaurant: Dict, sign: int):
+        """Soma (sign=1) ou subtrai (sign=-1) um restaurante dos agregados"""
+        num_avaliacoes = restaurant.get('num_avaliacoes', 0)
+        self._stats['total'] += sign
+        self._stats['ativos'] += sign * bool(restaurant['ativo'])
+        self._stats['favoritos'] += sign * bool(restaurant.get('favorito', False))
+        self._stats['num_avaliacoes'] += sign * num_avaliacoes
+        self._stats['soma_avaliacoes'] += sign * restaurant.get('avaliacao', 0.0) * num_avaliacoes
+
+    def _index_restaurant(self, restaurant: Dict):
+        """Inclui um restaurante nos índices"""
+        key = self._name_key(restaurant['nome'])
+        self._name_index[key] = self._name_index.get(key, 0) + 1
+
+        ids = self._category_index.get(restaurant['categoria'])
+        if ids is None:
+            ids = self._category_index[restaurant['categoria']] = set()
+            self._sorted_categories = None
+        ids.add(restaurant['id'])
+
+        keys = (fold_text(restaurant['nome']), fold_text(restaurant['categoria']))
+        self._fold_keys[restaurant['id']] = keys
+        self._search_index.add(restaurant['id'], keys)
+        self._prefix_index.add(keys[0], restaurant['nome'])
+        self._prefix_index.add(keys[1], restaurant['categoria'])
+
+        slot = self._slots.get(restaurant['id'])
+        if slot is None:
+            slot = self._slots[restaurant['id']] = len(self._slot_ids)
+            self._slot_ids.append(restaurant['id'])
+        self._set_bits(restaurant, slot)
+
+        self._count_restaurant(restaurant, 1)
+        for recent, ranking in self._rankings.items():
+            ranking.add(restaurant['id'], restaurant['categoria'], self._ranking_score(restaurant, recent))
+
+    def _unindex_restaurant(self, restaurant: Dict):
+        """Remove um restaurante dos índices"""
+        key = self._name_key(restaurant['nome'])
+        if self._name_index[key] == 1:
+            del self._name_index[key]
+        else:
+            self._name_index[key] -= 1
+
+        ids = self._category_index[restaurant['categoria']]
+        ids.discard(restaurant['id'])
+        if not ids:
+            del self._category_index[restaurant['categoria']]
+            self._sorted_categories = None
+
+        keys = self._fold_keys.pop(restaurant['id'])
+        self._search_index.remove(restaurant['id'], keys)
+        self._prefix_index.remove(keys[0], restaurant['nome'])
+        self._prefix_index.remove(keys[1], restaurant['categoria'])
 
-    def load_restaurants(self):
-        """Carrega restaurantes do arquivo JSON"""
+        slot = self._slots[restaurant['id']]
+        self._live_bits.clear(slot)
+        self._active_bits.clear(slot)
+        self._favorite_bits.clear(slot)
+        self._category_bits[restaurant['categoria']].clear(slot)
+        if restaurant['categoria'] not in self._category_index:
+            del self._category_bits[restaurant['categoria']]
+
+        self._count_restaurant(restaurant, -1)
+        for ranking in self._rankings.values():
+            ranking.remove(restaurant['id'])
+
+    def _store(self, restaurant: Dict):
+        """Insere ou substitui um restaurante mantendo os índices"""
+        previous = self._restaurants.get(restaurant['id'])
+        if previous is not None:
+            self._unindex_restaurant(previous)
+        self._restaurants[restaurant['id']] = restaurant
+        self._views[restaurant['id']] = self._view(restaurant)
+        self._index_restaurant(restaurant)
+        self.next_id = max(self.next_id, restaurant['id'] + 1)
+        self._new_generation()
+
+    def _discard(self, restaurant_id: int) -> Optional[Dict]:
+        """Remove um restaurante mantendo os índices"""
+        restaurant = self._restaurants.pop(restaurant_id, None)
+        if restaurant is not None:
+            del self._views[restaurant_id]
+            self._unindex_restaurant(restaurant)
+            self._new_generation()
+            # O slot fica vazio; compacta quando metade dos slots está vazia
+            self._slot_ids[self._slots.pop(restaurant_id)] = None
+            self._free_slots += 1
+            if self._free_slots > 64 and self._free_slots * 2 > len(self._slot_ids):
+                self._compact_slots()
+        return restaurant
+
+    def _update(self, restaurant: Mapping, changes: Dict) -> Mapping:
+        """Grava uma nova versão do restaurante com as alterações"""
+        # A versão anterior não é modificada: visões e snapshots já
+        # entregues continuam consistentes, e o rollback de lotes não
+        # precisa copiar os registros
+        updated = dict(restaurant)
+        updated.update(changes)
+        updated['data_atualizacao'] = datetime.now().isoformat()
+        updated = self._make_record(updated)
+        self._store(updated)
+        return updated
+
+    def load_restaurants(self, progress: Optional[Callable[[int, int], None]] = None):
+        """Carrega restaurantes do arquivo JSON.
+
+        O arquivo é lido em blocos, registro a registro (cada um já convertido
+        para a representação compacta, se ativa), e progress(bytes_lidos,
+        total) é chamado a cada bloco. Com index_cache, um cache válido
+        substitui a carga e a montagem dos índices.
+        """
+        with self._file_lock():
+            try:
+                cache_key = self._index_cache_key() if self.index_cache else None
+                if cache_key is None or not self._restore_index_cache(cache_key):
+                    self._load_file(progress)
+                    if cache_key is not None:
+                        self._save_index_cache(cache_key)
+            except Exception as e:
+                print(f"Erro ao carregar restaurantes: {e}")
+                # O arquivo principal está corrompido: não deve virar backup
+                # nem ser sobrescrito, já que pode ser a única cópia
+                self._file_valid = False
+                self._set_aside_invalid_file()
+                if not self._load_backup(progress):
+                    self.restaurants = []
+            self.file_generation = self._read_file_generation() or 0
+
+            # Um journal existente é sempre aplicado, mesmo fora do modo journal,
+            # para não perder alterações gravadas por outra instância
+            self.replay_journal()
+            self.ratings.reload()
+            self._seed_ratings()
+            self._rankings = {}
+            self._mark_synced()
+            if self.journal_entries and (not self.journal or
+                                         self.journal_entries >= self.compact_threshold):
+                self.compact_journal()
+
+    def _load_file(self, progress: Optional[Callable[[int, int], None]]):
+        """Carrega o arquivo principal (snapshot binário ou JSON) e monta os índices"""
+        snapshot = self._read_snapshot() if self.binary_snapshot else None
+        if snapshot is not None:
+            records, next_id = snapshot
+            self.restaurants = records
+            self.next_id = max(self.next_id, next_id)
+        elif os.path.exists(self.filename):
+            self._load_json(self.filename, progress)
+            if self.binary_snapshot:
+                # Snapshot ausente ou desatualizado: a próxima carga já o usa
+                self._write_snapshot()
+        elif not self._load_backup(progress):
+            self.restaurants = []
+
+    def _load_json(self, path: str, progress: Optional[Callable[[int, int], None]]):
+        """Lê um arquivo JSON registro a registro, conferindo o checksum"""
+        header = {}
+        with open(path, 'rb') as file:
+            total = os.fstat(file.fileno()).st_size
+            records = [self._make_record(restaurant) for restaurant
+                       in iter_restaurants(file, header, progress, total)]
+        self.restaurants = records
+        self.next_id = max(self.next_id, header.get('next_id', 1))
+
+    def _load_backup(self, progress: Optional[Callable[[int, int], None]]) -> bool:
+        """Carrega o backup quando o arquivo principal falta ou está corrompido"""
+        if not os.path.exists(self.backup_filename):
+            return False
         try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r', encoding='utf-8') as file:
-                    data = json.load(file)
-                    self.restaurants = data.get('restaurants', [])
-            else:
-                self.restaurants = []
+            self._load_json(self.backup_filename, progress)
         except Exception as e:
-            print(f"Erro ao carregar restaurantes: {e}")
-            self.restaurants = []
+            print(f"Erro ao carregar backup: {e}")
+            return False
+        print(f"Aviso: restaurantes carregados do backup {self.backup_filename}")
+        return True
+
+    def _index_cache_key(self) -> Optional[Dict]:
+        """Chave que valida o cache de índices (None se não há arquivo)"""
+        if not os.path.exists(self.filename):
+            return None
+        # A representação dos registros faz parte do estado em cache
+        return {'fingerprint': file_fingerprint(self.filename), 'compact': self.compact}
+
+    def _restore_index_cache(self, key: Dict) -> bool:
+        """Restaura registros e índices do cache, se ele for válido"""
+        try:
+            state = load_cache(self.cache_filename, key)
+        except Exception as e:
+            # Cache corrompido: é remontado a partir do arquivo
+            print(f"Erro ao ler cache de índices: {e}")
+            return False
+        if state is None:
+            return False
+
+        for name in self._CACHED_STATE:
+            setattr(self, name, state[name])
+        self._sorted_categories = None
+        self._rankings = {}
+        self._views = {rid: self._view(r) for rid, r in self._restaurants.items()}
+        self._new_generation()
+        return True
+
+    def _save_index_cache(self, key: Dict) -> bool:
+        """Grava registros e índices recém-montados no cache"""
+        # Trabalho adiado (inclusões ainda fora de ordem no índice de
+        # prefixos) é feito antes, para não ser repetido a cada partida
+        self._prefix_index.merge()
+        try:
+            save_cache(self.cache_filename, key,
+                       {name: getattr(self, name) for name in self._CACHED_STATE})
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar cache de índices: {e}")
+            return False
 
     def save_restaurants(self):
-        """Salva restaurantes no arquivo JSON"""
+        """Salva restaurantes no arquivo JSON.
+
+        A gravação é atômica: o JSON vai para um arquivo temporário, que é
+        sincronizado em disco e só então toma o lugar do principal. Uma queda
+        no meio nunca deixa o arquivo truncado; o arquivo anterior é mantido
+        como backup. O arquivo gravado inclui as entradas do journal, que é
+        então esvaziado.
+        """
+        temp_filename = self.filename + '.tmp'
+        with self._file_lock():
+            if not self._lock_held():
+                print(f"Erro ao salvar restaurantes: trava indisponível ({self._lock_error})")
+                return False
+            if not self._file_valid and not self._set_aside_invalid_file():
+                return False
+            # Entradas gravadas por outros processos entram antes, já que o
+            # journal é descartado depois
+            self._merge_external_changes()
+            try:
+                header = {
+                    'version': '1.0',
+                    'generation': self.file_generation + 1,
+                    'next_id': self.next_id,
+                    'last_updated': datetime.now().isoformat()
+                }
+                with open(temp_filename, 'wb', buffering=1 << 20) as file:
+                    write_restaurants(file, self._restaurants.values(), header, self.pretty)
+                    file.flush()
+                    os.fsync(file.fileno())
+
+                if self._file_valid and os.path.exists(self.filename):
+                    os.replace(self.filename, self.backup_filename)
+                os.replace(temp_filename, self.filename)
+                self._fsync_directory()
+                self._file_valid = True
+                self.file_generation += 1
+            except Exception as e:
+                print(f"Erro ao salvar restaurantes: {e}")
+                return False
+
+            # Mantido, o journal seria reaplicado sobre o arquivo novo e
+            # desfaria alterações posteriores a ele. Se a remoção falhar (ou
+            # não chegar a acontecer), as entradas são de uma geração anterior
+            # e o replay as ignora
+            try:
+                if os.path.exists(self.journal_filename):
+                    os.remove(self.journal_filename)
+            except OSError as e:
+                print(f"Aviso: journal não removido: {e}")
+            self.journal_entries = 0
+            self._mark_synced()
+
+            if self.binary_snapshot:
+                self._write_snapshot()
+        return True
+
+    def _set_aside_invalid_file(self) -> bool:
+        """Move o arquivo principal ilegível para .corrupt (requer a trava).
+
+        Se já houver um, o novo recebe a data no nome. Enquanto a troca não
+        der certo, o arquivo continua no lugar e os salvamentos são recusados.
+        """
+        if os.path.exists(self.filename):
+            target = self.corrupt_filename
+            if os.path.exists(target):
+                target += datetime.now().strftime('.%Y%m%d-%H%M%S-%f')
+            try:
+                os.replace(self.filename, target)
+            except OSError as e:
+                print(f"Erro ao preservar arquivo ilegível: {e}")
+                return False
+            print(f"Aviso: arquivo ilegível preservado em {target}")
+        self._file_valid = True
+        return True
+
+    @contextmanager
+    def _file_lock(self):
+        """Trava exclusiva (advisory) entre processos; reentrante na instância.
+
+        Se o arquivo de trava não puder ser aberto (diretório inexistente ou
+        sem permissão), o bloco roda sem a trava: leituras seguem, e as
+        gravações conferem _lock_held e falham.
+        """
+        if fcntl is None:
+            yield
+            return
+        if self._lock_depth == 0:
+            try:
+                self._lock_file = open(self.lock_filename, 'a')
+                self._lock_error = None
+            except OSError as e:
+                self._lock_error = e
+            else:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0 and self._lock_file is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _lock_held(self) -> bool:
+        """Se o bloco _file_lock atual obteve a trava (requerida para gravar)"""
+        return fcntl is None or self._lock_file is not None
+
+    def _disk_state(self) -> tuple:
+        """(mtime, tamanho) do arquivo principal e tamanhos do journal e do log de avaliações"""
+        try:
+            stat = os.stat(self.filename)
+            main = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            main = None
+        try:
+            journal_size = os.stat(self.journal_filename).st_size
+        except OSError:
+            journal_size = 0
+        try:
+            ratings_size = os.stat(self.ratings.filename).st_size
+        except OSError:
+            ratings_size = 0
+        return main, journal_size, ratings_size
+
+    def _mark_synced(self):
+        """Registra que a memória reflete o estado atual dos arquivos"""
+        self._disk_token = self._disk_state()
+        self._journal_offset = self._disk_token[1]
+
+    def _read_file_generation(self) -> Optional[int]:
+        """Geração gravada no cabeçalho do arquivo principal (None se ilegível)"""
+        try:
+            with open(self.filename, 'rb') as file:
+                return read_header(file).get('generation', 0)
+        except (OSError, ValueError):
+            return None
+
+    def refresh(self) -> bool:
+        """Aplica as alterações gravadas por outros processos.
+
+        Custa dois os.stat quando nada mudou; chamado no início das leituras
+        e alterações. Retorna True se algo foi recarregado.
+        """
+        if self._batch_stack or self._disk_state() == self._disk_token:
+            return False
+        with self._file_lock():
+            return self._merge_external_changes()
+
+    def _merge_external_changes(self) -> bool:
+        """Traz para a memória o que mudou nos arquivos (requer a trava)"""
+        state = self._disk_state()
+        if state == self._disk_token:
+            return False
+        try:
+            main, journal_size, ratings_size = state
+            if journal_size >= self._journal_offset and (
+                    main == self._disk_token[0] or
+                    self._read_file_generation() == self.file_generation):
+                # Arquivo principal igual: aplica só as entradas novas do journal
+                entries, self._journal_offset = self._read_journal(self._journal_offset)
+                self.journal_entries += len(entries)
+                self._apply_journal(entries)
+            else:
+                self._merge_reload()
+            self._restore_id_order()
+            if ratings_size < self.ratings.offset:
+                # Log de avaliações substituído: relê e reaplica as locais
+                self.ratings.reload(bytes(self._pending_ratings))
+                self._rankings = {}
+            else:
+                self._rerank(self.ratings.read())
+        except Exception as e:
+            print(f"Erro ao recarregar restaurantes: {e}")
+            # O arquivo ilegível não deve substituir o backup nem ser
+            # sobrescrito: o próximo salvamento o move para .corrupt
+            self._file_valid = False
+            return False
+        self._disk_token = self._disk_state()
+        return True
+
+    def _merge_reload(self):
+        """Relê arquivo principal e journal, aplicando só os registros que mudaram"""
+        header = {}
+        disk = {}
+        if os.path.exists(self.filename):
+            with open(self.filename, 'rb') as file:
+                for restaurant in iter_restaurants(file, header):
+                    disk[restaurant['id']] = restaurant
+        entries, self._journal_offset = self._read_journal(0, header.get('generation', 0))
+        self.journal_entries = len(entries)
+
+        next_id = header.get('next_id', 1)
+        for entry in entries:
+            if entry['op'] == 'upsert':
+                disk[entry['restaurant']['id']] = entry['restaurant']
+            elif entry['op'] == 'delete':
+                disk.pop(entry['id'], None)
+                next_id = max(next_id, entry['id'] + 1)
+        # Ids já usados por outros processos não podem ser reutilizados aqui
+        self.next_id = max(self.next_id, next_id, max(disk, default=0) + 1)
+        self.file_generation = header.get('generation', 0)
+
+        for restaurant_id in [rid for rid in self._restaurants if rid not in disk]:
+            self._apply_external(restaurant_id, None)
+        for restaurant_id, restaurant in disk.items():
+            self._apply_external(restaurant_id, restaurant)
+
+    def _apply_external(self, restaurant_id: int, restaurant: Optional[Dict]):
+        """Aplica a versão gravada em disco (None = removido) de um restaurante.
+
+        Alterações locais ainda não gravadas prevalecem; se outro processo
+        usou para um novo restaurante o mesmo id de uma inclusão local, a
+        inclusão local recebe um novo id.
+        """
+        op = self._pending.get(restaurant_id)
+        if op == 'insert' and restaurant is not None:
+            self._renumber(restaurant_id)
+        elif op is not None:
+            return
+
+        current = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            if current is not None:
+                self._discard(restaurant_id)
+        elif current is None or dict(current) != restaurant:
+            self._store(self._make_record(restaurant))
+
+    def _renumber(self, restaurant_id: int):
+        """Move uma inclusão local pendente para um id livre"""
+        restaurant = self._discard(restaurant_id)
+        del self._pending[restaurant_id]
+        new_id = max(self.next_id, restaurant_id + 1)
+        self._store(self._make_record(dict(restaurant, id=new_id)))
+        self._pending[new_id] = 'insert'
+
+    def _restore_id_order(self):
+        """Reordena o catálogo por id se a mesclagem inseriu ids fora de ordem"""
+        ids = list(self._restaurants)
+        if any(a > b for a, b in zip(ids, ids[1:])):
+            self._restaurants = dict(sorted(self._restaurants.items()))
+            self._rebuild_indexes()
+
+    def _fsync_directory(self):
+        """Sincroniza o diretório do arquivo, tornando as trocas de nome duráveis"""
+        if os.name == 'nt':
+            # Windows não permite abrir diretórios; os.replace já é durável lá
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.filename)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _read_snapshot(self) -> Optional[tuple]:
+        """Lê (registros, next_id) do snapshot binário, se corresponder ao JSON"""
+        if not os.path.exists(self.snapshot_filename):
+            return None
+        try:
+            with SnapshotReader(self.snapshot_filename) as reader:
+                if not reader.matches(self.filename):
+                    return None
+                return [self._make_record(restaurant) for restaurant in reader], reader.next_id
+        except Exception as e:
+            print(f"Erro ao ler snapshot: {e}")
+            return None
+
+    def _write_snapshot(self) -> bool:
+        """Regrava o snapshot binário a partir do estado atual"""
+        # Uma falha aqui não invalida o salvamento: o JSON continua sendo a
+        # fonte, e um snapshot desatualizado é ignorado na carga
+        try:
+            write_snapshot(self.snapshot_filename, self._restaurants.values(),
+                           self.next_id, os.stat(self.filename))
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar snapshot: {e}")
+            return False
+
+    def replay_journal(self):
+        """Aplica sobre o snapshot as operações registradas no journal"""
+        entries, self._journal_offset = self._read_journal(0)
+        self.journal_entries = len(entries)
+        self._apply_journal(entries)
+
+    def _read_journal(self, offset: int, generation: Optional[int] = None) -> tuple:
+        """Lê as entradas do journal a partir de offset; retorna (entradas, novo offset).
+
+        Entradas de uma geração anterior à do arquivo principal (generation,
+        por padrão a carregada) já estão nele e são ignoradas.
+        """
+        if generation is None:
+            generation = self.file_generation
+        entries = []
+        if not os.path.exists(self.journal_filename):
+            return entries, 0
+
+        with open(self.journal_filename, 'rb') as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # Última linha incompleta (queda durante a escrita); é
+                    # descartada na próxima gravação (ver _append_journal)
+                    print("Aviso: entrada incompleta no journal ignorada")
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = None
+                if not isinstance(entry, dict):
+                    print("Aviso: entrada inválida no journal ignorada")
+                elif entry.get('generation', generation) >= generation:
+                    entries.append(entry)
+        return entries, offset
+
+    @staticmethod
+    def _drop_torn_line(file):
+        """Corta o arquivo após a última quebra de linha (requer a trava).
+
+        Uma linha sem quebra no fim é o resto de uma gravação interrompida;
+        sem o corte, a próxima entrada seria colada a ela e se perderia.
+        """
+        end = file.seek(0, os.SEEK_END)
+        keep = end
+        while keep:
+            start = max(keep - 4096, 0)
+            file.seek(start)
+            block = file.read(keep - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            keep = start
+        if keep != end:
+            file.truncate(keep)
+
+    def _apply_journal(self, entries: List[Dict]):
+        """Aplica entradas do journal à memória"""
+        # Ids do journal, inclusive os removidos, não devem ser reutilizados
+        for entry in entries:
+            restaurant_id = entry['restaurant']['id'] if entry['op'] == 'upsert' else entry['id']
+            self.next_id = max(self.next_id, restaurant_id + 1)
+        for entry in entries:
+            if entry['op'] == 'upsert':
+                self._apply_external(entry['restaurant']['id'], entry['restaurant'])
+            elif entry['op'] == 'delete':
+                self._apply_external(entry['id'], None)
+
+    def compact_journal(self) -> bool:
+        """Consolida o journal no arquivo principal e o esvazia"""
+        # save_restaurants já mescla as entradas de outros processos e
+        # descarta o journal
+        return self.save_restaurants()
+
+    @contextmanager
+    def batch(self):
+        """Agrupa alterações em memória e persiste uma única vez ao final.
+
+        Se ocorrer uma exceção dentro do bloco, todas as alterações feitas
+        nele são desfeitas. Lotes aninhados são gravados pelo lote externo.
+        Se a gravação final falhar, levanta OSError; as alterações continuam
+        em memória e pendentes, e são gravadas na próxima alteração.
+        """
+        # Os registros são imutáveis, então basta copiar o dict de ids
+        self._batch_stack.append((dict(self._restaurants), dict(self._pending),
+                                  len(self._pending_ratings)))
         try:
-            data = {
-                'restaurants': self.restaurants,
-                'version': '1.0',
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.filename, 'w', encoding='utf-8') as file:
-                json.dump(data, file, ensure_ascii=False, indent=2)
+            yield self
+        except BaseException:
+            self._restaurants, self._pending, ratings_mark = self._batch_stack.pop()
+            self.ratings.rollback(bytes(self._pending_ratings[ratings_mark:]))
+            del self._pending_ratings[ratings_mark:]
+            self._rebuild_indexes()
+            raise
+        self._batch_stack.pop()
+        if not self._batch_stack and (self._pending or self._pending_ratings):
+            if not self._flush_pending():
+                raise OSError("não foi possível gravar as alterações do lote")
+
+    transaction = batch
+
+    def _flush_pending(self) -> bool:
+        """Grava as alterações pendentes (de uma operação ou de um lote)"""
+        with self._file_lock():
+            if not self._lock_held():
+                print(f"Erro ao gravar alterações: trava indisponível ({self._lock_error})")
+                return False
+            # Alterações de outros processos entram antes, para não serem
+            # sobrescritas; as pendentes locais prevalecem sobre elas
+            self._merge_external_changes()
+            # Sem as avaliações no log, os registros não podem levar os novos
+            # resumos: nada é gravado e tudo fica para a próxima tentativa
+            if self._pending_ratings and not self._flush_ratings():
+                return False
+            if not self._pending:
+                return True
+            if not self.journal:
+                saved = self.save_restaurants()
+            else:
+                # O estado final de cada id alterado decide entre upsert e
+                # delete; a geração do arquivo principal identifica as
+                # entradas já consolidadas nele
+                entries = [{'op': 'upsert', 'restaurant': self._restaurants[restaurant_id]}
+                           if restaurant_id in self._restaurants else {'op': 'delete', 'id': restaurant_id}
+                           for restaurant_id in self._pending]
+                for entry in entries:
+                    entry['generation'] = self.file_generation
+                saved = self._append_journal(entries)
+            # Só são descartadas depois de gravadas; numa falha, continuam
+            # pendentes e vão na próxima gravação
+            if saved:
+                self._pending = {}
+            return saved
+
+    def _flush_ratings(self) -> bool:
+        """Grava no log as avaliações pendentes (requer a trava)"""
+        events = bytes(self._pending_ratings)
+        # Avaliações de outros processos já entraram nas séries: o resumo
+        # gravado no registro sai da série completa
+        for restaurant_id in {event[0] for event in EVENT.iter_unpack(events)}:
+            restaurant = self._restaurants.get(restaurant_id)
+            series = self.ratings.get(restaurant_id)
+            if restaurant is not None and (restaurant.get('avaliacao') != series.mean or
+                                           restaurant.get('num_avaliacoes') != series.count):
+                self._update(restaurant, {'avaliacao': series.mean, 'num_avaliacoes': series.count})
+                self._pending.setdefault(restaurant_id, 'upsert')
+        try:
+            self.ratings.append(events)
+            self._pending_ratings = bytearray()
             return True
         except Exception as e:
-            print(f"Erro ao salvar restaurantes: {e}")
+            # Ficam pendentes e são gravadas na próxima alteração
+            print(f"Erro ao gravar avaliações: {e}")
             return False
 
+    def _seed_ratings(self):
+        """Registra no log as avaliações anteriores a ele (requer a trava).
+
+        Delas só se conhecem a quantidade e a média do registro: viram um
+        evento SEED com peso, que entra na média mas não no histórico.
+        """
+        seeds = []
+        for restaurant_id, restaurant in self._restaurants.items():
+            count = restaurant.get('num_avaliacoes') or 0
+            series = self.ratings.get(restaurant_id)
+            logged = series.count if series is not None else 0
+            if count > logged:
+                total = restaurant.get('avaliacao', 0.0) * count - (series.mean * logged if logged else 0.0)
+                seeds.append((restaurant_id, SEED, total / (count - logged), count - logged))
+        if not seeds:
+            return
+        for restaurant_id, timestamp, score, weight in seeds:
+            self.ratings.add(restaurant_id, score, timestamp, weight)
+        if not self._lock_held():
+            # Carga sem trava: as sementes ficam só na memória por ora
+            return
+        try:
+            self.ratings.append(b''.join(EVENT.pack(*seed) for seed in seeds))
+        except Exception as e:
+            print(f"Erro ao gravar avaliações: {e}")
+
+    def _persist(self, op: str, restaurant: Mapping) -> bool:
+        """Persiste uma alteração (journal ou reescrita completa do arquivo)"""
+        restaurant_id = restaurant['id']
+        if self._pending.get(restaurant_id) == 'insert':
+            # Inclusão ainda não gravada: continua inclusão, ou some se removida
+            if op == 'delete':
+                del self._pending[restaurant_id]
+        else:
+            self._pending[restaurant_id] = op
+
+        if self._batch_stack:
+            # Dentro de um lote só o estado final de cada id precisa ser gravado
+            return True
+        return self._flush_pending()
+
+    def _append_journal(self, entries: List[Dict]) -> bool:
+        """Acrescenta entradas ao journal, compactando ao atingir o limite"""
+        try:
+            with open(self.journal_filename, 'a+b') as file:
+                self._drop_torn_line(file)
+                file.write(''.join(json.dumps(entry, ensure_ascii=False, default=dict) + '\n'
+                                   for entry in entries).encode('utf-8'))
+                file.flush()
+                os.fsync(file.fileno())
+            self.journal_entries += len(entries)
+            self._mark_synced()
+        except Exception as e:
+            print(f"Erro ao gravar journal: {e}")
+            return False
+
+        if self.journal_entries >= self.compact_threshold:
+            # As entradas já estão gravadas; se a compactação falhar, ela é
+            # tentada de novo na próxima gravação
+            self.compact_journal()
+        return True
+
     def add_restaurant(self, name: str, category: str) -> bool:
         """Adiciona um novo restaurante"""
+        self.refresh()
         if self.restaurant_exists(name):
             return False
         
-        # Gera novo ID
-        max_id = max([r.get('id', 0) for r in self.restaurants], default=0)
-        new_id = max_id + 1
+        restaurant = self._new_record(name, category)
+        self._store(restaurant)
+        return self._persist('insert', restaurant)
 
-        restaurant = {
-            'id': new_id,
+    def _new_record(self, name: str, category: str, **fields: str) -> Mapping:
+        """Registro de um restaurante novo, com o próximo id"""
+        # Gera novo ID (contador monotônico: ids removidos não são reutilizados)
+        now = datetime.now().isoformat()
+        return self._make_record({
+            'id': self.next_id,
             'nome': name.strip(),
             'categoria': category.strip(),
             'ativo': True,
             'favorito': False,
             'avaliacao': 0.0,
             'num_avaliacoes': 0,
-            'telefone': '',
-            'email': '',
-            'endereco': '',
-            'cnpj': '',
-            'data_criacao': datetime.now().isoformat(),
-            'data_atualizacao': datetime.now().isoformat()
-        }
-        
-        self.restaurants.append(restaurant)
-        return self.save_restaurants()
+            'telefone': fields.get('telefone', ''),
+            'email': fields.get('email', ''),
+            'endereco': fields.get('endereco', ''),
+            'cnpj': fields.get('cnpj', ''),
+            'data_criacao': now,
+            'data_atualizacao': now
+        })
+
+    def import_restaurants(self, path: str, progress: Optional[Callable[[int, int], None]] = None,
+                           on_reject: Optional[Callable[[int, List[str]], None]] = None,
+                           max_reported: int = 1000) -> Optional[Dict]:
+        """Importa restaurantes de um arquivo CSV ou JSONL (ver restaurant_import).
+
+        As linhas passam uma a uma por leitura, normalização, validação e
+        checagem de nome repetido, e são incluídas em um único lote: o
+        arquivo é gravado uma vez ao final e, se a importação falhar, nada é
+        incluído. progress(bytes_lidos, total) acompanha a leitura;
+        on_reject(linha, erros) é chamado a cada linha rejeitada, e as
+        primeiras max_reported rejeições vêm também no retorno. Retorna None
+        se o arquivo não puder ser lido ou o lote não puder ser gravado (as
+        inclusões então ficam pendentes, como em batch).
+        """
+        self.refresh()
+        imported = rejected = 0
+        rejects = []
+        try:
+            with self.batch():
+                # Com muitas inclusões, remontar os rankings na próxima
+                # consulta sai mais barato que reposicioná-los a cada uma
+                self._rankings = {}
+                rows = dedup(validate(normalize(read_rows(path, progress))),
+                             lambda name: self._name_key(name) in self._name_index)
+                for number, record, errors in rows:
+                    if errors:
+                        rejected += 1
+                        if len(rejects) < max_reported:
+                            rejects.append((number, errors))
+                        if on_reject is not None:
+                            on_reject(number, errors)
+                        continue
+                    restaurant = self._new_record(record['nome'], record['categoria'],
+                                                  telefone=record['telefone'], email=record['email'],
+                                                  endereco=record['endereco'], cnpj=record['cnpj'])
+                    self._store(restaurant)
+                    self._persist('insert', restaurant)
+                    imported += 1
+        except Exception as e:
+            print(f"Erro ao importar restaurantes: {e}")
+            return None
+        return {'importados': imported, 'rejeitados': rejected, 'erros': rejects}
 
     def restaurant_exists(self, name: str) -> bool:
         """Verifica se um restaurante já existe"""
-        return any(r['nome'].lower() == name.lower().strip() for r in self.restaurants)
+        self.refresh()
+        return self._name_key(name) in self._name_index
+
+    def get_all_restaurants(self) -> Sequence[Mapping]:
+        """Retorna todos os restaurantes (tupla de visões somente leitura)"""
+        self.refresh()
+        # O snapshot é compartilhado entre as leituras da mesma geração
+        if self._snapshot is None:
+            self._snapshot = tuple(self._views.values())
+        return self._snapshot
 
-    def get_all_restaurants(self) -> List[Dict]:
-        """Retorna todos os restaurantes"""
-        return self.restaurants.copy()
+    def query(self) -> RestaurantQuery:
+        """Inicia uma consulta composta (ver RestaurantQuery)"""
+        self.refresh()
+        return RestaurantQuery(self)
 
-    def get_restaurants_by_category(self, category: str) -> List[Dict]:
+    def get_restaurants_by_category(self, category: str) -> Sequence[Mapping]:
         """Retorna restaurantes filtrados por categoria"""
-        if not category or category.lower() == 'todas':
-            return self.restaurants.copy()
-        return [r for r in self.restaurants if r['categoria'].lower() == category.lower()]
+        return self.query().category(category).all()
 
-    def get_restaurants_by_status(self, active_only: bool = None) -> List[Dict]:
+    def get_restaurants_by_status(self, active_only: bool = None) -> Sequence[Mapping]:
         """Retorna restaurantes filtrados por status"""
-        if active_only is None:
-            return self.restaurants.copy()
-        return [r for r in self.restaurants if r['ativo'] == active_only]
-
-    def search_restaurants(self, search_term: str) -> List[Dict]:
-        """Busca restaurantes por nome ou categoria"""
-        if not search_term:
-            return self.restaurants.copy()
-        
-        search_lower = search_term.lower()
-        return [r for r in self.restaurants if 
-                search_lower in r['nome'].lower() or 
-                search_lower in r['categoria'].lower()]
+        return self.query().active(active_only).all()
+
+    def search_restaurants(self, search_term: str, ignore_accents: bool = False) -> Sequence[Mapping]:
+        """Busca restaurantes por nome ou categoria.
+
+        Com ignore_accents=True a comparação ignora acentos ("acai" encontra
+        "Açaí"), usando as chaves normalizadas pré-calculadas.
+        """
+        return self.query().text(search_term, ignore_accents).all()
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugere nomes e categorias que começam com o prefixo (sem acentos)"""
+        self.refresh()
+        prefix = fold_text(prefix.strip())
+        if not prefix:
+            return []
+        return self._prefix_index.complete(prefix, limit)
+
+    def fuzzy_search(self, search_term: str, max_distance: int = 2) -> List[Mapping]:
+        """Busca restaurantes por nome tolerando erros de digitação.
+
+        Compara o termo com os nomes inteiros (sem acentos e maiúsculas) e
+        retorna os restaurantes ordenados pela distância de edição (e então
+        por nome e id). A distância só é calculada para os candidatos do
+        índice de trigramas; termos curtos demais para o filtro comparam
+        todos os nomes, descartando pelo comprimento os que não podem estar
+        no limite.
+        """
+        self.refresh()
+        term = fold_text(search_term.strip())
+        if not term:
+            return []
+
+        candidates = fuzzy_candidates(self._search_index, term, max_distance)
+        if candidates is None:
+            candidates = self._fold_keys
+        masks = edit_masks(term)
+        matches = []
+        for restaurant_id in candidates:
+            key = self._fold_keys[restaurant_id][0]
+            distance = levenshtein(term, key, max_distance, masks)
+            if distance <= max_distance:
+                matches.append((distance, key, restaurant_id))
+        matches.sort()
+        return [self._views[restaurant_id] for _, _, restaurant_id in matches]
+
+    def filter_restaurants(self, category: Optional[str] = None, active: Optional[bool] = None,
+                           favorite: Optional[bool] = None, search_term: str = "",
+                           ignore_accents: bool = False) -> Sequence[Mapping]:
+        """Combina os filtros de categoria, status, favorito e busca"""
+        return (self.query().category(category).active(active).favorite(favorite)
+                .text(search_term, ignore_accents).all())
 
     def update_restaurant(self, restaurant_id: int, name: str, category: str) -> bool:
         """Atualiza um restaurante existente"""
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                # Verifica se o novo nome já existe (exceto para o próprio restaurante)
-                if name.lower() != restaurant['nome'].lower() and self.restaurant_exists(name):
-                    return False
-                
-                restaurant['nome'] = name.strip()
-                restaurant['categoria'] = category.strip()
-                restaurant['data_atualizacao'] = datetime.now().isoformat()
-                return self.save_restaurants()
-        return False
-
-    def toggle_restaurant_status(self, restaurant_id: int) -> Optional[Dict]:
+        self.refresh()
+        restaurant = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            return False
+
+        # Verifica se o novo nome já existe (exceto para o próprio restaurante)
+        if self._name_key(name) != self._name_key(restaurant['nome']) and self.restaurant_exists(name):
+            return False
+
+        restaurant = self._update(restaurant, {'nome': name.strip(), 'categoria': category.strip()})
+        return self._persist('upsert', restaurant)
+
+    def toggle_restaurant_status(self, restaurant_id: int) -> Optional[Mapping]:
         """Alterna o status ativo/inativo de um restaurante"""
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                restaurant['ativo'] = not restaurant['ativo']
-                restaurant['data_atualizacao'] = datetime.now().isoformat()
-                if self.save_restaurants():
-                    return restaurant
+        self.refresh()
+        restaurant = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            return None
+
+        restaurant = self._update(restaurant, {'ativo': not restaurant['ativo']})
+        if self._persist('upsert', restaurant):
+            return self._views[restaurant_id]
         return None
 
     def delete_restaurant(self, restaurant_id: int) -> bool:
         """Remove um restaurante"""
-        for i, restaurant in enumerate(self.restaurants):
-            if restaurant.get('id') == restaurant_id:
-                self.restaurants.pop(i)
-                return self.save_restaurants()
-        return False
+        self.refresh()
+        restaurant = self._discard(restaurant_id)
+        if restaurant is None:
+            return False
+        return self._persist('delete', restaurant)
 
     def get_categories(self) -> List[str]:
         """Retorna todas as categorias únicas"""
-        categories = list(set(r['categoria'] for r in self.restaurants))
-        return sorted(categories)
+        self.refresh()
+        if self._sorted_categories is None:
+            self._sorted_categories = sorted(self._category_index)
+        return list(self._sorted_categories)
 
     def get_statistics(self) -> Dict:
         """Retorna estatísticas do sistema"""
-        total = len(self.restaurants)
-        active = sum(1 for r in self.restaurants if r['ativo'])
-        inactive = total - active
-        
+        self.refresh()
+        stats = self._stats
+        num_avaliacoes = stats['num_avaliacoes']
+
         # Distribuição por categoria
-        category_counts = {}
-        for restaurant in self.restaurants:
-            category = restaurant['categoria']
-            category_counts[category] = category_counts.get(category, 0) + 1
+        category_counts = {category: len(ids) for category, ids in self._category_index.items()}
 
         return {
-            'total': total,
-            'ativos': active,
-            'inativos': inactive,
-            'categorias': category_counts
+            'total': stats['total'],
+            'ativos': stats['ativos'],
+            'inativos': stats['total'] - stats['ativos'],
+            'favoritos': stats['favoritos'],
+            'categorias': category_counts,
+            'num_avaliacoes': num_avaliacoes,
+            'media_avaliacoes': stats['soma_avaliacoes'] / num_avaliacoes if num_avaliacoes else 0.0
         }
 
-    def get_restaurant_by_id(self, restaurant_id: int) -> Optional[Dict]:
-        """Retorna um restaurante específico pelo ID"""
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                return restaurant.copy()
-        return None
+    def check_statistics(self) -> bool:
+        """Recalcula os agregados do zero e os compara com os mantidos.
+
+        Se houver divergência, os agregados recalculados passam a valer e o
+        retorno é False.
+        """
+        incremental = self._stats
+        self._stats = self._empty_stats()
+        for restaurant in self._restaurants.values():
+            self._count_restaurant(restaurant, 1)
+
+        # A soma das notas é float e acumula arredondamento ao somar e subtrair
+        consistent = all(
+            math.isclose(incremental[key], value, rel_tol=1e-9, abs_tol=1e-6)
+            if key == 'soma_avaliacoes' else incremental[key] == value
+            for key, value in self._stats.items()
+        )
+        if not consistent:
+            print("Aviso: estatísticas divergentes foram recalculadas")
+        return consistent
+
+    def get_restaurant_by_id(self, restaurant_id: int) -> Optional[Mapping]:
+        """Retorna um restaurante específico pelo ID (visão somente leitura)"""
+        self.refresh()
+        return self._views.get(restaurant_id)
 
     def add_rating(self, restaurant_id: int, rating: float) -> bool:
         """Adiciona uma avaliação ao restaurante"""
         if not (0 <= rating <= 5):
             return False
             
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                # Inicializar campos de avaliação se não existirem
-                if 'avaliacao' not in restaurant:
-                    restaurant['avaliacao'] = 0.0
-                if 'num_avaliacoes' not in restaurant:
-                    restaurant['num_avaliacoes'] = 0
-                
-                # Calcular nova média
-                total_atual = restaurant['avaliacao'] * restaurant['num_avaliacoes']
-                restaurant['num_avaliacoes'] += 1
-                restaurant['avaliacao'] = (total_atual + rating) / restaurant['num_avaliacoes']
-                restaurant['data_atualizacao'] = datetime.now().isoformat()
-                
-                return self.save_restaurants()
-        return False
-
-    def toggle_favorite(self, restaurant_id: int) -> Optional[Dict]:
+        self.refresh()
+        restaurant = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            return False
+
+        # A nota entra no histórico; média e quantidade do registro são o
+        # resumo da série (Welford), sem refazer a soma de todas as notas
+        timestamp = time.time()
+        series = self.ratings.add(restaurant_id, float(rating), timestamp)
+        self._pending_ratings += EVENT.pack(restaurant_id, timestamp, float(rating), 1)
+        restaurant = self._update(restaurant, {'avaliacao': series.mean,
+                                               'num_avaliacoes': series.count})
+
+        return self._persist('upsert', restaurant)
+
+    def ingest_ratings(self, source) -> Optional[Dict]:
+        """Inclui avaliações em lote e persiste uma única vez.
+
+        source é o caminho de um arquivo CSV/JSONL ou um iterável de pares
+        (restaurant_id, nota) ou de dicts com essas chaves (restaurant_id,
+        score). As notas são validadas e agrupadas por restaurante de uma vez
+        (numpy, se disponível) e cada grupo entra nos agregados em um passo.
+        Retorna as quantidades de avaliações aceitas e rejeitadas e de
+        restaurantes avaliados, ou None se o arquivo não puder ser lido ou o
+        lote não puder ser gravado.
+        """
+        try:
+            rows = read_ratings(source) if isinstance(source, str) else source
+            ids, scores, rejected = collect_ratings(rows)
+        except Exception as e:
+            print(f"Erro ao importar avaliações: {e}")
+            return None
+
+        groups, invalid = group_ratings(ids, scores)
+        rejected += invalid
+        accepted = 0
+        rated = 0
+        timestamp = time.time()
+        self.refresh()
+        try:
+            with self.batch():
+                for group in groups:
+                    restaurant = self._restaurants.get(group.restaurant_id)
+                    if restaurant is None:
+                        rejected += group.count
+                        continue
+                    series = self.ratings.merge(group, timestamp)
+                    self._pending_ratings += group.events(timestamp)
+                    restaurant = self._update(restaurant, {'avaliacao': series.mean,
+                                                           'num_avaliacoes': series.count})
+                    self._persist('upsert', restaurant)
+                    accepted += group.count
+                    rated += 1
+        except OSError as e:
+            print(f"Erro ao importar avaliações: {e}")
+            return None
+        return {'aceitas': accepted, 'rejeitadas': rejected, 'restaurantes': rated}
+
+    def get_rating_stats(self, restaurant_id: int) -> Optional[Dict]:
+        """Estatísticas das avaliações de um restaurante (None se não existir).
+
+        Média, variância e desvio padrão incluem as avaliações anteriores ao
+        histórico; histograma (notas 0 a 5) e percentis usam só o histórico.
+        """
+        self.refresh()
+        if restaurant_id not in self._restaurants:
+            return None
+        series = self.ratings.get(restaurant_id) or RatingSeries()
+        return {
+            'num_avaliacoes': series.count,
+            'media': series.mean,
+            'variancia': series.variance,
+            'desvio_padrao': math.sqrt(series.variance),
+            'historico': len(series.scores),
+            'histograma': list(series.histogram),
+            'mediana': series.percentile(50),
+            'p90': series.percentile(90)
+        }
+
+    def _ranking_score(self, restaurant: Mapping, recent: bool) -> float:
+        """Média bayesiana: a média do restaurante puxada para a média global.
+
+        Com poucas avaliações o prior domina; com muitas, vale a média do
+        restaurante. Em recent, as notas pesam menos conforme envelhecem.
+        """
+        prior_mean, as_of = self._ranking_basis
+        if recent:
+            series = self.ratings.get(restaurant['id'])
+            mean, count = self.ratings.decayed(series, as_of) if series is not None else (0.0, 0.0)
+        else:
+            mean, count = restaurant.get('avaliacao', 0.0), restaurant.get('num_avaliacoes', 0)
+        return mean + self.RANKING_PRIOR_WEIGHT * (prior_mean - mean) / (self.RANKING_PRIOR_WEIGHT + count)
+
+    def _ranking(self, recent: bool) -> RankingIndex:
+        """Ranking atualizado, remontando-o se a base ficou defasada"""
+        num_avaliacoes = self._stats['num_avaliacoes']
+        prior_mean = self._stats['soma_avaliacoes'] / num_avaliacoes if num_avaliacoes else 0.0
+        now = time.time()
+        basis = self._ranking_basis
+        if (basis is None or abs(prior_mean - basis[0]) > self.RANKING_PRIOR_TOLERANCE or
+                (self.ratings.half_life is not None and
+                 now - basis[1] > self.ratings.half_life * self.RANKING_DECAY_TOLERANCE)):
+            self._ranking_basis = (prior_mean, now)
+            self._rankings = {}
+
+        ranking = self._rankings.get(recent)
+        if ranking is None:
+            ranking = self._rankings[recent] = RankingIndex(
+                (restaurant['id'], restaurant['categoria'], self._ranking_score(restaurant, recent))
+                for restaurant in self._restaurants.values())
+        return ranking
+
+    def _rerank(self, restaurant_ids):
+        """Recalcula a posição nos rankings de restaurantes com novas avaliações"""
+        for restaurant_id in restaurant_ids:
+            restaurant = self._restaurants.get(restaurant_id)
+            if restaurant is None:
+                continue
+            for recent, ranking in self._rankings.items():
+                ranking.add(restaurant_id, restaurant['categoria'], self._ranking_score(restaurant, recent))
+
+    def get_top_rated(self, category: Optional[str] = None, limit: int = 10,
+                      recent: bool = False, active_only: bool = True) -> List[Mapping]:
+        """Melhores restaurantes pela média bayesiana, no geral ou de uma categoria.
+
+        Um restaurante com uma única nota 5 não passa à frente de um com
+        média 4,8 em milhares de avaliações. recent=True usa as notas com
+        decaimento (requer ranking_half_life). O ranking é mantido a cada
+        alteração, então a consulta percorre só os primeiros da lista.
+        """
+        if recent and self.ratings.half_life is None:
+            raise ValueError("recent=True requer ranking_half_life")
+        self.refresh()
+        categories = None
+        if category and category.lower() != 'todas':
+            category_lower = category.lower()
+            categories = [name for name in self._category_index if name.lower() == category_lower]
+
+        results = []
+        for restaurant_id in self._ranking(recent).top(categories):
+            if len(results) >= limit:
+                break
+            restaurant = self._views[restaurant_id]
+            if active_only and not restaurant['ativo']:
+                continue
+            results.append(restaurant)
+        return results
+
+    def rating_percentile(self, restaurant_id: int, percent: float) -> Optional[float]:
+        """Percentil (0 a 100) das notas do histórico de um restaurante"""
+        self.refresh()
+        series = self.ratings.get(restaurant_id)
+        return series.percentile(percent) if series is not None else None
+
+    def get_rating_history(self, restaurant_id: int) -> List[tuple]:
+        """Avaliações registradas de um restaurante: (data ISO, nota), em ordem de chegada"""
+        self.refresh()
+        series = self.ratings.get(restaurant_id)
+        if series is None:
+            return []
+        return [(datetime.fromtimestamp(timestamp).isoformat(), score)
+                for timestamp, score in zip(series.timestamps, series.scores)]
+
+    def toggle_favorite(self, restaurant_id: int) -> Optional[Mapping]:
         """Alterna o status de favorito de um restaurante"""
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                restaurant['favorito'] = not restaurant.get('favorito', False)
-                restaurant['data_atualizacao'] = datetime.now().isoformat()
-                
-                if self.save_restaurants():
-                    return restaurant
-        return None
+        self.refresh()
+        restaurant = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            return None
 
-    def get_favorite_restaurants(self) -> List[Dict]:
-        """Retorna apenas os restaurantes favoritos"""
-        return [r for r in self.restaurants if r.get('favorito', False)]
+        restaurant = self._update(restaurant, {'favorito': not restaurant.get('favorito', False)})
 
-    @staticmethod
-    def validate_email(email: str) -> bool:
-        """Valida formato de email"""
-        if not email:
-            return True  # Email é opcional
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        if self._persist('upsert', restaurant):
+            return self._views[restaurant_id]
+        return None
 
-    @staticmethod
-    def validate_phone(phone: str) -> bool:
-        """Valida formato de telefone brasileiro"""
-        if not phone:
-            return True  # Telefone é opcional
-        # Remove caracteres não numéricos
-        digits = re.sub(r'\D', '', phone)
-        # Aceita formatos: (11) 99999-9999, 11999999999, etc.
-        return len(digits) >= 10 and len(digits) <= 11
+    def get_favorite_restaurants(self) -> Sequence[Mapping]:
+        """Retorna apenas os restaurantes favoritos"""
+        return self.query().favorite().all()
 
-    @staticmethod
-    def validate_cnpj(cnpj: str) -> bool:
-        """Valida CNPJ brasileiro"""
-        if not cnpj:
-            return True  # CNPJ é opcional
-        
-        # Remove caracteres não numéricos
-        cnpj = re.sub(r'\D', '', cnpj)
-        
-        # Verifica se tem 14 dígitos
-        if len(cnpj) != 14:
-            return False
-        
-        # Verifica se todos os dígitos são iguais
-        if len(set(cnpj)) == 1:
-            return False
-        
-        # Calcula os dígitos verificadores
-        def calculate_digit(cnpj_digits, weights):
-            total = sum(int(digit) * weight for digit, weight in zip(cnpj_digits, weights))
-            remainder = total % 11
-            return 0 if remainder < 2 else 11 - remainder
-        
-        # Pesos para cálculo
-        weights1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-        weights2 = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-        
-        # Verifica primeiro dígito
-        first_digit = calculate_digit(cnpj[:12], weights1)
-        if first_digit != int(cnpj[12]):
-            return False
-        
-        # Verifica segundo dígito
-        second_digit = calculate_digit(cnpj[:13], weights2)
-        if second_digit != int(cnpj[13]):
-            return False
-        
-        return True
+    # Validadores escalares e em lote (ver restaurant_validation)
+    validate_email = staticmethod(validate_email)
+    validate_phone = staticmethod(validate_phone)
+    validate_cnpj = staticmethod(validate_cnpj)
+    validate_batch = staticmethod(validate_batch)
 
     def validate_restaurant_data(self, name: str, category: str, 
                                phone: str = "", email: str = "", cnpj: str = "") -> tuple:
@@ -261,19 +1377,19 @@ class RestaurantManager:
         errors = []
         
         if not name or not name.strip():
-            errors.append("Nome é obrigatório")
+            errors.append(NAME_REQUIRED)
         
         if not category or not category.strip():
-            errors.append("Categoria é obrigatória")
+            errors.append(CATEGORY_REQUIRED)
         
         if phone and not self.validate_phone(phone):
-            errors.append("Telefone inválido. Use formato: (11) 99999-9999")
+            errors.append(INVALID_PHONE)
         
         if email and not self.validate_email(email):
-            errors.append("Email inválido")
+            errors.append(INVALID_EMAIL)
         
         if cnpj and not self.validate_cnpj(cnpj):
-            errors.append("CNPJ inválido")
+            errors.append(INVALID_CNPJ)
         
         return len(errors) == 0, errors
 
@@ -285,26 +1401,28 @@ class RestaurantManager:
         if not is_valid:
             return False, errors
         
-        for restaurant in self.restaurants:
-            if restaurant.get('id') == restaurant_id:
-                # Verifica se o novo nome já existe (exceto para o próprio restaurante)
-                if name.lower() != restaurant['nome'].lower() and self.restaurant_exists(name):
-                    return False, ["Já existe um restaurante com este nome"]
-                
-                restaurant['nome'] = name.strip()
-                restaurant['categoria'] = category.strip()
-                restaurant['telefone'] = phone.strip()
-                restaurant['email'] = email.strip()
-                restaurant['endereco'] = endereco.strip()
-                restaurant['cnpj'] = cnpj.strip()
-                restaurant['data_atualizacao'] = datetime.now().isoformat()
-                
-                if self.save_restaurants():
-                    return True, []
-                else:
-                    return False, ["Erro ao salvar dados"]
-        
-        return False, ["Restaurante não encontrado"]
+        self.refresh()
+        restaurant = self._restaurants.get(restaurant_id)
+        if restaurant is None:
+            return False, ["Restaurante não encontrado"]
+
+        # Verifica se o novo nome já existe (exceto para o próprio restaurante)
+        if self._name_key(name) != self._name_key(restaurant['nome']) and self.restaurant_exists(name):
+            return False, ["Já existe um restaurante com este nome"]
+
+        restaurant = self._update(restaurant, {
+            'nome': name.strip(),
+            'categoria': category.strip(),
+            'telefone': phone.strip(),
+            'email': email.strip(),
+            'endereco': endereco.strip(),
+            'cnpj': cnpj.strip()
+        })
+
+        if self._persist('upsert', restaurant):
+            return True, []
+        else:
+            return False, ["Erro ao salvar dados"]
 
     def add_notification(self, message: str, type: str = "info") -> None:
         """Adiciona uma notificação"""
@@ -0,0 +1,205 @@
+"""
+Consultas compostas sobre o RestaurantManager
+"""
+
+import heapq
+from itertools import islice
+from typing import Dict, Iterator, Mapping, Optional, Sequence
+
+from restaurant_indexes import fold_text, iter_bits
+
+
+class RestaurantQuery:
+    """Consulta encadeável, avaliada sob demanda em uma única passada.
+
+    Exemplo:
+        manager.query().category('Pizzaria').active().text('casa') \\
+               .order_by('avaliacao', descending=True).limit(10)
+
+    Os filtros de categoria, status e favorito usam os bitmaps do manager;
+    o texto usa o índice de trigramas. A fonte de candidatos é a mais
+    seletiva das duas, e os demais filtros são conferidos por registro.
+    """
+
+    def __init__(self, manager):
+        # A consulta lê os índices internos do manager diretamente
+        self._manager = manager
+        self._category = None
+        self._active = None
+        self._favorite = None
+        self._text = ""
+        self._ignore_accents = False
+        self._min_rating = None
+        self._order_field = None
+        self._descending = False
+        self._limit = None
+        self._offset = 0
+
+    def category(self, category: Optional[str]) -> 'RestaurantQuery':
+        """Filtra pela categoria (sem distinção de maiúsculas; 'Todas' ou None desativa)"""
+        self._category = category if category and category.lower() != 'todas' else None
+        return self
+
+    def active(self, active: Optional[bool] = True) -> 'RestaurantQuery':
+        """Filtra por ativos (True) ou inativos (False); None desativa"""
+        self._active = active
+        return self
+
+    def favorite(self, favorite: Optional[bool] = True) -> 'RestaurantQuery':
+        """Filtra por favoritos (True) ou não favoritos (False); None desativa"""
+        self._favorite = favorite
+        return self
+
+    def text(self, search_term: str, ignore_accents: bool = False) -> 'RestaurantQuery':
+        """Filtra por substring no nome ou na categoria"""
+        self._text = search_term or ""
+        self._ignore_accents = ignore_accents
+        return self
+
+    def min_rating(self, rating: Optional[float]) -> 'RestaurantQuery':
+        """Filtra pela avaliação média mínima"""
+        self._min_rating = rating
+        return self
+
+    def order_by(self, field: str, descending: bool = False) -> 'RestaurantQuery':
+        """Ordena pelo campo indicado (textos são comparados sem acentos)"""
+        self._order_field = field
+        self._descending = descending
+        return self
+
+    def limit(self, limit: Optional[int]) -> 'RestaurantQuery':
+        """Limita a quantidade de resultados"""
+        self._limit = limit
+        return self
+
+    def offset(self, offset: int) -> 'RestaurantQuery':
+        """Pula os primeiros resultados"""
+        self._offset = offset
+        return self
+
+    def _flag_bitsets(self) -> list:
+        """Pares (bitmap, valor esperado) dos filtros de status e favorito"""
+        manager = self._manager
+        flags = []
+        if self._active is not None:
+            flags.append((manager._active_bits, bool(self._active)))
+        if self._favorite is not None:
+            flags.append((manager._favorite_bits, bool(self._favorite)))
+        return flags
+
+    def _category_bitsets(self) -> Optional[list]:
+        """Bitmaps das categorias pedidas (None se não há filtro de categoria)"""
+        if self._category is None:
+            return None
+        category_lower = self._category.lower()
+        return [bits for name, bits in self._manager._category_bits.items()
+                if name.lower() == category_lower]
+
+    def _text_matcher(self):
+        """Função que confere o filtro de texto em um restaurante"""
+        if self._ignore_accents:
+            folded = fold_text(self._text)
+            fold_keys = self._manager._fold_keys
+            return lambda r: folded in fold_keys[r['id']][0] or folded in fold_keys[r['id']][1]
+        lower = self._text.lower()
+        return lambda r: lower in r['nome'].lower() or lower in r['categoria'].lower()
+
+    def _matches(self) -> Iterator[Mapping]:
+        """Restaurantes que passam pelos filtros, na ordem do catálogo"""
+        manager = self._manager
+        categories = self._category_bitsets()
+        flags = self._flag_bitsets()
+        if categories is not None and not categories:
+            return
+
+        mask = manager._live_bits.to_int()
+        if categories:
+            category_mask = 0
+            for bits in categories:
+                category_mask |= bits.to_int()
+            mask &= category_mask
+        for bits, value in flags:
+            mask &= bits.to_int() if value else ~bits.to_int()
+
+        candidates = None
+        if self._text:
+            # Os candidatos vêm do índice sobre as chaves normalizadas; como a
+            # normalização preserva substrings, também servem à busca exata
+            candidates = manager._search_index.candidates(fold_text(self._text))
+
+        if candidates is not None and len(candidates) < mask.bit_count():
+            # Poucos candidatos de texto: confere os bits de cada um
+            slots = manager._slots
+            source = (manager._views[restaurant_id] for restaurant_id in sorted(candidates)
+                      if (not categories or any(bits.test(slots[restaurant_id]) for bits in categories))
+                      and all(bits.test(slots[restaurant_id]) == value for bits, value in flags))
+        else:
+            slot_ids = manager._slot_ids
+            source = (manager._views[slot_ids[slot]] for slot in iter_bits(mask))
+
+        matches_text = self._text_matcher() if self._text else None
+        min_rating = self._min_rating
+        for restaurant in source:
+            if matches_text is not None and not matches_text(restaurant):
+                continue
+            if min_rating is not None and restaurant.get('avaliacao', 0.0) < min_rating:
+                continue
+            yield restaurant
+
+    def _sort_key(self, restaurant: Mapping):
+        """Chave de ordenação; valores ausentes vão para o fim"""
+        value = restaurant.get(self._order_field)
+        # Na ordem decrescente a chave inteira é invertida, então a marca de
+        # ausente também precisa ser, para continuar no fim
+        if value is None:
+            return (not self._descending, 0)
+        if isinstance(value, str):
+            value = fold_text(value)
+        return (self._descending, value)
+
+    def _unfiltered(self) -> bool:
+        """Verifica se a consulta devolve o catálogo inteiro, na ordem original"""
+        return (self._category is None and self._active is None and self._favorite is None
+                and not self._text and self._min_rating is None and self._order_field is None
+                and self._limit is None and not self._offset)
+
+    def __iter__(self) -> Iterator[Mapping]:
+        results = self._matches()
+        stop = self._offset + self._limit if self._limit is not None else None
+
+        if self._order_field is not None:
+            if stop is not None:
+                # Só os primeiros offset + limit importam: heap em vez de sort
+                select = heapq.nlargest if self._descending else heapq.nsmallest
+                results = iter(select(stop, results, key=self._sort_key))
+            else:
+                results = iter(sorted(results, key=self._sort_key, reverse=self._descending))
+
+        return islice(results, self._offset, stop)
+
+    def all(self) -> Sequence[Mapping]:
+        """Materializa os resultados (sem filtros, reusa o snapshot do manager)"""
+        if self._unfiltered():
+            return self._manager.get_all_restaurants()
+        return list(self)
+
+    def first(self) -> Optional[Mapping]:
+        """Primeiro resultado, ou None"""
+        return next(iter(self), None)
+
+    def count(self) -> int:
+        """Quantidade de resultados dos filtros (ignora limit e offset)"""
+        return sum(1 for _ in self._matches())
+
+    def page(self, number: int = 1, size: int = 20) -> Dict:
+        """Retorna uma página de resultados e o total de páginas"""
+        total = self.count()
+        self._offset = (max(number, 1) - 1) * size
+        self._limit = size
+        return {
+            'itens': list(self),
+            'pagina': max(number, 1),
+            'tamanho': size,
+            'total': total,
+            'paginas': (total + size - 1) // size
+        }
@@ -0,0 +1,364 @@
+"""
+Histórico de avaliações com agregados numericamente estáveis
+"""
+
+import csv
+import json
+import math
+import os
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+try:
+    import numpy
+except ImportError:
+    # Sem numpy o agrupamento em lote é feito em Python puro
+    numpy = None
+
+# id do restaurante, timestamp (epoch), nota e peso. Um evento com timestamp
+# SEED é uma "semente": avaliações anteriores ao log, das quais só se
+# conhecem a quantidade (o peso) e a média; os demais são avaliações, peso 1
+EVENT = struct.Struct('<qddI')
+SEED = 0.0
+HISTOGRAM_BINS = 6
+
+
+class RatingSeries:
+    """Avaliações de um restaurante: log em arrays e agregados de Welford.
+
+    Média e variância são atualizadas a cada nota pelo algoritmo de Welford
+    (ponderado, para as sementes), sem somas grandes que acumulam erro.
+    count, mean e variance são O(1); percentis ordenam as notas do log uma
+    vez e reaproveitam a ordenação até a próxima inclusão.
+    """
+
+    __slots__ = ('timestamps', 'scores', 'histogram', 'count', 'mean', '_m2',
+                 'seed_count', 'seed_mean', '_sorted', 'decayed_sum', 'decayed_weight')
+
+    def __init__(self):
+        self.timestamps = array('d')
+        self.scores = array('d')
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.seed_count = 0
+        self.seed_mean = 0.0
+        self._sorted = None
+        # Somas com decaimento exponencial (ver RatingStore.decayed)
+        self.decayed_sum = 0.0
+        self.decayed_weight = 0.0
+
+    def _combine(self, count: int, mean: float, m2: float):
+        """Junta aos agregados um grupo de notas (Chan et al.; com count=1 e
+        m2=0 é o passo de Welford)"""
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def add(self, score: float, timestamp: float, weight: int = 1):
+        """Inclui uma avaliação (ou uma semente, com timestamp SEED)"""
+        self._combine(weight, score, 0.0)
+        if timestamp != SEED:
+            self.timestamps.append(timestamp)
+            self.scores.append(score)
+            self.histogram[min(int(score), HISTOGRAM_BINS - 1)] += 1
+            self._sorted = None
+        else:
+            total = self.seed_count + weight
+            self.seed_mean += (score - self.seed_mean) * weight / total
+            self.seed_count = total
+
+    def truncate(self, length: int):
+        """Descarta as avaliações do log a partir de length e refaz os agregados"""
+        del self.timestamps[length:]
+        del self.scores[length:]
+        self.histogram = [0] * HISTOGRAM_BINS
+        self.count, self.mean, self._m2 = 0, 0.0, 0.0
+        self._sorted = None
+        if self.seed_count:
+            self._combine(self.seed_count, self.seed_mean, 0.0)
+        for score in self.scores:
+            self._combine(1, score, 0.0)
+            self.histogram[min(int(score), HISTOGRAM_BINS - 1)] += 1
+
+    def merge(self, group: 'RatingGroup', timestamp: float):
+        """Inclui de uma vez as notas de um grupo (ver group_ratings)"""
+        self._combine(group.count, group.mean, group.m2)
+        self.timestamps.extend(array('d', [timestamp]) * group.count)
+        self.scores.extend(group.scores)
+        for score_bin, count in enumerate(group.histogram):
+            self.histogram[score_bin] += count
+        self._sorted = None
+
+    @property
+    def variance(self) -> float:
+        """Variância populacional (as sementes contam como notas iguais à sua média)"""
+        return self._m2 / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Percentil das notas do log, com interpolação linear (None sem histórico)"""
+        if not self.scores:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.scores)
+        position = (len(self._sorted) - 1) * min(max(percent, 0.0), 100.0) / 100
+        lower = math.floor(position)
+        upper = min(lower + 1, len(self._sorted) - 1)
+        fraction = position - lower
+        return self._sorted[lower] + (self._sorted[upper] - self._sorted[lower]) * fraction
+
+
+class RatingStore:
+    """Séries de avaliações por restaurante, gravadas em um log binário append-only.
+
+    Os eventos trafegam empacotados (EVENT), tanto no log quanto nas
+    avaliações ainda não gravadas, para que lotes grandes não virem tuplas.
+
+    Com half_life (segundos), cada série acumula também as notas com peso
+    2 ** ((timestamp - origin) / half_life). Os pesos crescem com o tempo
+    em vez de decair, então não precisam ser refeitos: o decaimento visto
+    em um instante é só um fator comum a todos (ver decayed). As sementes,
+    sem data conhecida, ficam fora das somas com decaimento.
+    """
+
+    def __init__(self, filename: str, half_life: Optional[float] = None):
+        self.filename = filename
+        self._series: Dict[int, RatingSeries] = {}
+        # Bytes do log já aplicados à memória
+        self.offset = 0
+        self.half_life = half_life
+        self.origin = time.time()
+
+    def _decay_factor(self, timestamp: float) -> float:
+        return 2.0 ** ((timestamp - self.origin) / self.half_life)
+
+    def decayed(self, series: RatingSeries, as_of: float) -> Tuple[float, float]:
+        """Média e peso total das notas com decaimento, vistos no instante as_of"""
+        if not series.decayed_weight:
+            return 0.0, 0.0
+        return (series.decayed_sum / series.decayed_weight,
+                series.decayed_weight / self._decay_factor(as_of))
+
+    def get(self, restaurant_id: int) -> Optional[RatingSeries]:
+        """Série de um restaurante (None se nunca foi avaliado)"""
+        return self._series.get(restaurant_id)
+
+    def _series_for(self, restaurant_id: int) -> RatingSeries:
+        series = self._series.get(restaurant_id)
+        if series is None:
+            series = self._series[restaurant_id] = RatingSeries()
+        return series
+
+    def add(self, restaurant_id: int, score: float, timestamp: float, weight: int = 1) -> RatingSeries:
+        """Inclui uma avaliação na memória (a gravação é feita por append)"""
+        series = self._series_for(restaurant_id)
+        series.add(score, timestamp, weight)
+        if self.half_life is not None and timestamp != SEED:
+            factor = self._decay_factor(timestamp)
+            series.decayed_sum += factor * score
+            series.decayed_weight += factor
+        return series
+
+    def merge(self, group: 'RatingGroup', timestamp: float) -> RatingSeries:
+        """Inclui na memória as notas de um grupo, todas com o mesmo timestamp"""
+        series = self._series_for(group.restaurant_id)
+        series.merge(group, timestamp)
+        if self.half_life is not None:
+            factor = self._decay_factor(timestamp)
+            series.decayed_sum += factor * group.count * group.mean
+            series.decayed_weight += factor * group.count
+        return series
+
+    def apply(self, data: bytes) -> Set[int]:
+        """Inclui na memória eventos empacotados; retorna os ids afetados"""
+        touched = set()
+        for restaurant_id, timestamp, score, weight in EVENT.iter_unpack(data):
+            self.add(restaurant_id, score, timestamp, weight)
+            touched.add(restaurant_id)
+        return touched
+
+    def read(self) -> Set[int]:
+        """Aplica os eventos gravados no log depois do offset atual.
+
+        Retorna os ids dos restaurantes que receberam avaliações.
+        """
+        if not os.path.exists(self.filename):
+            return set()
+        with open(self.filename, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read()
+        # Um evento incompleto no fim (gravação em andamento) fica para depois
+        data = data[:len(data) - len(data) % EVENT.size]
+        touched = self.apply(data)
+        self.offset += len(data)
+        return touched
+
+    def reload(self, pending: bytes = b''):
+        """Relê o log inteiro e reaplica os eventos ainda não gravados"""
+        self._series = {}
+        self.offset = 0
+        self.read()
+        self.apply(pending)
+
+    def append(self, data: bytes):
+        """Grava eventos já aplicados à memória no fim do log (requer a trava)"""
+        with open(self.filename, 'a+b') as file:
+            # Um evento incompleto no fim é o resto de uma gravação
+            # interrompida; sem o corte, desalinharia todos os seguintes
+            end = file.seek(0, os.SEEK_END)
+            if end % EVENT.size:
+                file.truncate(end - end % EVENT.size)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+            self.offset = file.tell()
+
+    def rollback(self, data: bytes):
+        """Desfaz na memória eventos que não chegaram a ser gravados"""
+        removed: Dict[int, int] = {}
+        for restaurant_id, timestamp, _, _ in EVENT.iter_unpack(data):
+            if timestamp != SEED:
+                removed[restaurant_id] = removed.get(restaurant_id, 0) + 1
+        for restaurant_id, count in removed.items():
+            series = self._series[restaurant_id]
+            series.truncate(len(series.scores) - count)
+            if self.half_life is not None:
+                factors = [self._decay_factor(timestamp) for timestamp in series.timestamps]
+                series.decayed_sum = math.fsum(f * s for f, s in zip(factors, series.scores))
+                series.decayed_weight = math.fsum(factors)
+
+
+class RatingGroup:
+    """Notas de um restaurante em um lote, já agregadas"""
+
+    __slots__ = ('restaurant_id', 'count', 'mean', 'm2', 'histogram', 'scores')
+
+    def __init__(self, restaurant_id: int, count: int, mean: float, m2: float,
+                 histogram: List[int], scores: array):
+        self.restaurant_id = restaurant_id
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.histogram = histogram
+        self.scores = scores
+
+    def events(self, timestamp: float) -> bytes:
+        """Eventos do grupo empacotados para o log"""
+        return b''.join(EVENT.pack(self.restaurant_id, timestamp, score, 1) for score in self.scores)
+
+
+def collect_ratings(rows: Iterable) -> Tuple[array, array, int]:
+    """Converte as linhas em arrays paralelos de ids ('q') e notas ('d').
+
+    Cada linha é um par (restaurant_id, nota) ou um dict com as chaves
+    restaurant_id e score; retorna também a quantidade de linhas inválidas.
+    """
+    ids = array('q')
+    scores = array('d')
+    rejected = 0
+    for row in rows:
+        try:
+            if isinstance(row, Mapping):
+                restaurant_id, score = int(row['restaurant_id']), float(row['score'])
+            else:
+                restaurant_id, score = int(row[0]), float(row[1])
+            # Ids fora do intervalo de 64 bits geram OverflowError
+            ids.append(restaurant_id)
+        except (KeyError, IndexError, TypeError, ValueError, OverflowError):
+            rejected += 1
+            continue
+        scores.append(score)
+    return ids, scores, rejected
+
+
+def group_ratings(ids: array, scores: array) -> Tuple[List[RatingGroup], int]:
+    """Valida as notas (0 a 5) e agrupa por restaurante.
+
+    ids e scores são arrays paralelos ('q' e 'd'). Retorna os grupos, em
+    ordem de id, e a quantidade de notas rejeitadas.
+    Com numpy a validação e as somas por grupo são vetorizadas; a variância
+    de cada grupo é calculada em duas passadas (desvios da média do grupo).
+    """
+    if numpy is not None:
+        return _group_numpy(ids, scores)
+
+    grouped: Dict[int, array] = {}
+    rejected = 0
+    for restaurant_id, score in zip(ids, scores):
+        if 0 <= score <= 5:
+            values = grouped.get(restaurant_id)
+            if values is None:
+                values = grouped[restaurant_id] = array('d')
+            values.append(score)
+        else:
+            rejected += 1
+
+    groups = []
+    for restaurant_id in sorted(grouped):
+        values = grouped[restaurant_id]
+        mean = math.fsum(values) / len(values)
+        histogram = [0] * HISTOGRAM_BINS
+        for score in values:
+            histogram[min(int(score), HISTOGRAM_BINS - 1)] += 1
+        groups.append(RatingGroup(restaurant_id, len(values), mean,
+                                  math.fsum((score - mean) ** 2 for score in values),
+                                  histogram, values))
+    return groups, rejected
+
+
+def _group_numpy(ids: array, scores: array) -> Tuple[List[RatingGroup], int]:
+    """group_ratings vetorizado (os arrays são lidos sem cópia)"""
+    ids = numpy.frombuffer(ids, dtype=numpy.int64)
+    scores = numpy.frombuffer(scores, dtype=numpy.float64)
+    # Comparações com NaN são falsas: notas inválidas caem fora da máscara
+    valid = (scores >= 0) & (scores <= 5)
+    rejected = int(len(scores) - numpy.count_nonzero(valid))
+    ids, scores = ids[valid], scores[valid]
+    if not len(ids):
+        return [], rejected
+
+    # Ordenação estável: dentro de cada grupo as notas mantêm a ordem de chegada
+    order = numpy.argsort(ids, kind='stable')
+    ids, scores = ids[order], scores[order]
+    unique, starts, counts = numpy.unique(ids, return_index=True, return_counts=True)
+    means = numpy.add.reduceat(scores, starts) / counts
+    deviations = scores - numpy.repeat(means, counts)
+    m2 = numpy.add.reduceat(deviations * deviations, starts)
+    group_index = numpy.repeat(numpy.arange(len(unique)), counts)
+    bins = numpy.minimum(scores.astype(numpy.int64), HISTOGRAM_BINS - 1)
+    histograms = numpy.bincount(group_index * HISTOGRAM_BINS + bins,
+                                minlength=len(unique) * HISTOGRAM_BINS).reshape(-1, HISTOGRAM_BINS)
+
+    groups = []
+    for i, restaurant_id in enumerate(unique.tolist()):
+        start = int(starts[i])
+        values = array('d')
+        values.frombytes(scores[start:start + int(counts[i])].tobytes())
+        groups.append(RatingGroup(restaurant_id, int(counts[i]), float(means[i]), float(m2[i]),
+                                  histograms[i].tolist(), values))
+    return groups, rejected
+
+
+def read_ratings(path: str) -> Iterator[Optional[Dict]]:
+    """Lê avaliações de um arquivo CSV (com cabeçalho) ou JSONL.
+
+    Cada linha deve ter as colunas/chaves restaurant_id e score. Uma linha
+    de JSON inválido vem como None, para ser rejeitada sem interromper a
+    leitura (como em restaurant_import.read_rows).
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        if path.lower().endswith('.csv'):
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
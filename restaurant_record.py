@@ -0,0 +1,105 @@
+"""
+Representação compacta dos registros de restaurante
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Iterator, Union
+
+# Campos conhecidos, na ordem em que são gravados
+FIELDS = ('id', 'nome', 'categoria', 'ativo', 'favorito', 'avaliacao', 'num_avaliacoes',
+          'telefone', 'email', 'endereco', 'cnpj', 'data_criacao', 'data_atualizacao')
+TIMESTAMP_FIELDS = frozenset(('data_criacao', 'data_atualizacao'))
+_FIELD_SET = frozenset(FIELDS)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def timestamp_to_micros(value) -> Union[int, str]:
+    """Converte um timestamp ISO em microssegundos desde 1970.
+
+    Textos que não voltam idênticos pela conversão (fuso horário, outro
+    formato) são mantidos como estão.
+    """
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return value
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def micros_to_timestamp(value: Union[int, str]) -> str:
+    """Converte microssegundos desde 1970 de volta para o texto ISO"""
+    if not isinstance(value, int):
+        return value
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+class Restaurant(Mapping):
+    """Registro de restaurante com __slots__ em vez de um dict por registro.
+
+    Se comporta como um dict somente leitura (r['nome'], r.get, items,
+    dict(r), ==), então GUI, console e json não precisam saber qual
+    representação o manager usa. Os atributos também não podem ser
+    alterados: o manager entrega o próprio registro aos chamadores. Campos ausentes no registro original
+    continuam ausentes; timestamps ficam como inteiros (microssegundos) e
+    categorias são internadas, já que se repetem em muitos registros.
+    Campos desconhecidos vão para um dict à parte, criado só se necessário.
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data: Mapping):
+        extra = None
+        for key, value in data.items():
+            if key in TIMESTAMP_FIELDS:
+                value = timestamp_to_micros(value)
+            elif key == 'categoria' and isinstance(value, str):
+                value = sys.intern(value)
+            elif key not in _FIELD_SET:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, '_extra', extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Restaurant é somente leitura")
+
+    def __delattr__(self, name):
+        raise AttributeError("Restaurant é somente leitura")
+
+    def __setstate__(self, state):
+        # O pickle (cache de índices) restauraria os slots com setattr
+        _, slots = state
+        for name, value in slots.items():
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return micros_to_timestamp(value) if key in TIMESTAMP_FIELDS else value
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Restaurant({dict(self)!r})"
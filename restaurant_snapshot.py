@@ -0,0 +1,232 @@
+"""
+Snapshot binário do catálogo, lido via mmap
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, Mapping, Optional
+
+from restaurant_record import FIELDS
+
+MAGIC = b'SXSNAP01'
+VERSION = 2
+
+# magic, versão, reservado, registros, next_id, tamanho e mtime do JSON de
+# origem, quantidade de textos e o início de cada seção (registros,
+# posições dos textos e textos)
+HEADER = struct.Struct('<8sHHIqqqIQQQ')
+# id, campos presentes (bit i = FIELDS[i]), flags, avaliação, nº de
+# avaliações e índices na tabela de textos: nome, categoria, telefone,
+# email, endereço, cnpj, data_criacao, data_atualizacao e campos extras (JSON)
+RECORD = struct.Struct('<qHBdI9I')
+NO_STRING = 0xFFFFFFFF
+
+_ATIVO, _FAVORITO, _AVALIACAO_INT = 1, 2, 4
+_STRING_FIELDS = ('nome', 'categoria', 'telefone', 'email', 'endereco', 'cnpj',
+                  'data_criacao', 'data_atualizacao')
+_BIT = {field: 1 << i for i, field in enumerate(FIELDS)}
+_ALL_FIELDS = (1 << len(FIELDS)) - 1
+
+
+def _encode(restaurant: Mapping, string_ref) -> tuple:
+    """Converte um registro nos valores de uma linha da tabela"""
+    present = flags = 0
+    avaliacao, num_avaliacoes = 0.0, 0
+    refs = dict.fromkeys(_STRING_FIELDS, NO_STRING)
+    extra = {}
+    for key, value in restaurant.items():
+        # Valores fora do tipo esperado vão para os campos extras (JSON),
+        # para que a leitura devolva exatamente o registro gravado
+        if key == 'id' and type(value) is int:
+            present |= _BIT[key]
+        elif key in ('ativo', 'favorito') and type(value) is bool:
+            present |= _BIT[key]
+            if value:
+                flags |= _ATIVO if key == 'ativo' else _FAVORITO
+        elif key == 'avaliacao' and (type(value) is float or
+                                     (type(value) is int and float(value) == value)):
+            present |= _BIT[key]
+            avaliacao = float(value)
+            if type(value) is int:
+                flags |= _AVALIACAO_INT
+        elif key == 'num_avaliacoes' and type(value) is int and 0 <= value < 2 ** 32:
+            present |= _BIT[key]
+            num_avaliacoes = value
+        elif key in refs and type(value) is str:
+            present |= _BIT[key]
+            refs[key] = string_ref(value)
+        else:
+            extra[key] = value
+    extra_ref = string_ref(json.dumps(extra, ensure_ascii=False)) if extra else NO_STRING
+    return (restaurant['id'], present, flags, avaliacao, num_avaliacoes,
+            *refs.values(), extra_ref)
+
+
+def write_snapshot(path: str, restaurants: Iterable[Mapping], next_id: int,
+                   source: Optional[os.stat_result] = None):
+    """Grava o snapshot dos restaurantes (em ordem de id) em path.
+
+    source é o stat do JSON de origem; o leitor usa tamanho e mtime para
+    saber se o snapshot ainda corresponde ao arquivo.
+    """
+    strings: Dict[str, int] = {}
+
+    def string_ref(text: str) -> int:
+        # Textos repetidos (categorias, campos vazios) são gravados uma vez
+        ref = strings.get(text)
+        if ref is None:
+            ref = strings[text] = len(strings)
+        return ref
+
+    rows = bytearray()
+    for restaurant in restaurants:
+        rows += RECORD.pack(*_encode(restaurant, string_ref))
+    count = len(rows) // RECORD.size
+
+    blob = bytearray()
+    offsets = [0]
+    for text in strings:
+        blob += text.encode('utf-8')
+        offsets.append(len(blob))
+    string_offsets = struct.pack(f'<{len(offsets)}Q', *offsets)
+
+    sections = [bytes(rows), string_offsets, bytes(blob)]
+    starts = []
+    position = HEADER.size
+    for section in sections:
+        starts.append(position)
+        position += len(section)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, count, next_id,
+                         source.st_size if source else -1,
+                         source.st_mtime_ns if source else -1,
+                         len(strings), *starts)
+
+    # Grava em arquivo temporário e troca, para nunca deixar um snapshot pela metade
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header)
+        for section in sections:
+            file.write(section)
+    os.replace(temp_path, path)
+
+
+class SnapshotReader(Sequence):
+    """Acesso somente leitura a um snapshot, decodificando sob demanda.
+
+    Abrir o snapshot só lê o cabeçalho: registros e textos são decodificados
+    a partir do mmap quando acessados. Os índices do catálogo são montados
+    pelo manager a partir dos registros, então o snapshot não tem os seus.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            (magic, version, _, self._count, self.next_id, self.source_size,
+             self.source_mtime_ns, self._string_count, self._records_at,
+             self._offsets_at, self._strings_at) = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("formato de snapshot desconhecido")
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Libera o mmap e o arquivo"""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def matches(self, source_path: str) -> bool:
+        """Verifica se o snapshot corresponde ao estado atual do JSON de origem"""
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def _string(self, ref: int) -> str:
+        start, end = struct.unpack_from('<QQ', self._map, self._offsets_at + 8 * ref)
+        return self._map[self._strings_at + start:self._strings_at + end].decode('utf-8')
+
+    def _decode(self, values: tuple, string) -> Dict:
+        """Monta o dict de um registro a partir dos valores da linha"""
+        restaurant_id, present, flags, avaliacao, num_avaliacoes, *refs = values
+        if present == _ALL_FIELDS and not flags & _AVALIACAO_INT:
+            # Caso comum (registro completo): monta o dict direto, na ordem de FIELDS
+            nome, categoria, telefone, email, endereco, cnpj, criacao, atualizacao, extra = refs
+            restaurant = {
+                'id': restaurant_id,
+                'nome': string(nome),
+                'categoria': string(categoria),
+                'ativo': bool(flags & _ATIVO),
+                'favorito': bool(flags & _FAVORITO),
+                'avaliacao': avaliacao,
+                'num_avaliacoes': num_avaliacoes,
+                'telefone': string(telefone),
+                'email': string(email),
+                'endereco': string(endereco),
+                'cnpj': string(cnpj),
+                'data_criacao': string(criacao),
+                'data_atualizacao': string(atualizacao)
+            }
+            if extra != NO_STRING:
+                restaurant.update(json.loads(string(extra)))
+            return restaurant
+
+        strings = dict(zip(_STRING_FIELDS, refs))
+        restaurant = {}
+        for field in FIELDS:
+            if not present & _BIT[field]:
+                continue
+            if field == 'id':
+                restaurant[field] = restaurant_id
+            elif field == 'ativo':
+                restaurant[field] = bool(flags & _ATIVO)
+            elif field == 'favorito':
+                restaurant[field] = bool(flags & _FAVORITO)
+            elif field == 'avaliacao':
+                restaurant[field] = int(avaliacao) if flags & _AVALIACAO_INT else avaliacao
+            elif field == 'num_avaliacoes':
+                restaurant[field] = num_avaliacoes
+            else:
+                restaurant[field] = string(strings[field])
+        if refs[-1] != NO_STRING:
+            restaurant.update(json.loads(string(refs[-1])))
+        return restaurant
+
+    def _row(self, position: int) -> tuple:
+        return RECORD.unpack_from(self._map, self._records_at + position * RECORD.size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        return self._decode(self._row(position), self._string)
+
+    def __iter__(self) -> Iterator[Dict]:
+        # Leitura completa: decodifica todos os textos de uma vez, o que é
+        # bem mais rápido que buscar cada um no mmap
+        offsets = struct.unpack_from(f'<{self._string_count + 1}Q', self._map, self._offsets_at)
+        blob = self._map[self._strings_at:self._strings_at + offsets[-1]]
+        strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self._string_count)]
+        rows = self._map[self._records_at:self._records_at + self._count * RECORD.size]
+        for values in RECORD.iter_unpack(rows):
+            yield self._decode(values, strings.__getitem__)
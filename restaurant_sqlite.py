@@ -0,0 +1,607 @@
+"""
+Backend SQLite com a mesma API de catálogo do RestaurantManager
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional, Tuple
+from datetime import datetime
+
+from restaurant_import import dedup, normalize, read_rows, validate
+from restaurant_indexes import edit_masks, fold_text, levenshtein
+from restaurant_manager import RestaurantManager
+from restaurant_query import RestaurantQuery
+from restaurant_ratings import collect_ratings, group_ratings, read_ratings
+
+# Colunas persistidas, na ordem usada pelos INSERTs
+COLUMNS = ('id', 'nome', 'categoria', 'ativo', 'favorito', 'avaliacao', 'num_avaliacoes',
+           'telefone', 'email', 'endereco', 'cnpj', 'data_criacao', 'data_atualizacao')
+# Chaves derivadas de nome e categoria (ver SQLiteRestaurantManager._keys)
+KEY_COLUMNS = ('nome_lower', 'categoria_lower', 'nome_key', 'nome_fold', 'categoria_fold')
+# Versão do esquema, gravada em PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# AUTOINCREMENT: como no RestaurantManager, ids removidos nunca são
+# reutilizados (sem ele, o SQLite reaproveita o maior id removido)
+TABLE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome TEXT NOT NULL,
+    nome_lower TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    categoria_lower TEXT NOT NULL,
+    ativo INTEGER NOT NULL DEFAULT 1,
+    favorito INTEGER NOT NULL DEFAULT 0,
+    avaliacao REAL NOT NULL DEFAULT 0.0,
+    num_avaliacoes INTEGER NOT NULL DEFAULT 0,
+    telefone TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    endereco TEXT NOT NULL DEFAULT '',
+    cnpj TEXT NOT NULL DEFAULT '',
+    data_criacao TEXT,
+    data_atualizacao TEXT,
+    nome_key TEXT NOT NULL DEFAULT '',
+    nome_fold TEXT NOT NULL DEFAULT '',
+    categoria_fold TEXT NOT NULL DEFAULT ''
+)'''
+
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS idx_restaurants_nome_lower ON restaurants (nome_lower);
+CREATE INDEX IF NOT EXISTS idx_restaurants_categoria ON restaurants (categoria);
+CREATE INDEX IF NOT EXISTS idx_restaurants_categoria_lower ON restaurants (categoria_lower);
+CREATE INDEX IF NOT EXISTS idx_restaurants_ativo ON restaurants (ativo);
+CREATE INDEX IF NOT EXISTS idx_restaurants_favorito ON restaurants (favorito);
+'''
+
+SCHEMA = TABLE_SCHEMA.format(table='restaurants') + ';' + INDEXES
+
+# Índices das colunas da versão 1, criados depois da migração
+KEY_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_restaurants_nome_key ON restaurants (nome_key)',
+    'CREATE INDEX IF NOT EXISTS idx_restaurants_nome_fold ON restaurants (nome_fold)',
+    'CREATE INDEX IF NOT EXISTS idx_restaurants_categoria_fold ON restaurants (categoria_fold)',
+)
+
+SELECT_COLUMNS = 'SELECT ' + ', '.join(COLUMNS) + ' FROM restaurants'
+_INTO = (' INTO restaurants (' + ', '.join(COLUMNS + KEY_COLUMNS) + ') VALUES (' +
+         ', '.join('?' * (len(COLUMNS) + len(KEY_COLUMNS))) + ')')
+INSERT_SQL = 'INSERT' + _INTO
+REPLACE_SQL = 'INSERT OR REPLACE' + _INTO
+SET_KEYS = ', '.join(column + ' = ?' for column in KEY_COLUMNS)
+# Maior code point: prefixo + MAX_CHAR limita por cima as chaves com o prefixo
+MAX_CHAR = '\U0010ffff'
+
+
+class SQLiteRestaurantQuery(RestaurantQuery):
+    """RestaurantQuery com os filtros traduzidos para a cláusula WHERE.
+
+    Ordenação, limite e deslocamento seguem as regras de RestaurantQuery
+    (textos sem acentos, valores ausentes no fim), aplicadas em Python.
+    """
+
+    def _where(self) -> Tuple[str, tuple]:
+        """Cláusula WHERE e parâmetros dos filtros"""
+        clauses = []
+        params = []
+        if self._category is not None:
+            clauses.append('categoria_lower = ?')
+            params.append(self._category.lower())
+        if self._active is not None:
+            clauses.append('ativo = ?')
+            params.append(int(bool(self._active)))
+        if self._favorite is not None:
+            clauses.append('favorito = ?')
+            params.append(int(bool(self._favorite)))
+        if self._text:
+            if self._ignore_accents:
+                clauses.append('(instr(nome_fold, ?) > 0 OR instr(categoria_fold, ?) > 0)')
+                term = fold_text(self._text)
+            else:
+                clauses.append('(instr(nome_lower, ?) > 0 OR instr(categoria_lower, ?) > 0)')
+                term = self._text.lower()
+            params += [term, term]
+        if self._min_rating is not None:
+            clauses.append('avaliacao >= ?')
+            params.append(self._min_rating)
+        return ' AND '.join(clauses), tuple(params)
+
+    def _matches(self):
+        return iter(self._manager._select(*self._where()))
+
+    def count(self) -> int:
+        """Quantidade de resultados dos filtros (ignora limit e offset)"""
+        where, params = self._where()
+        return self._manager.connection.execute(
+            'SELECT COUNT(*) FROM restaurants' + (' WHERE ' + where if where else ''),
+            params).fetchone()[0]
+
+
+class SQLiteRestaurantManager:
+    """Backend SQLite com a API de catálogo do RestaurantManager.
+
+    Os nomes e categorias em minúsculas e sem acentos são calculados em
+    Python (o lower() do SQLite só trata ASCII), o que mantém buscas e
+    comparações idênticas às da versão em JSON. O banco guarda só a média
+    e a quantidade de avaliações de cada restaurante: o histórico e as
+    estatísticas de notas (get_rating_stats, rating_percentile,
+    get_rating_history e o ranking com decaimento) são exclusivos do
+    RestaurantManager.
+    """
+
+    def __init__(self, filename='restaurantes.db', import_from: Optional[str] = 'restaurantes.json'):
+        self.filename = filename
+        self.notifications = []
+        self.batch_depth = 0
+        self.connection = sqlite3.connect(filename)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+
+        # Banco novo: importa o catálogo JSON existente
+        if import_from and os.path.exists(import_from) and self.count() == 0:
+            self.import_json(import_from)
+        # Muda quando outra conexão grava no banco (ver refresh)
+        self._data_version = self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def _migrate(self):
+        """Atualiza bancos criados por versões anteriores do esquema"""
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(restaurants)')}
+        table = self.connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'restaurants'").fetchone()[0]
+        with self.connection:
+            # O sqlite3 não abre transação para DDL: o BEGIN explícito torna
+            # a migração inteira atômica
+            self.connection.execute('BEGIN')
+            if version < 1:
+                self._add_key_columns(columns)
+            if 'AUTOINCREMENT' not in table.upper():
+                self._rebuild_table()
+            for statement in KEY_INDEXES:
+                self.connection.execute(statement)
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _add_key_columns(self, columns: set):
+        """Versão 1: colunas de chaves calculadas em Python"""
+        for column in KEY_COLUMNS:
+            if column not in columns:
+                self.connection.execute(
+                    f"ALTER TABLE restaurants ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        # Recalcula todas as chaves (na versão 0 o nome era comparado com lower())
+        rows = self.connection.execute('SELECT id, nome, categoria FROM restaurants').fetchall()
+        self.connection.executemany(
+            'UPDATE restaurants SET ' + SET_KEYS + ' WHERE id = ?',
+            [self._keys(nome, categoria) + (restaurant_id,) for restaurant_id, nome, categoria in rows])
+
+    def _rebuild_table(self):
+        """Versão 2: recria a tabela com AUTOINCREMENT (o SQLite não altera
+        a chave primária de uma tabela existente)"""
+        names = ', '.join(COLUMNS + KEY_COLUMNS)
+        self.connection.execute(TABLE_SCHEMA.format(table='restaurants_v2'))
+        self.connection.execute(f'INSERT INTO restaurants_v2 ({names}) SELECT {names} FROM restaurants')
+        self.connection.execute('DROP TABLE restaurants')
+        self.connection.execute('ALTER TABLE restaurants_v2 RENAME TO restaurants')
+        for statement in INDEXES.split(';'):
+            if statement.strip():
+                self.connection.execute(statement)
+
+    def close(self):
+        """Fecha a conexão com o banco"""
+        self.connection.close()
+
+    def count(self) -> int:
+        """Retorna o número de restaurantes cadastrados"""
+        return self.connection.execute('SELECT COUNT(*) FROM restaurants').fetchone()[0]
+
+    def refresh(self) -> bool:
+        """Informa se outro processo gravou no banco desde a última chamada.
+
+        As leituras sempre consultam o banco, então não há o que recarregar;
+        o retorno serve para as interfaces redesenharem a lista.
+        """
+        version = self.connection.execute('PRAGMA data_version').fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def import_json(self, filename: str) -> int:
+        """Importa restaurantes de um arquivo JSON no formato do RestaurantManager"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except Exception as e:
+            print(f"Erro ao importar restaurantes: {e}")
+            return 0
+
+        rows = [self._to_row(r) for r in data.get('restaurants', [])]
+        with self.connection:
+            self.connection.executemany(REPLACE_SQL, rows)
+            # Ids removidos no JSON (até next_id - 1) também não voltam
+            self._reserve_ids(data.get('next_id', 1) - 1)
+        return len(rows)
+
+    def _reserve_ids(self, last_id: int):
+        """Faz o AUTOINCREMENT continuar depois de last_id"""
+        row = self.connection.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'restaurants'").fetchone()
+        if row is None:
+            self.connection.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('restaurants', ?)", (last_id,))
+        elif row[0] < last_id:
+            self.connection.execute(
+                "UPDATE sqlite_sequence SET seq = ? WHERE name = 'restaurants'", (last_id,))
+
+    @staticmethod
+    def _keys(name: str, category: str) -> tuple:
+        """Chaves de busca (lower), de nome repetido (casefold) e sem acentos,
+        as mesmas usadas pelo RestaurantManager"""
+        return (name.lower(), category.lower(), RestaurantManager._name_key(name),
+                fold_text(name), fold_text(category))
+
+    @classmethod
+    def _to_row(cls, restaurant: Dict) -> tuple:
+        """Converte um restaurante (dict) em uma linha da tabela"""
+        nome = restaurant['nome']
+        categoria = restaurant['categoria']
+        return (
+            restaurant['id'], nome, categoria,
+            int(bool(restaurant.get('ativo', True))),
+            int(bool(restaurant.get('favorito', False))),
+            float(restaurant.get('avaliacao', 0.0)),
+            int(restaurant.get('num_avaliacoes', 0)),
+            restaurant.get('telefone', ''), restaurant.get('email', ''),
+            restaurant.get('endereco', ''), restaurant.get('cnpj', ''),
+            restaurant.get('data_criacao'), restaurant.get('data_atualizacao')
+        ) + cls._keys(nome, categoria)
+
+    @classmethod
+    def _new_row(cls, name: str, category: str, **fields: str) -> tuple:
+        """Linha de um restaurante novo (id NULL: o SQLite atribui o próximo id)"""
+        now = datetime.now().isoformat()
+        return cls._to_row(dict(fields, id=None, nome=name.strip(), categoria=category.strip(),
+                                ativo=True, favorito=False, data_criacao=now, data_atualizacao=now))
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """Converte uma linha da tabela no dict usado pelas interfaces"""
+        restaurant = dict(row)
+        restaurant['ativo'] = bool(restaurant['ativo'])
+        restaurant['favorito'] = bool(restaurant['favorito'])
+        return restaurant
+
+    def _select(self, where: str = '', params: tuple = ()) -> List[Dict]:
+        """Executa um SELECT e retorna a lista de restaurantes"""
+        query = SELECT_COLUMNS + (' WHERE ' + where if where else '') + ' ORDER BY id'
+        return [self._to_dict(row) for row in self.connection.execute(query, params)]
+
+    @contextmanager
+    def batch(self):
+        """Agrupa alterações em uma única transação (rollback em caso de exceção).
+
+        Se o commit final falhar, a transação é desfeita e o erro propagado.
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.connection.rollback()
+            raise
+        self.batch_depth -= 1
+        if self.batch_depth == 0:
+            try:
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection.rollback()
+                raise
+
+    transaction = batch
+
+    def _execute(self, query: str, params: tuple) -> int:
+        """Executa uma alteração em transação e retorna as linhas afetadas"""
+        try:
+            if self.batch_depth:
+                # Dentro de um lote o commit acontece ao final do bloco
+                return self.connection.execute(query, params).rowcount
+            with self.connection:
+                return self.connection.execute(query, params).rowcount
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar restaurantes: {e}")
+            return 0
+
+    def add_restaurant(self, name: str, category: str) -> bool:
+        """Adiciona um novo restaurante"""
+        if self.restaurant_exists(name):
+            return False
+        return self._execute(INSERT_SQL, self._new_row(name, category)) == 1
+
+    def import_restaurants(self, path: str, progress: Optional[Callable[[int, int], None]] = None,
+                           on_reject: Optional[Callable[[int, List[str]], None]] = None,
+                           max_reported: int = 1000) -> Optional[Dict]:
+        """Importa restaurantes de um arquivo CSV ou JSONL (ver RestaurantManager.import_restaurants).
+
+        As inclusões entram em uma única transação: se a importação falhar,
+        nada é incluído e o retorno é None.
+        """
+        imported = rejected = 0
+        rejects = []
+        try:
+            with self.batch():
+                # Dentro da transação, restaurant_exists já vê as linhas
+                # incluídas antes, então repetições no arquivo são rejeitadas
+                rows = dedup(validate(normalize(read_rows(path, progress))), self.restaurant_exists)
+                for number, record, errors in rows:
+                    if errors:
+                        rejected += 1
+                        if len(rejects) < max_reported:
+                            rejects.append((number, errors))
+                        if on_reject is not None:
+                            on_reject(number, errors)
+                        continue
+                    self.connection.execute(INSERT_SQL, self._new_row(
+                        record['nome'], record['categoria'], telefone=record['telefone'],
+                        email=record['email'], endereco=record['endereco'], cnpj=record['cnpj']))
+                    imported += 1
+        except Exception as e:
+            print(f"Erro ao importar restaurantes: {e}")
+            return None
+        return {'importados': imported, 'rejeitados': rejected, 'erros': rejects}
+
+    def restaurant_exists(self, name: str) -> bool:
+        """Verifica se um restaurante já existe"""
+        row = self.connection.execute(
+            'SELECT 1 FROM restaurants WHERE nome_key = ? LIMIT 1',
+            (RestaurantManager._name_key(name),)).fetchone()
+        return row is not None
+
+    def get_all_restaurants(self) -> List[Dict]:
+        """Retorna todos os restaurantes"""
+        return self._select()
+
+    def query(self) -> SQLiteRestaurantQuery:
+        """Inicia uma consulta composta (ver RestaurantQuery)"""
+        return SQLiteRestaurantQuery(self)
+
+    def get_restaurants_by_category(self, category: str) -> List[Dict]:
+        """Retorna restaurantes filtrados por categoria"""
+        if not category or category.lower() == 'todas':
+            return self._select()
+        return self._select('categoria_lower = ?', (category.lower(),))
+
+    def get_restaurants_by_status(self, active_only: bool = None) -> List[Dict]:
+        """Retorna restaurantes filtrados por status"""
+        if active_only is None:
+            return self._select()
+        return self._select('ativo = ?', (int(active_only),))
+
+    def search_restaurants(self, search_term: str, ignore_accents: bool = False) -> List[Dict]:
+        """Busca restaurantes por nome ou categoria (ignore_accents: "acai" encontra "Açaí")"""
+        return self.query().text(search_term, ignore_accents).all()
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugere nomes e categorias que começam com o prefixo (sem acentos)"""
+        prefix = fold_text(prefix.strip())
+        if not prefix:
+            return []
+        rows = self.connection.execute(
+            'SELECT nome_fold AS key, nome AS label FROM restaurants WHERE nome_fold >= ? AND nome_fold < ? '
+            'UNION SELECT categoria_fold, categoria FROM restaurants '
+            'WHERE categoria_fold >= ? AND categoria_fold < ? ORDER BY key, label LIMIT ?',
+            (prefix, prefix + MAX_CHAR, prefix, prefix + MAX_CHAR, limit))
+        return [row['label'] for row in rows]
+
+    def fuzzy_search(self, search_term: str, max_distance: int = 2) -> List[Dict]:
+        """Busca restaurantes por nome tolerando erros de digitação.
+
+        Sem o índice de trigramas do RestaurantManager, compara o termo com
+        todos os nomes; a ordem dos resultados (distância, nome, id) é a mesma.
+        """
+        term = fold_text(search_term.strip())
+        if not term:
+            return []
+
+        masks = edit_masks(term)
+        matches = []
+        for restaurant_id, key in self.connection.execute('SELECT id, nome_fold FROM restaurants'):
+            distance = levenshtein(term, key, max_distance, masks)
+            if distance <= max_distance:
+                matches.append((distance, key, restaurant_id))
+        matches.sort()
+        return [self.get_restaurant_by_id(restaurant_id) for _, _, restaurant_id in matches]
+
+    def filter_restaurants(self, category: Optional[str] = None, active: Optional[bool] = None,
+                           favorite: Optional[bool] = None, search_term: str = "",
+                           ignore_accents: bool = False) -> List[Dict]:
+        """Combina os filtros de categoria, status, favorito e busca"""
+        return (self.query().category(category).active(active).favorite(favorite)
+                .text(search_term, ignore_accents).all())
+
+    def update_restaurant(self, restaurant_id: int, name: str, category: str) -> bool:
+        """Atualiza um restaurante existente"""
+        restaurant = self.get_restaurant_by_id(restaurant_id)
+        if restaurant is None:
+            return False
+        # Verifica se o novo nome já existe (exceto para o próprio restaurante)
+        if (RestaurantManager._name_key(name) != RestaurantManager._name_key(restaurant['nome'])
+                and self.restaurant_exists(name)):
+            return False
+
+        return self._execute(
+            'UPDATE restaurants SET nome = ?, categoria = ?, ' + SET_KEYS + ', '
+            'data_atualizacao = ? WHERE id = ?',
+            (name.strip(), category.strip()) + self._keys(name.strip(), category.strip()) +
+            (datetime.now().isoformat(), restaurant_id)) == 1
+
+    def _toggle(self, column: str, restaurant_id: int) -> Optional[Dict]:
+        """Inverte uma coluna booleana e retorna o restaurante atualizado"""
+        updated = self._execute(
+            f'UPDATE restaurants SET {column} = 1 - {column}, data_atualizacao = ? WHERE id = ?',
+            (datetime.now().isoformat(), restaurant_id))
+        if not updated:
+            return None
+        return self.get_restaurant_by_id(restaurant_id)
+
+    def toggle_restaurant_status(self, restaurant_id: int) -> Optional[Dict]:
+        """Alterna o status ativo/inativo de um restaurante"""
+        return self._toggle('ativo', restaurant_id)
+
+    def toggle_favorite(self, restaurant_id: int) -> Optional[Dict]:
+        """Alterna o status de favorito de um restaurante"""
+        return self._toggle('favorito', restaurant_id)
+
+    def delete_restaurant(self, restaurant_id: int) -> bool:
+        """Remove um restaurante"""
+        return self._execute('DELETE FROM restaurants WHERE id = ?', (restaurant_id,)) == 1
+
+    def get_categories(self) -> List[str]:
+        """Retorna todas as categorias únicas"""
+        rows = self.connection.execute(
+            'SELECT DISTINCT categoria FROM restaurants ORDER BY categoria')
+        return [row[0] for row in rows]
+
+    def get_statistics(self) -> Dict:
+        """Retorna estatísticas do sistema"""
+        total, active, favorites, num_avaliacoes, soma_avaliacoes = self.connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(ativo), 0), COALESCE(SUM(favorito), 0), '
+            'COALESCE(SUM(num_avaliacoes), 0), COALESCE(SUM(avaliacao * num_avaliacoes), 0.0) '
+            'FROM restaurants').fetchone()
+
+        category_counts = {}
+        for categoria, count in self.connection.execute(
+                'SELECT categoria, COUNT(*) FROM restaurants GROUP BY categoria ORDER BY MIN(id)'):
+            category_counts[categoria] = count
+
+        return {
+            'total': total,
+            'ativos': active,
+            'inativos': total - active,
+            'favoritos': favorites,
+            'categorias': category_counts,
+            'num_avaliacoes': num_avaliacoes,
+            'media_avaliacoes': soma_avaliacoes / num_avaliacoes if num_avaliacoes else 0.0
+        }
+
+    def get_restaurant_by_id(self, restaurant_id: int) -> Optional[Dict]:
+        """Retorna um restaurante específico pelo ID"""
+        row = self.connection.execute(SELECT_COLUMNS + ' WHERE id = ?', (restaurant_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def add_rating(self, restaurant_id: int, rating: float) -> bool:
+        """Adiciona uma avaliação ao restaurante"""
+        if not (0 <= rating <= 5):
+            return False
+
+        # Média incremental: média + (nota - média) / (n + 1), sem o produto
+        # média * n, que perde precisão com muitas avaliações
+        return self._execute(
+            'UPDATE restaurants SET avaliacao = avaliacao + (? - avaliacao) / (num_avaliacoes + 1), '
+            'num_avaliacoes = num_avaliacoes + 1, data_atualizacao = ? WHERE id = ?',
+            (rating, datetime.now().isoformat(), restaurant_id)) == 1
+
+    def ingest_ratings(self, source) -> Optional[Dict]:
+        """Inclui avaliações em lote (ver RestaurantManager.ingest_ratings).
+
+        As notas de cada restaurante são agrupadas e combinadas com a média
+        e a quantidade gravadas em um único UPDATE, na mesma transação.
+        """
+        try:
+            rows = read_ratings(source) if isinstance(source, str) else source
+            ids, scores, rejected = collect_ratings(rows)
+        except Exception as e:
+            print(f"Erro ao importar avaliações: {e}")
+            return None
+
+        groups, invalid = group_ratings(ids, scores)
+        rejected += invalid
+        accepted = 0
+        rated = 0
+        now = datetime.now().isoformat()
+        try:
+            with self.batch():
+                for group in groups:
+                    # Junção de médias: média + (média do grupo - média) * k / (n + k)
+                    updated = self.connection.execute(
+                        'UPDATE restaurants SET avaliacao = avaliacao + (? - avaliacao) * ? / '
+                        '(num_avaliacoes + ?), num_avaliacoes = num_avaliacoes + ?, '
+                        'data_atualizacao = ? WHERE id = ?',
+                        (group.mean, group.count, group.count, group.count, now,
+                         group.restaurant_id)).rowcount
+                    if not updated:
+                        rejected += group.count
+                        continue
+                    accepted += group.count
+                    rated += 1
+        except sqlite3.Error as e:
+            print(f"Erro ao importar avaliações: {e}")
+            return None
+        return {'aceitas': accepted, 'rejeitadas': rejected, 'restaurantes': rated}
+
+    def get_top_rated(self, category: Optional[str] = None, limit: int = 10,
+                      recent: bool = False, active_only: bool = True) -> List[Dict]:
+        """Melhores restaurantes pela média bayesiana (ver RestaurantManager.get_top_rated).
+
+        Sem o histórico de notas não há decaimento: recent=True levanta
+        ValueError, como no RestaurantManager sem ranking_half_life.
+        """
+        if recent:
+            raise ValueError("recent=True requer o histórico de avaliações do RestaurantManager")
+        num_avaliacoes, soma_avaliacoes = self.connection.execute(
+            'SELECT COALESCE(SUM(num_avaliacoes), 0), COALESCE(SUM(avaliacao * num_avaliacoes), 0.0) '
+            'FROM restaurants').fetchone()
+        prior_mean = soma_avaliacoes / num_avaliacoes if num_avaliacoes else 0.0
+
+        clauses = []
+        params = []
+        if category and category.lower() != 'todas':
+            clauses.append('categoria_lower = ?')
+            params.append(category.lower())
+        if active_only:
+            clauses.append('ativo = 1')
+        weight = RestaurantManager.RANKING_PRIOR_WEIGHT
+        rows = self.connection.execute(
+            SELECT_COLUMNS + (' WHERE ' + ' AND '.join(clauses) if clauses else '') +
+            ' ORDER BY avaliacao + ? * (? - avaliacao) / (? + num_avaliacoes) DESC, id LIMIT ?',
+            tuple(params) + (weight, prior_mean, weight, limit))
+        return [self._to_dict(row) for row in rows]
+
+    def get_favorite_restaurants(self) -> List[Dict]:
+        """Retorna apenas os restaurantes favoritos"""
+        return self._select('favorito = 1')
+
+    validate_email = staticmethod(RestaurantManager.validate_email)
+    validate_phone = staticmethod(RestaurantManager.validate_phone)
+    validate_cnpj = staticmethod(RestaurantManager.validate_cnpj)
+    validate_batch = staticmethod(RestaurantManager.validate_batch)
+    validate_restaurant_data = RestaurantManager.validate_restaurant_data
+    add_notification = RestaurantManager.add_notification
+
+    def update_restaurant_full(self, restaurant_id: int, name: str, category: str,
+                              phone: str = "", email: str = "", endereco: str = "", cnpj: str = "") -> tuple:
+        """Atualiza um restaurante com validação completa"""
+        # Validar dados
+        is_valid, errors = self.validate_restaurant_data(name, category, phone, email, cnpj)
+        if not is_valid:
+            return False, errors
+
+        restaurant = self.get_restaurant_by_id(restaurant_id)
+        if restaurant is None:
+            return False, ["Restaurante não encontrado"]
+        # Verifica se o novo nome já existe (exceto para o próprio restaurante)
+        if (RestaurantManager._name_key(name) != RestaurantManager._name_key(restaurant['nome'])
+                and self.restaurant_exists(name)):
+            return False, ["Já existe um restaurante com este nome"]
+
+        if self._execute(
+                'UPDATE restaurants SET nome = ?, categoria = ?, ' + SET_KEYS + ', '
+                'telefone = ?, email = ?, endereco = ?, cnpj = ?, data_atualizacao = ? WHERE id = ?',
+                (name.strip(), category.strip()) + self._keys(name.strip(), category.strip()) +
+                (phone.strip(), email.strip(), endereco.strip(), cnpj.strip(),
+                 datetime.now().isoformat(), restaurant_id)) == 1:
+            return True, []
+        return False, ["Erro ao salvar dados"]
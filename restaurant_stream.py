@@ -0,0 +1,181 @@
+"""
+Leitura incremental e gravação do arquivo de restaurantes
+"""
+
+import codecs
+import json
+import zlib
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Mapping, Optional
+
+_WHITESPACE = ' \t\n\r'
+
+
+def format_checksum(crc: int) -> str:
+    """Texto gravado na chave 'checksum' do arquivo"""
+    return f"crc32:{crc:08x}"
+
+
+class _Reader:
+    """Buffer de texto limitado sobre um arquivo binário UTF-8.
+
+    O texto já consumido é descartado a cada leitura, então o buffer guarda
+    no máximo um bloco mais o registro que ainda está incompleto.
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int,
+                 progress: Optional[Callable[[int, int], None]], total: int):
+        self._file = file
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._chunk_size = chunk_size
+        self._progress = progress
+        self._total = total
+        self._bytes_read = 0
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # CRC32 acumulado dos textos dos registros (ver write_restaurants)
+        self.crc = 0
+
+    def fill(self) -> bool:
+        """Lê mais um bloco do arquivo; retorna False no fim do arquivo"""
+        if self.eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        self.buffer = self.buffer[self.pos:] + self._decoder.decode(chunk, final=not chunk)
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+            return False
+        self._bytes_read += len(chunk)
+        if self._progress is not None:
+            self._progress(self._bytes_read, self._total)
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere diferente de espaço ('' no fim do arquivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        """Consome o caractere esperado"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON inválido: esperado '{char}', encontrado '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder, checksum: bool = False):
+        """Decodifica o próximo valor JSON, lendo mais blocos se necessário"""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+                # Um número no fim do buffer pode continuar no próximo bloco
+                if end < len(self.buffer) or self.eof:
+                    if checksum:
+                        self.crc = zlib.crc32(self.buffer[self.pos:end].encode('utf-8'), self.crc)
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_restaurants(file: BinaryIO, header: Dict, progress: Optional[Callable[[int, int], None]] = None,
+                     total: int = 0, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """Percorre os registros do array 'restaurants' sem carregar o arquivo inteiro.
+
+    As demais chaves do objeto principal (next_id, version...) são
+    gravadas em header. progress(bytes_lidos, total) é chamado a cada bloco.
+    Se o arquivo tiver a chave 'checksum', ela é conferida ao final e uma
+    divergência gera ValueError.
+    """
+    reader = _Reader(file, chunk_size, progress, total)
+    decoder = json.JSONDecoder()
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value(decoder)
+        reader.expect(':')
+        if key == 'restaurants' and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() != ']':
+                while True:
+                    yield reader.value(decoder, checksum=True)
+                    if reader.peek() != ',':
+                        break
+                    reader.pos += 1
+            reader.expect(']')
+        else:
+            header[key] = reader.value(decoder)
+
+        if reader.peek() != ',':
+            break
+        reader.pos += 1
+    reader.expect('}')
+
+    if 'checksum' in header and header['checksum'] != format_checksum(reader.crc):
+        raise ValueError("checksum do arquivo não confere (arquivo corrompido)")
+
+
+def read_header(file: BinaryIO) -> Dict:
+    """Lê só as chaves gravadas antes do array de registros (geração, next_id...)"""
+    header = {}
+    for _ in iter_restaurants(file, header):
+        break
+    return header
+
+
+def write_restaurants(file: BinaryIO, restaurants: Iterable[Mapping], header: Dict,
+                      pretty: bool = False) -> str:
+    """Grava o objeto principal (header + restaurants) e retorna o checksum.
+
+    As chaves do header vêm antes dos registros, para que read_header as
+    leia sem percorrer o arquivo. O checksum é o CRC32 dos textos dos
+    registros, exatamente como gravados, e vai na última chave do objeto;
+    iter_restaurants o confere na leitura. Com pretty=False o JSON sai sem
+    indentação (menor e mais rápido).
+    """
+    def write_key(key: str, value):
+        text = json.dumps(value, ensure_ascii=False)
+        if pretty:
+            file.write(f'\n  {json.dumps(key)}: {text},'.encode('utf-8'))
+        else:
+            file.write(f'{json.dumps(key)}:{text},'.encode('utf-8'))
+
+    file.write(b'{')
+    for key, value in header.items():
+        write_key(key, value)
+
+    crc = 0
+    separator = b',\n    ' if pretty else b','
+    file.write(b'\n  "restaurants": [' if pretty else b'"restaurants":[')
+    first = True
+    for restaurant in restaurants:
+        if pretty:
+            text = json.dumps(restaurant, ensure_ascii=False, default=dict, indent=2)
+            text = text.replace('\n', '\n    ')
+        else:
+            text = json.dumps(restaurant, ensure_ascii=False, default=dict, separators=(',', ':'))
+        data = text.encode('utf-8')
+        crc = zlib.crc32(data, crc)
+        file.write(b'\n    ' if pretty and first else b'' if first else separator)
+        file.write(data)
+        first = False
+    if pretty and not first:
+        file.write(b'\n  ')
+    file.write(b'],')
+
+    checksum = format_checksum(crc)
+    if pretty:
+        file.write(f'\n  "checksum": "{checksum}"\n}}'.encode('utf-8'))
+    else:
+        file.write(f'"checksum":"{checksum}"}}'.encode('utf-8'))
+    return checksum
@@ -0,0 +1,160 @@
+"""
+Validação de dados de restaurantes (registro a registro e em lote)
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+try:
+    import numpy
+except ImportError:
+    # Sem numpy os dígitos verificadores são calculados linha a linha
+    numpy = None
+
+NAME_REQUIRED = "Nome é obrigatório"
+CATEGORY_REQUIRED = "Categoria é obrigatória"
+INVALID_PHONE = "Telefone inválido. Use formato: (11) 99999-9999"
+INVALID_EMAIL = "Email inválido"
+INVALID_CNPJ = "CNPJ inválido"
+
+_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NON_DIGIT = re.compile(r'\D')
+# Pesos dos dois dígitos verificadores do CNPJ
+_CNPJ_WEIGHTS_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+_CNPJ_WEIGHTS_2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Abaixo disso o custo de iniciar os processos supera o ganho
+PARALLEL_MIN_ROWS = 50000
+
+
+def validate_email(email: str) -> bool:
+    """Valida formato de email"""
+    if not email:
+        return True  # Email é opcional
+    return _EMAIL_PATTERN.match(email) is not None
+
+
+def validate_phone(phone: str) -> bool:
+    """Valida formato de telefone brasileiro"""
+    if not phone:
+        return True  # Telefone é opcional
+    # Aceita formatos: (11) 99999-9999, 11999999999, etc.
+    return 10 <= len(_NON_DIGIT.sub('', phone)) <= 11
+
+
+def _check_digit(digits: Sequence[int], weights: Sequence[int]) -> int:
+    remainder = sum(digit * weight for digit, weight in zip(digits, weights)) % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+
+def validate_cnpj(cnpj: str) -> bool:
+    """Valida CNPJ brasileiro"""
+    if not cnpj:
+        return True  # CNPJ é opcional
+    cnpj = _NON_DIGIT.sub('', cnpj)
+    # 14 dígitos, nem todos iguais
+    if len(cnpj) != 14 or len(set(cnpj)) == 1:
+        return False
+    digits = [int(digit) for digit in cnpj]
+    return (_check_digit(digits, _CNPJ_WEIGHTS_1) == digits[12] and
+            _check_digit(digits, _CNPJ_WEIGHTS_2) == digits[13])
+
+
+def _validate_cnpj_column(cnpjs: Sequence[str]) -> List[bool]:
+    """validate_cnpj para uma coluna, com os dígitos em uma matriz numpy"""
+    if numpy is None:
+        return [validate_cnpj(cnpj) for cnpj in cnpjs]
+
+    results = [True] * len(cnpjs)
+    rows = []
+    texts = []
+    for row, cnpj in enumerate(cnpjs):
+        if not cnpj:
+            continue
+        digits = _NON_DIGIT.sub('', cnpj)
+        if len(digits) != 14:
+            results[row] = False
+        elif digits.isascii():
+            rows.append(row)
+            texts.append(digits)
+        else:
+            # Dígitos de outros alfabetos (\d é Unicode): caminho escalar
+            results[row] = validate_cnpj(digits)
+    if not rows:
+        return results
+
+    digits = numpy.frombuffer(''.join(texts).encode('ascii'), dtype=numpy.uint8)
+    digits = digits.reshape(-1, 14).astype(numpy.int64) - ord('0')
+    first = digits[:, :12] @ numpy.array(_CNPJ_WEIGHTS_1) % 11
+    second = digits[:, :13] @ numpy.array(_CNPJ_WEIGHTS_2) % 11
+    valid = ((numpy.where(first < 2, 0, 11 - first) == digits[:, 12]) &
+             (numpy.where(second < 2, 0, 11 - second) == digits[:, 13]) &
+             ~(digits == digits[:, :1]).all(axis=1))
+    for row, ok in zip(rows, valid.tolist()):
+        results[row] = ok
+    return results
+
+
+def _validate_chunk(names: Optional[Sequence[str]], categories: Optional[Sequence[str]],
+                    phones: Optional[Sequence[str]], emails: Optional[Sequence[str]],
+                    cnpjs: Optional[Sequence[str]]) -> List[List[str]]:
+    """Erros de cada linha de um bloco (executado nos processos auxiliares)"""
+    count = len(next(column for column in (names, categories, phones, emails, cnpjs)
+                      if column is not None))
+    cnpj_valid = _validate_cnpj_column(cnpjs) if cnpjs is not None else None
+    results = []
+    for row in range(count):
+        # Mesma ordem de mensagens de validate_restaurant_data
+        errors = []
+        if names is not None and (not names[row] or not names[row].strip()):
+            errors.append(NAME_REQUIRED)
+        if categories is not None and (not categories[row] or not categories[row].strip()):
+            errors.append(CATEGORY_REQUIRED)
+        if phones is not None and phones[row] and not validate_phone(phones[row]):
+            errors.append(INVALID_PHONE)
+        if emails is not None and emails[row] and not validate_email(emails[row]):
+            errors.append(INVALID_EMAIL)
+        if cnpj_valid is not None and not cnpj_valid[row]:
+            errors.append(INVALID_CNPJ)
+        results.append(errors)
+    return results
+
+
+def validate_batch(names: Optional[Sequence[str]] = None, categories: Optional[Sequence[str]] = None,
+                   phones: Optional[Sequence[str]] = None, emails: Optional[Sequence[str]] = None,
+                   cnpjs: Optional[Sequence[str]] = None,
+                   workers: Optional[int] = None) -> List[List[str]]:
+    """Valida colunas de dados e retorna a lista de erros de cada linha.
+
+    As colunas informadas devem ter o mesmo tamanho; as omitidas não são
+    conferidas. As mensagens são as mesmas de validate_restaurant_data.
+    Lotes a partir de PARALLEL_MIN_ROWS linhas são divididos em blocos e
+    validados em processos auxiliares (workers=1 desativa).
+    """
+    columns = [names, categories, phones, emails, cnpjs]
+    lengths = {len(column) for column in columns if column is not None}
+    if not lengths:
+        return []
+    if len(lengths) > 1:
+        raise ValueError("as colunas devem ter o mesmo tamanho")
+    count = lengths.pop()
+
+    workers = workers or os.cpu_count() or 1
+    if workers < 2 or count < PARALLEL_MIN_ROWS:
+        return _validate_chunk(*columns)
+
+    size = -(-count // (workers * 4))
+    chunks = [[column[start:start + size] if column is not None else None for column in columns]
+              for start in range(0, count, size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = []
+            for chunk_results in executor.map(_validate_chunk, *zip(*chunks)):
+                results.extend(chunk_results)
+            return results
+    except (OSError, RuntimeError) as e:
+        # Ambiente sem suporte a processos: valida no processo atual
+        print(f"Aviso: validação em paralelo indisponível ({e})")
+        return _validate_chunk(*columns)
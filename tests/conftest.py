@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Os módulos ficam na raiz do repositório (sem pacote instalável)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Caminho do arquivo principal em um diretório temporário"""
+    return str(tmp_path / 'restaurantes.json')
+
+
+WORDS = ('Pizza', 'Pizzaria', 'Bar', 'do', 'Zé', 'Açaí', 'São', 'João', 'Pão', 'de', 'Queijo',
+         'Cantina', 'Churrascaria', 'Sushi', 'Casa', 'Oficina', 'da', 'Massa', 'Café', 'Bistrô',
+         'Straße', 'Lanchonete', 'Mercês', 'Coração')
+CATEGORIES = ('Pizzaria', 'pizzaria', 'Bar', 'Lanches', 'Japonesa', 'Churrascaria', 'Café', 'Doceria')
+
+
+@pytest.fixture
+def catalog(path):
+    """Manager com um catálogo aleatório (semente fixa), já com remoções,
+    inativos, favoritos e avaliações"""
+    from restaurant_manager import RestaurantManager
+
+    rng = random.Random(7)
+    manager = RestaurantManager(path)
+    with manager.batch():
+        for _ in range(400):
+            name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            manager.add_restaurant(name, rng.choice(CATEGORIES))
+        ids = [restaurant['id'] for restaurant in manager.get_all_restaurants()]
+        for restaurant_id in rng.sample(ids, 60):
+            manager.delete_restaurant(restaurant_id)
+        ids = [restaurant['id'] for restaurant in manager.get_all_restaurants()]
+        for restaurant_id in rng.sample(ids, 80):
+            manager.toggle_restaurant_status(restaurant_id)
+        for restaurant_id in rng.sample(ids, 80):
+            manager.toggle_favorite(restaurant_id)
+    manager.ingest_ratings([(rng.choice(ids), rng.randint(0, 5)) for _ in range(300)])
+    return manager
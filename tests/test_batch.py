@@ -0,0 +1,54 @@
+import pytest
+
+from restaurant_manager import RestaurantManager
+
+
+def names(manager):
+    return [restaurant['nome'] for restaurant in manager.get_all_restaurants()]
+
+
+@pytest.mark.parametrize('journal', [False, True])
+def test_failed_flush_keeps_pending_changes(path, monkeypatch, journal):
+    manager = RestaurantManager(path, journal=journal)
+    manager.add_restaurant('A', 'Bar')
+    monkeypatch.setattr(RestaurantManager, 'save_restaurants', lambda self: False)
+    monkeypatch.setattr(RestaurantManager, '_append_journal', lambda self, entries: False)
+
+    with pytest.raises(OSError):
+        with manager.batch():
+            manager.add_restaurant('B', 'Bar')
+    assert manager.ingest_ratings([(1, 5)]) is None
+    assert manager._pending
+
+    monkeypatch.undo()
+    assert manager.add_restaurant('C', 'Bar')
+    assert not manager._pending
+    reloaded = RestaurantManager(path, journal=journal)
+    assert names(reloaded) == ['A', 'B', 'C']
+    assert reloaded.get_restaurant_by_id(1)['num_avaliacoes'] == 1
+
+
+def test_import_returns_none_when_commit_fails(path, tmp_path, monkeypatch):
+    source = tmp_path / 'novos.csv'
+    source.write_text('nome,categoria\nA,Bar\nB,Bar\n', encoding='utf-8')
+    manager = RestaurantManager(path)
+    monkeypatch.setattr(RestaurantManager, 'save_restaurants', lambda self: False)
+    assert manager.import_restaurants(str(source)) is None
+
+
+def test_batch_rollback(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    manager.add_rating(1, 5)
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.add_restaurant('B', 'Pizzaria')
+            manager.add_rating(1, 1)
+            manager.delete_restaurant(1)
+            raise RuntimeError
+    assert names(manager) == ['A']
+    assert manager.get_restaurant_by_id(1)['avaliacao'] == 5.0
+    assert manager.get_rating_stats(1)['historico'] == 1
+    assert manager.get_categories() == ['Bar']
+    assert manager.check_statistics()
+    assert names(RestaurantManager(path)) == ['A']
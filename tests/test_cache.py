@@ -0,0 +1,59 @@
+import pickle
+
+from restaurant_manager import RestaurantManager
+from restaurant_record import Restaurant
+
+
+def state(manager):
+    return (list(map(dict, manager.get_all_restaurants())), manager.get_categories(),
+            manager.get_statistics(), [r['id'] for r in manager.search_restaurants('pizza')],
+            [r['id'] for r in manager.filter_restaurants('Bar', active=True)],
+            [r['id'] for r in manager.fuzzy_search('casa de pao')], manager.autocomplete('ca'),
+            manager.next_id)
+
+
+def test_cache_restores_records_and_indexes(catalog, monkeypatch):
+    RestaurantManager(catalog.filename, index_cache=True)
+    # A carga falha se o arquivo for lido em vez do cache
+    monkeypatch.setattr(RestaurantManager, '_load_file', lambda *args: 1 / 0)
+    restored = RestaurantManager(catalog.filename, index_cache=True)
+    assert state(restored) == state(catalog)
+
+    # Os índices restaurados continuam sendo mantidos a cada alteração
+    for manager in (restored, catalog):
+        manager.delete_restaurant(manager.get_all_restaurants()[0]['id'])
+    restored.refresh()
+    assert state(restored) == state(catalog)
+
+
+def test_cache_is_invalidated_when_the_file_changes(catalog):
+    RestaurantManager(catalog.filename, index_cache=True)
+    catalog.add_restaurant('Casa Nova', 'Bar')
+    reloaded = RestaurantManager(catalog.filename, index_cache=True)
+    assert state(reloaded) == state(catalog)
+    assert reloaded.restaurant_exists('casa nova')
+
+
+def test_cache_depends_on_the_representation(catalog):
+    RestaurantManager(catalog.filename, index_cache=True)
+    compact = RestaurantManager(catalog.filename, index_cache=True, compact=True)
+    assert all(isinstance(r, Restaurant) for r in compact.get_all_restaurants())
+    assert state(compact) == state(catalog)
+
+
+def test_corrupt_cache_is_rebuilt(catalog, capsys):
+    RestaurantManager(catalog.filename, index_cache=True)
+    with open(catalog.filename + '.cache', 'r+b') as file:
+        file.truncate(100)
+    assert state(RestaurantManager(catalog.filename, index_cache=True)) == state(catalog)
+    assert 'Erro ao ler cache de índices' in capsys.readouterr().out
+    assert state(RestaurantManager(catalog.filename, index_cache=True)) == state(catalog)
+
+
+def test_cache_holds_a_sorted_prefix_index(catalog):
+    RestaurantManager(catalog.filename, index_cache=True)
+    with open(catalog.filename + '.cache', 'rb') as file:
+        pickle.load(file)
+        prefix_index = pickle.load(file)['_prefix_index']
+    assert not prefix_index._unsorted
+    assert prefix_index._entries == sorted(prefix_index._counts)
@@ -0,0 +1,136 @@
+from collections import Counter
+
+import pytest
+
+from restaurant_manager import RestaurantManager
+from restaurant_stream import read_header
+
+
+def ids(results):
+    return [restaurant['id'] for restaurant in results]
+
+
+def test_id_operations(catalog):
+    all_ids = ids(catalog.get_all_restaurants())
+    assert all_ids == sorted(all_ids)
+    for restaurant_id in all_ids[::7]:
+        assert catalog.get_restaurant_by_id(restaurant_id)['id'] == restaurant_id
+
+    target = all_ids[10]
+    assert catalog.update_restaurant(target, 'Nome Novo', 'Bar')
+    assert catalog.get_restaurant_by_id(target)['nome'] == 'Nome Novo'
+    active = catalog.get_restaurant_by_id(target)['ativo']
+    assert catalog.toggle_restaurant_status(target)['ativo'] is (not active)
+    assert catalog.delete_restaurant(target)
+
+    assert catalog.get_restaurant_by_id(target) is None
+    assert not catalog.delete_restaurant(target)
+    assert not catalog.update_restaurant(target, 'Outro Nome', 'Bar')
+    assert catalog.toggle_restaurant_status(target) is None
+    assert catalog.toggle_favorite(target) is None
+    assert not catalog.add_rating(target, 3)
+    assert ids(catalog.get_all_restaurants()) == [i for i in all_ids if i != target]
+
+    reloaded = RestaurantManager(catalog.filename)
+    assert list(map(dict, reloaded.get_all_restaurants())) == list(map(dict, catalog.get_all_restaurants()))
+
+
+def test_names_are_unique_ignoring_case(path):
+    manager = RestaurantManager(path)
+    assert manager.add_restaurant('Café Central', 'Café')
+    assert manager.add_restaurant('Straße', 'Bar')
+    assert not manager.add_restaurant('  CAFÉ central ', 'Bar')
+    assert manager.restaurant_exists('café CENTRAL')
+    assert manager.restaurant_exists('STRASSE')
+
+    # Renomear para o nome de outro é recusado; mudar só as maiúsculas, não
+    assert not manager.update_restaurant(2, 'café central', 'Bar')
+    assert manager.update_restaurant(1, 'CAFÉ CENTRAL', 'Café')
+    assert manager.delete_restaurant(1)
+    assert not manager.restaurant_exists('Café Central')
+    assert manager.add_restaurant('Café Central', 'Café')
+
+
+def test_ids_are_never_reused(path):
+    manager = RestaurantManager(path)
+    for name in 'ABC':
+        manager.add_restaurant(name, 'Bar')
+    manager.delete_restaurant(3)
+    manager.add_restaurant('D', 'Bar')
+    assert ids(manager.get_all_restaurants()) == [1, 2, 4]
+
+    reloaded = RestaurantManager(path)
+    reloaded.delete_restaurant(4)
+    reloaded.add_restaurant('E', 'Bar')
+    assert ids(RestaurantManager(path).get_all_restaurants()) == [1, 2, 5]
+    with open(path, 'rb') as file:
+        assert read_header(file)['next_id'] == 6
+
+
+def test_categories_follow_mutations(catalog):
+    restaurants = catalog.get_all_restaurants()
+    assert catalog.get_categories() == sorted({r['categoria'] for r in restaurants})
+    assert ids(catalog.get_restaurants_by_category('PIZZARIA')) == \
+        [r['id'] for r in restaurants if r['categoria'].lower() == 'pizzaria']
+    assert catalog.get_restaurants_by_category('Todas') == restaurants
+
+    # A última loja de uma categoria leva a categoria junto
+    for restaurant in catalog.get_restaurants_by_category('Doceria'):
+        catalog.update_restaurant(restaurant['id'], restaurant['nome'], 'Confeitaria')
+    assert 'Doceria' not in catalog.get_categories()
+    for restaurant in catalog.get_restaurants_by_category('Japonesa'):
+        catalog.delete_restaurant(restaurant['id'])
+    assert 'Japonesa' not in catalog.get_categories()
+    assert catalog.get_categories() == sorted({r['categoria'] for r in catalog.get_all_restaurants()})
+    assert catalog.get_categories() == RestaurantManager(catalog.filename).get_categories()
+
+
+def recount(restaurants):
+    """Estatísticas calculadas do zero, como antes dos agregados"""
+    num_avaliacoes = sum(r.get('num_avaliacoes', 0) for r in restaurants)
+    soma = sum(r.get('avaliacao', 0.0) * r.get('num_avaliacoes', 0) for r in restaurants)
+    return {
+        'total': len(restaurants),
+        'ativos': sum(r['ativo'] for r in restaurants),
+        'inativos': sum(not r['ativo'] for r in restaurants),
+        'favoritos': sum(r.get('favorito', False) for r in restaurants),
+        'categorias': dict(Counter(r['categoria'] for r in restaurants)),
+        'num_avaliacoes': num_avaliacoes,
+        'media_avaliacoes': pytest.approx(soma / num_avaliacoes if num_avaliacoes else 0.0)
+    }
+
+
+def test_statistics_match_a_recount(catalog):
+    assert catalog.get_statistics() == recount(catalog.get_all_restaurants())
+    restaurant_id = catalog.get_all_restaurants()[5]['id']
+    catalog.toggle_favorite(restaurant_id)
+    catalog.add_rating(restaurant_id, 1.5)
+    catalog.delete_restaurant(catalog.get_all_restaurants()[0]['id'])
+    assert catalog.get_statistics() == recount(catalog.get_all_restaurants())
+    assert catalog.check_statistics()
+
+
+def test_check_statistics_repairs_drift(catalog):
+    catalog._stats['ativos'] += 1
+    assert not catalog.check_statistics()
+    assert catalog.check_statistics()
+    assert catalog.get_statistics() == recount(catalog.get_all_restaurants())
+
+
+def test_reads_return_read_only_views(catalog):
+    restaurants = catalog.get_all_restaurants()
+    assert catalog.get_all_restaurants() is restaurants
+    assert catalog.get_restaurants_by_status() is restaurants
+    restaurant = restaurants[0]
+    with pytest.raises(TypeError):
+        restaurant['nome'] = 'Alterado'
+    with pytest.raises(TypeError):
+        restaurants[0] = {}
+
+    # Uma alteração gera outra versão; a visão e o snapshot antigos não mudam
+    favorite = restaurant.get('favorito', False)
+    catalog.toggle_favorite(restaurant['id'])
+    assert restaurant.get('favorito', False) is favorite
+    assert catalog.get_restaurant_by_id(restaurant['id'])['favorito'] is (not favorite)
+    assert catalog.get_all_restaurants() is not restaurants
+    assert restaurants[0] is restaurant
@@ -0,0 +1,63 @@
+import json
+
+from restaurant_import import DUPLICATE_NAME, INVALID_ROW
+from restaurant_manager import RestaurantManager
+from restaurant_validation import CATEGORY_REQUIRED, INVALID_CNPJ, INVALID_EMAIL, NAME_REQUIRED
+
+CSV = ('﻿nome,categoria,telefone,email,cnpj\n'
+       'Casa,Bar,(11) 99999-9999,casa@exemplo.com,\n'
+       ',Bar,,,\n'
+       'Email Ruim,Bar,,sem-arroba,\n'
+       'existente,Bar,,,\n'
+       'Nova,Bar,,,11.222.333/0001-81\n'
+       ' nova ,Bar,,,\n'
+       'Sem Categoria,,,,11111111111111\n')
+
+
+def names(manager):
+    return [restaurant['nome'] for restaurant in manager.get_all_restaurants()]
+
+
+def test_csv_import_counts_rejects_and_duplicates(path, tmp_path):
+    source = tmp_path / 'lojas.csv'
+    source.write_text(CSV, encoding='utf-8')
+    manager = RestaurantManager(path)
+    manager.add_restaurant('Existente', 'Bar')
+    reported = []
+    result = manager.import_restaurants(str(source), on_reject=lambda *reject: reported.append(reject),
+                                        max_reported=2)
+
+    rejects = [(3, [NAME_REQUIRED]), (4, [INVALID_EMAIL]), (5, [DUPLICATE_NAME]),
+               (7, [DUPLICATE_NAME]), (8, [CATEGORY_REQUIRED, INVALID_CNPJ])]
+    assert result == {'importados': 2, 'rejeitados': 5, 'erros': rejects[:2]}
+    assert reported == rejects
+    for loaded in (manager, RestaurantManager(path)):
+        assert names(loaded) == ['Existente', 'Casa', 'Nova']
+        casa = loaded.get_restaurant_by_id(2)
+        assert (casa['telefone'], casa['email']) == ('(11) 99999-9999', 'casa@exemplo.com')
+        assert loaded.get_restaurant_by_id(3)['cnpj'] == '11.222.333/0001-81'
+        assert loaded.next_id == 4
+
+
+def test_jsonl_import_rejects_malformed_lines(path, tmp_path):
+    lines = [json.dumps({'nome': 'A', 'categoria': 'Bar', 'telefone': 11999999999}),
+             '{"nome": "B", "categ', '', '[1]',
+             json.dumps({'nome': '  B  ', 'categoria': 'Bar', 'extra': 1}),
+             json.dumps({'nome': 'a', 'categoria': 'Bar'})]
+    source = tmp_path / 'lojas.jsonl'
+    source.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    manager = RestaurantManager(path)
+    result = manager.import_restaurants(str(source))
+    assert result == {'importados': 2, 'rejeitados': 3,
+                      'erros': [(2, [INVALID_ROW]), (4, [INVALID_ROW]), (6, [DUPLICATE_NAME])]}
+    reloaded = RestaurantManager(path)
+    assert names(reloaded) == ['A', 'B']
+    assert reloaded.get_restaurant_by_id(1)['telefone'] == '11999999999'
+    assert reloaded.restaurant_exists('b')
+
+
+def test_failed_import_adds_nothing(path, tmp_path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    assert manager.import_restaurants(str(tmp_path / 'ausente.csv')) is None
+    assert names(RestaurantManager(path)) == ['A']
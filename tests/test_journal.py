@@ -0,0 +1,37 @@
+import os
+
+from restaurant_manager import RestaurantManager
+
+
+def names(manager):
+    return [restaurant['nome'] for restaurant in manager.get_all_restaurants()]
+
+
+def test_journal_replay(path):
+    manager = RestaurantManager(path, journal=True)
+    manager.add_restaurant('A', 'Bar')
+    manager.add_restaurant('B', 'Bar')
+    manager.delete_restaurant(1)
+    assert os.path.exists(path + '.journal')
+    assert names(RestaurantManager(path, journal=True)) == ['B']
+
+
+def test_journal_compaction(path):
+    manager = RestaurantManager(path, journal=True, compact_threshold=3)
+    for name in 'ABC':
+        manager.add_restaurant(name, 'Bar')
+    assert not os.path.exists(path + '.journal')
+    assert names(RestaurantManager(path)) == ['A', 'B', 'C']
+
+
+def test_torn_journal_line_is_dropped_before_append(path):
+    RestaurantManager(path, journal=True).add_restaurant('A', 'Bar')
+    with open(path + '.journal', 'ab') as file:
+        file.write(b'{"op": "upsert", "restaurant": {"id": 9')
+
+    manager = RestaurantManager(path, journal=True)
+    manager.add_restaurant('B', 'Bar')
+    manager.add_restaurant('C', 'Bar')
+    assert names(RestaurantManager(path, journal=True)) == ['A', 'B', 'C']
+    with open(path + '.journal', 'rb') as file:
+        assert file.read().endswith(b'\n')
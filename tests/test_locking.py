@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+from restaurant_manager import RestaurantManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def names(manager):
+    return [restaurant['nome'] for restaurant in manager.get_all_restaurants()]
+
+
+def test_two_managers_merge(path):
+    first = RestaurantManager(path)
+    second = RestaurantManager(path)
+    first.add_restaurant('A', 'Bar')
+    second.add_restaurant('B', 'Bar')
+    first.toggle_favorite(2)
+    second.add_rating(1, 4)
+    for manager in (first, second, RestaurantManager(path)):
+        assert names(manager) == ['A', 'B']
+        assert manager.get_restaurant_by_id(2)['favorito']
+        assert manager.get_restaurant_by_id(1)['num_avaliacoes'] == 1
+
+
+def test_merge_renumbers_conflicting_insert(path):
+    first = RestaurantManager(path)
+    second = RestaurantManager(path)
+    with first.batch():
+        first.add_restaurant('A', 'Bar')
+        second.add_restaurant('B', 'Bar')
+    ids = {restaurant['nome']: restaurant['id'] for restaurant in RestaurantManager(path).get_all_restaurants()}
+    assert sorted(ids) == ['A', 'B']
+    assert len(set(ids.values())) == 2
+
+
+def test_full_save_keeps_changes_made_after_journal_entries(path):
+    first = RestaurantManager(path, journal=True)
+    first.add_restaurant('A', 'Bar')
+    second = RestaurantManager(path)
+    first.update_restaurant(1, 'Novo', 'Bar')
+    second.toggle_favorite(1)
+    for manager in (first, second, RestaurantManager(path)):
+        manager.refresh()
+        restaurant = manager.get_restaurant_by_id(1)
+        assert restaurant['nome'] == 'Novo'
+        assert restaurant['favorito']
+    assert not os.path.exists(path + '.journal')
+
+
+def test_journal_from_older_generation_is_ignored(path):
+    first = RestaurantManager(path, journal=True)
+    first.add_restaurant('A', 'Bar')
+    first.update_restaurant(1, 'Novo', 'Bar')
+    with open(path + '.journal', 'rb') as file:
+        stale = file.read()
+    second = RestaurantManager(path)
+    second.update_restaurant(1, 'Depois', 'Bar')
+    # Simula uma queda entre a gravação do arquivo e a remoção do journal
+    with open(path + '.journal', 'wb') as file:
+        file.write(stale)
+    assert RestaurantManager(path).get_restaurant_by_id(1)['nome'] == 'Depois'
+
+
+def test_concurrent_processes_do_not_lose_writes(path):
+    code = ('import sys; sys.path.insert(0, sys.argv[1]); '
+            'from restaurant_manager import RestaurantManager; '
+            'm = RestaurantManager(sys.argv[2]); '
+            '[m.add_restaurant(f"{sys.argv[3]}-{i}", "Bar") for i in range(20)]')
+    processes = [subprocess.Popen([sys.executable, '-c', code, ROOT, path, str(worker)])
+                 for worker in range(4)]
+    assert all(process.wait() == 0 for process in processes)
+    manager = RestaurantManager(path)
+    assert len(names(manager)) == 80
+    assert len({restaurant['id'] for restaurant in manager.get_all_restaurants()}) == 80
+
+
+def test_missing_directory_loads_empty(tmp_path):
+    manager = RestaurantManager(str(tmp_path / 'nao_existe' / 'r.json'))
+    assert list(manager.get_all_restaurants()) == []
+    assert not manager.add_restaurant('A', 'Bar')
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from restaurant_manager import RestaurantManager
+
+FILTERS = [(None, None, None, ''), ('Pizzaria', None, None, ''), ('BAR', True, None, ''),
+           (None, False, True, ''), ('Todas', True, False, 'ca'), ('Lanches', None, True, 'pão'),
+           (None, None, None, 'zzz'), ('Inexistente', None, None, '')]
+
+
+def ids(results):
+    return [restaurant['id'] for restaurant in results]
+
+
+def brute_force(restaurants, category, active, favorite, text):
+    """Os filtros aplicados um a um, como antes dos bitmaps"""
+    if category and category.lower() != 'todas':
+        restaurants = [r for r in restaurants if r['categoria'].lower() == category.lower()]
+    if active is not None:
+        restaurants = [r for r in restaurants if r['ativo'] == active]
+    if favorite is not None:
+        restaurants = [r for r in restaurants if r.get('favorito', False) == favorite]
+    if text:
+        restaurants = [r for r in restaurants
+                       if text.lower() in r['nome'].lower() or text.lower() in r['categoria'].lower()]
+    return ids(restaurants)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_bitmap_filters_match_brute_force(catalog, filters):
+    assert ids(catalog.filter_restaurants(*filters)) == brute_force(catalog.get_all_restaurants(), *filters)
+    assert catalog.query().category(filters[0]).active(filters[1]).favorite(filters[2]) \
+        .text(filters[3]).count() == len(brute_force(catalog.get_all_restaurants(), *filters))
+
+
+def test_bitmaps_survive_slot_compaction(catalog):
+    # Remover mais da metade dos restaurantes renumera os slots
+    for restaurant in catalog.get_all_restaurants()[::3] + catalog.get_all_restaurants()[1::3]:
+        catalog.delete_restaurant(restaurant['id'])
+    catalog.add_restaurant('Pizzaria Depois', 'Pizzaria')
+    for filters in FILTERS:
+        assert ids(catalog.filter_restaurants(*filters)) == brute_force(catalog.get_all_restaurants(), *filters)
+
+
+@pytest.fixture
+def legacy(path):
+    # Registros legados sem a chave 'avaliacao' (valor ausente na ordenação)
+    records = [{'id': i, 'nome': name, 'categoria': 'Bar', 'ativo': True}
+               for i, name in enumerate(['Ana', 'Bia', 'Caio', 'Davi'], 1)]
+    records[1]['avaliacao'] = 4.0
+    records[2]['avaliacao'] = 2.0
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'restaurants': records, 'next_id': 5}, file)
+    return RestaurantManager(path)
+
+
+@pytest.mark.parametrize('limit', [None, 3])
+def test_missing_values_sort_last(legacy, limit):
+    query = legacy.query().order_by('avaliacao').limit(limit)
+    assert [r['nome'] for r in query] == ['Caio', 'Bia', 'Ana', 'Davi'][:limit]
+    query = legacy.query().order_by('avaliacao', descending=True).limit(limit)
+    assert [r['nome'] for r in query] == ['Bia', 'Caio', 'Ana', 'Davi'][:limit]
+
+
+def test_filters_and_page(legacy):
+    legacy.toggle_favorite(2)
+    legacy.toggle_restaurant_status(3)
+    assert [r['nome'] for r in legacy.filter_restaurants(active=True)] == ['Ana', 'Bia', 'Davi']
+    assert [r['nome'] for r in legacy.filter_restaurants(favorite=True)] == ['Bia']
+    page = legacy.query().active().order_by('nome', descending=True).page(2, 2)
+    assert [r['nome'] for r in page['itens']] == ['Ana']
+    assert (page['total'], page['paginas']) == (3, 2)
@@ -0,0 +1,229 @@
+import random
+import statistics
+import time
+from array import array
+
+import pytest
+
+import restaurant_ratings
+from restaurant_manager import RestaurantManager
+from restaurant_ratings import RatingSeries, group_ratings, read_ratings
+from restaurant_stream import write_restaurants
+
+
+def legacy_record(restaurant_id, name, rating, count):
+    return {'id': restaurant_id, 'nome': name, 'categoria': 'Bar', 'ativo': True, 'favorito': False,
+            'avaliacao': rating, 'num_avaliacoes': count, 'telefone': '', 'email': '',
+            'endereco': '', 'cnpj': '', 'data_criacao': '2025-01-01T00:00:00',
+            'data_atualizacao': '2025-01-01T00:00:00'}
+
+
+def write_legacy(path, records):
+    with open(path, 'wb') as file:
+        write_restaurants(file, records, {'next_id': len(records) + 1})
+
+
+def test_aggregates_match_statistics(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    scores = [4, 5, 3, 4.5, 2, 5, 1, 0]
+    for score in scores:
+        assert manager.add_rating(1, score)
+    for stats in (manager.get_rating_stats(1), RestaurantManager(path).get_rating_stats(1)):
+        assert stats['media'] == pytest.approx(statistics.fmean(scores))
+        assert stats['variancia'] == pytest.approx(statistics.pvariance(scores))
+        assert stats['mediana'] == statistics.median(scores)
+        assert stats['histograma'] == [1, 1, 1, 1, 2, 2]
+    assert [score for _, score in RestaurantManager(path).get_rating_history(1)] == scores
+
+
+@pytest.mark.parametrize('count', [1, 4])
+def test_legacy_ratings_become_a_seed(path, count):
+    write_legacy(path, [legacy_record(1, 'A', 3.7, count)])
+    manager = RestaurantManager(path, ranking_half_life=30)
+    stats = manager.get_rating_stats(1)
+    assert stats['num_avaliacoes'] == count
+    assert stats['media'] == pytest.approx(3.7)
+    assert stats['historico'] == 0
+    assert stats['histograma'] == [0] * 6
+    assert manager.get_rating_history(1) == []
+    assert manager.ratings.get(1).decayed_weight == 0
+
+    manager.add_rating(1, 5)
+    stats = RestaurantManager(path).get_rating_stats(1)
+    assert stats['num_avaliacoes'] == count + 1
+    assert stats['historico'] == 1
+    assert stats['mediana'] == 5
+
+
+def test_welford_is_stable():
+    series = RatingSeries()
+    for i in range(100000):
+        series.add(4.9 if i % 2 else 5.0, 1.0)
+    assert series.mean == pytest.approx(4.95, abs=1e-12)
+    assert series.variance == pytest.approx(0.0025, abs=1e-12)
+
+
+def test_partial_rating_event_is_dropped_before_append(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    manager.add_rating(1, 4)
+    with open(path + '.ratings', 'ab') as file:
+        file.write(b'\x01\x00\x00')
+
+    manager = RestaurantManager(path)
+    manager.add_rating(1, 2)
+    manager.add_rating(1, 3)
+    stats = RestaurantManager(path).get_rating_stats(1)
+    assert stats['num_avaliacoes'] == 3
+    assert stats['historico'] == 3
+    assert stats['media'] == 3.0
+
+
+def test_invalid_rating_is_rejected(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    assert not manager.add_rating(1, 6)
+    assert not manager.add_rating(2, 4)
+    assert manager.get_rating_stats(1)['num_avaliacoes'] == 0
+
+
+def test_ingest_matches_one_by_one_ratings(tmp_path):
+    rng = random.Random(3)
+    seed = [(rng.randint(1, 5), rng.randint(0, 10) / 2) for _ in range(40)]
+    batch = [(rng.randint(1, 6), rng.choice([rng.randint(0, 10) / 2, -1, 7, float('nan')]))
+             for _ in range(300)]
+    one_by_one = RestaurantManager(str(tmp_path / 'a.json'))
+    ingested = RestaurantManager(str(tmp_path / 'b.json'))
+    for manager in (one_by_one, ingested):
+        with manager.batch():
+            for name in 'ABCDE':
+                manager.add_restaurant(name, 'Bar')
+        for restaurant_id, score in seed:
+            manager.add_rating(restaurant_id, score)
+
+    accepted = sum(one_by_one.add_rating(restaurant_id, score) for restaurant_id, score in batch)
+    result = ingested.ingest_ratings(batch + [('x', 1), (1,)])
+    assert result['aceitas'] == accepted
+    assert result['rejeitadas'] == len(batch) + 2 - accepted
+    assert result['restaurantes'] == len({i for i, score in batch if i <= 5 and 0 <= score <= 5})
+
+    reloaded = RestaurantManager(str(tmp_path / 'b.json'))
+    for restaurant_id in range(1, 6):
+        expected = one_by_one.get_rating_stats(restaurant_id)
+        for manager in (ingested, reloaded):
+            stats = manager.get_rating_stats(restaurant_id)
+            assert stats['num_avaliacoes'] == expected['num_avaliacoes']
+            assert stats['media'] == pytest.approx(expected['media'])
+            assert stats['variancia'] == pytest.approx(expected['variancia'])
+            assert stats['histograma'] == expected['histograma']
+            assert stats['mediana'] == expected['mediana']
+
+
+def test_group_ratings_numpy_matches_python(monkeypatch):
+    pytest.importorskip('numpy')
+    rng = random.Random(5)
+    ids = array('q', (rng.randint(1, 30) for _ in range(2000)))
+    scores = array('d', (rng.uniform(-1, 6) for _ in range(2000)))
+    vectorized, rejected = group_ratings(ids, scores)
+    monkeypatch.setattr(restaurant_ratings, 'numpy', None)
+    expected, expected_rejected = group_ratings(ids, scores)
+    assert rejected == expected_rejected
+    assert [group.restaurant_id for group in vectorized] == [group.restaurant_id for group in expected]
+    for group, other in zip(vectorized, expected):
+        assert group.count == other.count
+        assert group.mean == pytest.approx(other.mean)
+        assert group.m2 == pytest.approx(other.m2)
+        assert group.histogram == other.histogram
+        assert list(group.scores) == list(other.scores)
+
+
+def test_read_ratings_rejects_malformed_lines(path, tmp_path):
+    source = tmp_path / 'notas.jsonl'
+    source.write_text('{"restaurant_id": 1, "score": 4}\n{"restaurant_id": 1, "sco\n'
+                      '[1]\n{"restaurant_id": 1, "score": 2}\n', encoding='utf-8')
+    assert list(read_ratings(str(source)))[1] is None
+
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    assert manager.ingest_ratings(str(source)) == {'aceitas': 2, 'rejeitadas': 2, 'restaurantes': 1}
+
+
+def test_ingest_reads_csv(path, tmp_path):
+    source = tmp_path / 'notas.csv'
+    source.write_text('restaurant_id,score\n1,4\n1,abc\n2,5\n', encoding='utf-8')
+    manager = RestaurantManager(path)
+    manager.add_restaurant('A', 'Bar')
+    assert manager.ingest_ratings(str(source)) == {'aceitas': 1, 'rejeitadas': 2, 'restaurantes': 1}
+    assert manager.ingest_ratings(str(tmp_path / 'ausente.csv')) is None
+
+
+def test_ranking_is_maintained(path):
+    manager = RestaurantManager(path, ranking_half_life=30)
+    with manager.batch():
+        for name in ('Uma Nota', 'Muitas', 'Media', 'Inativo'):
+            manager.add_restaurant(name, 'Pizzaria')
+        manager.add_restaurant('Outro', 'Bar')
+    manager.add_rating(1, 5)
+    manager.ingest_ratings([(2, 5)] * 160 + [(2, 4)] * 40)
+    manager.ingest_ratings([(3, 3)] * 50 + [(4, 5)] * 100 + [(5, 4)] * 10)
+    manager.toggle_restaurant_status(4)
+
+    # Uma única nota 5 não passa à frente de 200 notas com média 4,8
+    top = [restaurant['nome'] for restaurant in manager.get_top_rated('pizzaria', 3)]
+    assert top == ['Muitas', 'Uma Nota', 'Media']
+
+    def assert_matches_full_sort():
+        for recent in (False, True):
+            ranking = manager._ranking(recent)
+            scores = {restaurant_id: manager._ranking_score(restaurant, recent)
+                      for restaurant_id, restaurant in manager._restaurants.items()}
+            assert list(ranking.top()) == sorted(scores, key=lambda i: (-scores[i], i))
+
+    manager.get_top_rated(recent=True)
+    manager.ingest_ratings([(1, 5)] * 500)
+    assert_matches_full_sort()
+    manager.delete_restaurant(1)
+    assert_matches_full_sort()
+    with pytest.raises(RuntimeError):
+        with manager.batch():
+            manager.ingest_ratings([(3, 5)] * 100)
+            raise RuntimeError
+    assert_matches_full_sort()
+    assert [restaurant['nome'] for restaurant in manager.get_top_rated('Bar')] == ['Outro']
+
+
+def test_top_rated_matches_brute_force(catalog):
+    def expected(category, active_only):
+        restaurants = [restaurant for restaurant in catalog.get_all_restaurants()
+                       if (category is None or restaurant['categoria'].lower() == category.lower())
+                       and (restaurant['ativo'] or not active_only)]
+        scores = {restaurant['id']: catalog._ranking_score(restaurant, False) for restaurant in restaurants}
+        return sorted(scores, key=lambda i: (-scores[i], i))[:15]
+
+    # Ranking já montado: as alterações seguintes têm de mantê-lo
+    catalog.get_top_rated()
+    first, second = catalog.get_all_restaurants()[:2]
+    catalog.update_restaurant(first['id'], 'Renomeado', 'Japonesa')
+    catalog.delete_restaurant(second['id'])
+    catalog.add_restaurant('Novo', 'Bar')
+    catalog.ingest_ratings([(first['id'], 5)] * 20)
+    for category in (None, 'pizzaria', 'Bar', 'Japonesa', 'Inexistente'):
+        for active_only in (True, False):
+            top = catalog.get_top_rated(category, 15, active_only=active_only)
+            assert [restaurant['id'] for restaurant in top] == expected(category, active_only)
+
+
+def test_recent_ranking_requires_half_life(path):
+    with pytest.raises(ValueError):
+        RestaurantManager(path).get_top_rated(recent=True)
+
+
+def test_decayed_weight_halves_each_half_life(path):
+    manager = RestaurantManager(path, ranking_half_life=30)
+    manager.add_restaurant('A', 'Bar')
+    manager.ingest_ratings([(1, 3)] * 50)
+    series = manager.ratings.get(1)
+    now = time.time()
+    assert manager.ratings.decayed(series, now)[1] == pytest.approx(50, rel=1e-3)
+    assert manager.ratings.decayed(series, now + 30 * 86400)[1] == pytest.approx(25, rel=1e-3)
@@ -0,0 +1,44 @@
+import pickle
+
+import pytest
+
+from restaurant_manager import RestaurantManager
+from restaurant_record import Restaurant
+
+RECORD = {'id': 7, 'nome': 'Açaí da Praia', 'categoria': 'Lanches', 'ativo': True, 'avaliacao': 4,
+          'data_criacao': '2024-03-01T12:30:00.250000', 'data_atualizacao': '2024-03-01T12:30:00+03:00',
+          'extra': [1, 2]}
+
+
+def test_restaurant_behaves_like_the_dict():
+    restaurant = Restaurant(RECORD)
+    assert dict(restaurant) == RECORD
+    assert list(restaurant) == list(RECORD)
+    assert restaurant == RECORD
+    assert restaurant.get('favorito') is None
+    assert pickle.loads(pickle.dumps(restaurant)) == RECORD
+
+
+def test_compact_records_cannot_be_changed(path):
+    manager = RestaurantManager(path, compact=True)
+    manager.add_restaurant('Pizza Boa', 'Pizzaria')
+    manager.add_restaurant('Bar do Zé', 'Bar')
+    restaurant = manager.get_restaurant_by_id(2)
+    with pytest.raises(AttributeError):
+        restaurant.nome = 'HACK'
+    with pytest.raises(AttributeError):
+        del restaurant.categoria
+    with pytest.raises(TypeError):
+        restaurant['nome'] = 'HACK'
+    assert manager.get_restaurant_by_id(2)['nome'] == 'Bar do Zé'
+    assert [r['id'] for r in manager.search_restaurants('zé')] == [2]
+
+
+def test_compact_mode_gives_the_same_results(catalog):
+    compact = RestaurantManager(catalog.filename, compact=True)
+    for call in (lambda m: list(map(dict, m.get_all_restaurants())),
+                 lambda m: [r['id'] for r in m.search_restaurants('pizza')],
+                 lambda m: [r['id'] for r in m.filter_restaurants('Bar', active=True)],
+                 lambda m: [r['id'] for r in m.query().order_by('data_criacao', descending=True).limit(5)],
+                 lambda m: m.get_statistics()):
+        assert call(compact) == call(catalog)
@@ -0,0 +1,69 @@
+import os
+
+from restaurant_manager import RestaurantManager
+from restaurant_stream import iter_restaurants
+
+
+def names(manager):
+    return [restaurant['nome'] for restaurant in manager.get_all_restaurants()]
+
+
+def test_checksum_mismatch_falls_back_to_backup(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('Alfa', 'Bar')
+    manager.add_restaurant('Beta', 'Bar')
+    with open(path, 'rb') as file:
+        data = file.read()
+    # JSON ainda válido, mas com o conteúdo alterado: o checksum não confere
+    with open(path, 'wb') as file:
+        file.write(data.replace(b'Beta', b'Gama'))
+    assert names(RestaurantManager(path)) == ['Alfa']
+
+
+def test_save_keeps_the_previous_file_as_backup(path):
+    manager = RestaurantManager(path)
+    manager.add_restaurant('Alfa', 'Bar')
+    manager.add_restaurant('Beta', 'Bar')
+    with open(path + '.bak', 'rb') as file:
+        assert [restaurant['nome'] for restaurant in iter_restaurants(file, {})] == ['Alfa']
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_corrupt_file_without_backup_is_preserved(path):
+    with open(path, 'wb') as file:
+        file.write(b'{"restaurants": [{"id": 1, "nome": "Alfa"')
+    manager = RestaurantManager(path)
+    assert names(manager) == []
+    assert open(path + '.corrupt', 'rb').read() == b'{"restaurants": [{"id": 1, "nome": "Alfa"'
+    assert manager.add_restaurant('Beta', 'Bar')
+    assert names(RestaurantManager(path)) == ['Beta']
+    assert not os.path.exists(path + '.bak')
+
+    # Um segundo arquivo ilegível não substitui o primeiro
+    with open(path, 'wb') as file:
+        file.write(b'lixo')
+    RestaurantManager(path)
+    assert open(path + '.corrupt', 'rb').read().startswith(b'{"restaurants"')
+    assert [open(os.path.join(os.path.dirname(path), name), 'rb').read()
+            for name in os.listdir(os.path.dirname(path)) if name.startswith('restaurantes.json.corrupt.')] == [b'lixo']
+
+
+def test_save_is_refused_while_the_corrupt_file_cannot_be_moved(path, monkeypatch):
+    with open(path, 'wb') as file:
+        file.write(b'lixo')
+    replace = os.replace
+
+    def failing_replace(source, target):
+        if target.endswith('.corrupt'):
+            raise OSError('sem permissão')
+        replace(source, target)
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    manager = RestaurantManager(path)
+    assert not manager.add_restaurant('Alfa', 'Bar')
+    assert open(path, 'rb').read() == b'lixo'
+
+    monkeypatch.undo()
+    assert manager.add_restaurant('Beta', 'Bar')
+    assert open(path + '.corrupt', 'rb').read() == b'lixo'
+    assert names(RestaurantManager(path)) == ['Alfa', 'Beta']
@@ -0,0 +1,105 @@
+import random
+import unicodedata
+
+import pytest
+
+from restaurant_indexes import fold_text, levenshtein
+from restaurant_manager import RestaurantManager
+
+TERMS = ['', 'a', 'PI', 'pizza', 'piz', 'de ', 'zé', 'ão', 'ç', 'queijo', 'bar do', 'sse',
+         'aße', 'Straße', 'trasse', 'acai', 'cafe', 'Café', 'xyz', 'ria']
+
+
+def ids(results):
+    return [restaurant['id'] for restaurant in results]
+
+
+@pytest.mark.parametrize('term', TERMS)
+def test_substring_search_matches_a_scan(catalog, term):
+    # A varredura que o índice de trigramas substituiu
+    expected = [r['id'] for r in catalog.get_all_restaurants()
+                if term.lower() in r['nome'].lower() or term.lower() in r['categoria'].lower()]
+    assert ids(catalog.search_restaurants(term)) == expected
+
+
+def test_search_index_follows_mutations(catalog):
+    restaurant = catalog.get_all_restaurants()[3]
+    catalog.update_restaurant(restaurant['id'], 'Xyzzy Grill', restaurant['categoria'])
+    assert ids(catalog.search_restaurants('xyzz')) == [restaurant['id']]
+    catalog.delete_restaurant(restaurant['id'])
+    assert catalog.search_restaurants('xyzz') == []
+
+
+def fold(text):
+    """NFKD, sem marcas combinantes e casefold, como pedido na busca sem acentos"""
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c)).casefold()
+
+
+@pytest.mark.parametrize('term', TERMS)
+def test_accent_insensitive_search_matches_a_scan(catalog, term):
+    expected = [r['id'] for r in catalog.get_all_restaurants()
+                if fold(term) in fold(r['nome']) or fold(term) in fold(r['categoria'])]
+    assert ids(catalog.search_restaurants(term, ignore_accents=True)) == expected
+
+
+def test_accent_insensitive_search_examples(path):
+    manager = RestaurantManager(path)
+    for name in ('Açaí da Praia', 'Pão de Queijo', 'Churrascaria São João'):
+        manager.add_restaurant(name, 'Lanches')
+    assert ids(manager.search_restaurants('acai', ignore_accents=True)) == [1]
+    assert ids(manager.search_restaurants('PAO DE', ignore_accents=True)) == [2]
+    assert ids(manager.search_restaurants('sao joao', ignore_accents=True)) == [3]
+    assert manager.search_restaurants('acai') == []
+
+
+def complete(restaurants, prefix, limit):
+    """Autocompletar por força bruta: ordena todos os nomes e categorias"""
+    prefix = fold_text(prefix.strip())
+    entries = sorted({(fold_text(r[field]), r[field]) for r in restaurants for field in ('nome', 'categoria')})
+    return [label for key, label in entries if key.startswith(prefix)][:limit] if prefix else []
+
+
+@pytest.mark.parametrize('prefix, limit', [('p', 10), ('PIZ', 3), ('ca', 50), (' sa', 5), ('ç', 10),
+                                           ('strasse', 10), ('zz', 10), ('', 10), ('b', 1)])
+def test_autocomplete_matches_brute_force(catalog, prefix, limit):
+    assert catalog.autocomplete(prefix, limit) == complete(catalog.get_all_restaurants(), prefix, limit)
+    for restaurant in catalog.get_all_restaurants()[:40:3]:
+        catalog.delete_restaurant(restaurant['id'])
+    catalog.add_restaurant('Pizzaria Nova', 'Padaria')
+    assert catalog.autocomplete(prefix, limit) == complete(catalog.get_all_restaurants(), prefix, limit)
+
+
+@pytest.mark.parametrize('term, max_distance', [('piza', 2), ('pizzaria sao joao', 2), ('oficna da masa', 2),
+                                                ('cafe', 1), ('bar do ze', 3), ('strasse', 1), ('zé', 2),
+                                                ('cantina casa sushi', 4), ('queijo', 0), ('xyzxyzxyz', 2)])
+def test_fuzzy_search_matches_brute_force(catalog, term, max_distance):
+    def brute_force():
+        folded = fold_text(term)
+        matches = sorted((levenshtein(folded, fold_text(r['nome'])), fold_text(r['nome']), r['id'])
+                         for r in catalog.get_all_restaurants())
+        return [restaurant_id for distance, _, restaurant_id in matches if distance <= max_distance]
+
+    assert ids(catalog.fuzzy_search(term, max_distance)) == brute_force()
+    catalog.add_restaurant(term.title(), 'Bar')
+    matches = ids(catalog.fuzzy_search(term, max_distance))
+    assert matches and matches == brute_force()
+    catalog.delete_restaurant(matches[0])
+    assert ids(catalog.fuzzy_search(term, max_distance)) == brute_force()
+
+
+def test_levenshtein_matches_dynamic_programming():
+    def reference(a, b):
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            previous = current
+        return previous[-1]
+
+    rng = random.Random(3)
+    for _ in range(3000):
+        a, b = (''.join(rng.choice('abcçã ') for _ in range(rng.randint(0, 12))) for _ in range(2))
+        distance = reference(a, b)
+        assert levenshtein(a, b) == distance
+        assert levenshtein(a, b, 2) == min(distance, 3)
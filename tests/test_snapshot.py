@@ -0,0 +1,51 @@
+import os
+
+from restaurant_manager import RestaurantManager
+from restaurant_snapshot import SnapshotReader, write_snapshot
+
+RECORDS = [
+    {'id': 1, 'nome': 'Açaí da Praia', 'categoria': 'Lanches', 'ativo': True, 'favorito': False,
+     'avaliacao': 4.5, 'num_avaliacoes': 2, 'telefone': '', 'email': '', 'endereco': '', 'cnpj': '',
+     'data_criacao': '2024-01-01T10:00:00', 'data_atualizacao': '2024-01-02T10:00:00'},
+    # Registro legado: campos ausentes, nota inteira e chaves desconhecidas
+    {'id': 3, 'nome': 'Bar do Zé', 'categoria': 'Bar', 'ativo': False, 'avaliacao': 4,
+     'tags': ['chope'], 'telefone': None},
+    {'id': 8, 'categoria': 'Bar', 'nome': 'Pão 🧀', 'num_avaliacoes': -1, 'favorito': 1},
+]
+
+
+def test_reader_decodes_what_was_written(tmp_path):
+    path = str(tmp_path / 'r.snap')
+    write_snapshot(path, RECORDS, 12)
+    with SnapshotReader(path) as reader:
+        assert list(reader) == RECORDS
+        assert [reader[i] for i in range(len(reader))] == RECORDS
+        assert reader[-1] == RECORDS[-1]
+        assert reader[1:] == RECORDS[1:]
+        assert reader.next_id == 12
+
+
+def test_manager_round_trip(catalog, monkeypatch):
+    catalog.delete_restaurant(catalog.get_all_restaurants()[-1]['id'])
+    expected = list(map(dict, catalog.get_all_restaurants()))
+
+    # A primeira carga lê o JSON e grava o snapshot; a segunda carga só o snapshot
+    RestaurantManager(catalog.filename, binary_snapshot=True)
+    assert os.path.exists(catalog.filename + '.snap')
+    monkeypatch.setattr(RestaurantManager, '_load_json', lambda *args: 1 / 0)
+    for compact in (False, True):
+        reloaded = RestaurantManager(catalog.filename, binary_snapshot=True, compact=compact)
+        assert list(map(dict, reloaded.get_all_restaurants())) == expected
+        assert reloaded.next_id == catalog.next_id
+        assert reloaded.check_statistics()
+
+
+def test_stale_snapshot_is_ignored(path):
+    manager = RestaurantManager(path, binary_snapshot=True)
+    manager.add_restaurant('A', 'Bar')
+    other = RestaurantManager(path)
+    other.add_restaurant('B', 'Bar')
+    reloaded = RestaurantManager(path, binary_snapshot=True)
+    assert [r['nome'] for r in reloaded.get_all_restaurants()] == ['A', 'B']
+    reloaded.add_restaurant('C', 'Bar')
+    assert [r['id'] for r in RestaurantManager(path, binary_snapshot=True).get_all_restaurants()] == [1, 2, 3]
@@ -0,0 +1,131 @@
+import sqlite3
+
+import pytest
+
+from restaurant_backend import backend_from_args, create_manager
+from restaurant_manager import RestaurantManager
+from restaurant_sqlite import SQLiteRestaurantManager
+
+RESTAURANTS = [('Açaí da Praia', 'Lanches'), ('Pizza Boa', 'Pizzaria'), ('Pizzaria Roma', 'pizzaria'),
+               ('Straße', 'Bar'), ('Bar do Zé', 'Bar')]
+RATINGS = [(1, 5), (2, 4), (2, 5), (3, 1), (2, 3), (4, 5), (99, 4), (1, 'x'), (3, 7)]
+
+
+@pytest.fixture
+def managers(tmp_path):
+    backends = (SQLiteRestaurantManager(str(tmp_path / 'r.db'), import_from=None),
+                RestaurantManager(str(tmp_path / 'r.json')))
+    for manager in backends:
+        for name, category in RESTAURANTS:
+            manager.add_restaurant(name, category)
+        manager.ingest_ratings(RATINGS)
+        manager.toggle_favorite(2)
+    yield backends
+    backends[0].close()
+
+
+def ids(results):
+    return [restaurant['id'] for restaurant in results]
+
+
+@pytest.mark.parametrize('call', [
+    lambda m: ids(m.get_all_restaurants()),
+    lambda m: ids(m.search_restaurants('PIZZ')),
+    lambda m: ids(m.search_restaurants('aca', ignore_accents=True)),
+    lambda m: m.autocomplete('p'),
+    lambda m: m.autocomplete('ba', 1),
+    lambda m: ids(m.fuzzy_search('piza boa')),
+    lambda m: ids(m.fuzzy_search('strase')),
+    lambda m: ids(m.filter_restaurants('PIZZARIA', active=True, search_term='roma')),
+    lambda m: ids(m.query().order_by('avaliacao', descending=True).limit(2)),
+    lambda m: m.query().category('Pizzaria').count(),
+    lambda m: ids(m.get_top_rated()),
+    lambda m: ids(m.get_top_rated('pizzaria', 1)),
+    lambda m: m.restaurant_exists('STRASSE'),
+    lambda m: m.get_statistics(),
+])
+def test_same_results_as_json_manager(managers, call):
+    sqlite_manager, json_manager = managers
+    assert call(sqlite_manager) == call(json_manager)
+
+
+def test_deleted_ids_are_not_reused(managers):
+    for manager in managers:
+        manager.delete_restaurant(5)
+        manager.add_restaurant('Novo', 'Bar')
+    sqlite_manager, json_manager = managers
+    assert ids(sqlite_manager.get_all_restaurants()) == ids(json_manager.get_all_restaurants()) == [1, 2, 3, 4, 6]
+
+
+def test_import_json_keeps_next_id(tmp_path):
+    json_manager = RestaurantManager(str(tmp_path / 'r.json'))
+    json_manager.add_restaurant('A', 'Bar')
+    json_manager.add_restaurant('B', 'Bar')
+    json_manager.delete_restaurant(2)
+    manager = SQLiteRestaurantManager(str(tmp_path / 'r.db'), import_from=str(tmp_path / 'r.json'))
+    manager.add_restaurant('C', 'Bar')
+    assert ids(manager.get_all_restaurants()) == [1, 3]
+
+
+def test_import_restaurants(tmp_path):
+    source = tmp_path / 'novos.csv'
+    source.write_text('nome,categoria,email\nA,Bar,\na,Bar,\n,Bar,\nB,Bar,x\n', encoding='utf-8')
+    manager = SQLiteRestaurantManager(str(tmp_path / 'r.db'), import_from=None)
+    result = manager.import_restaurants(str(source))
+    assert (result['importados'], result['rejeitados']) == (1, 3)
+    assert [restaurant['nome'] for restaurant in manager.get_all_restaurants()] == ['A']
+
+
+def test_migrates_version_0_database(tmp_path):
+    filename = str(tmp_path / 'antigo.db')
+    connection = sqlite3.connect(filename)
+    connection.execute('CREATE TABLE restaurants (id INTEGER PRIMARY KEY, nome TEXT NOT NULL, '
+                       'nome_lower TEXT NOT NULL, categoria TEXT NOT NULL, categoria_lower TEXT NOT NULL, '
+                       'ativo INTEGER NOT NULL DEFAULT 1, favorito INTEGER NOT NULL DEFAULT 0, '
+                       'avaliacao REAL NOT NULL DEFAULT 0.0, num_avaliacoes INTEGER NOT NULL DEFAULT 0, '
+                       "telefone TEXT NOT NULL DEFAULT '', email TEXT NOT NULL DEFAULT '', "
+                       "endereco TEXT NOT NULL DEFAULT '', cnpj TEXT NOT NULL DEFAULT '', "
+                       'data_criacao TEXT, data_atualizacao TEXT)')
+    connection.execute("INSERT INTO restaurants (nome, nome_lower, categoria, categoria_lower) "
+                       "VALUES ('Açaí da Praia', 'açaí da praia', 'Lanches', 'lanches')")
+    connection.commit()
+    connection.close()
+
+    manager = SQLiteRestaurantManager(filename, import_from=None)
+    assert ids(manager.search_restaurants('acai', ignore_accents=True)) == [1]
+    assert manager.autocomplete('aca') == ['Açaí da Praia']
+    assert not manager.add_restaurant('AÇAÍ DA PRAIA', 'Lanches')
+    # A tabela é recriada com AUTOINCREMENT
+    manager.delete_restaurant(1)
+    manager.add_restaurant('Bar do Zé', 'Bar')
+    assert ids(manager.get_all_restaurants()) == [2]
+    manager.close()
+    assert ids(SQLiteRestaurantManager(filename, import_from=None).get_all_restaurants()) == [2]
+
+
+def test_refresh_reports_other_connections(tmp_path):
+    filename = str(tmp_path / 'r.db')
+    manager = SQLiteRestaurantManager(filename, import_from=None)
+    other = SQLiteRestaurantManager(filename, import_from=None)
+    assert not manager.refresh()
+    other.add_restaurant('A', 'Bar')
+    assert manager.refresh()
+    assert not manager.refresh()
+
+
+def test_recent_ranking_is_not_supported(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteRestaurantManager(str(tmp_path / 'r.db'), import_from=None).get_top_rated(recent=True)
+
+
+def test_create_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(create_manager(), RestaurantManager)
+    assert isinstance(create_manager('SQLite'), SQLiteRestaurantManager)
+    monkeypatch.setenv('SABOR_EXPRESS_BACKEND', 'sqlite')
+    assert isinstance(create_manager(), SQLiteRestaurantManager)
+    with pytest.raises(ValueError):
+        create_manager('xml')
+    assert backend_from_args(['--backend', 'sqlite']) == 'sqlite'
+    assert backend_from_args(['--backend=json']) == 'json'
+    assert backend_from_args([]) is None
@@ -0,0 +1,65 @@
+import io
+import json
+import os
+
+import pytest
+
+from restaurant_manager import RestaurantManager
+from restaurant_stream import iter_restaurants, read_header, write_restaurants
+
+RECORDS = [{'id': i, 'nome': name, 'categoria': 'Lanches', 'avaliacao': rating, 'num_avaliacoes': 12345,
+            'extra': {'tags': ['pão', 'ç'], 'vazio': []}}
+           for i, (name, rating) in enumerate([('Açaí da Praia', 4.125), ('Pão de Queijo 🧀', 3),
+                                               ('Straße "Bar" \\ Zé', 1e-7), ('', 5.0)], 1)]
+
+
+def read_all(data, chunk_size, progress=None):
+    header = {}
+    records = list(iter_restaurants(io.BytesIO(data), header, progress, len(data), chunk_size))
+    return records, header
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 16])
+def test_small_chunks_read_the_same_records(chunk_size, pretty):
+    file = io.BytesIO()
+    write_restaurants(file, RECORDS, {'version': '1.0', 'next_id': 9}, pretty)
+    data = file.getvalue()
+
+    calls = []
+    records, header = read_all(data, chunk_size, lambda read, total: calls.append((read, total)))
+    assert records == RECORDS == json.loads(data)['restaurants']
+    assert header['next_id'] == 9
+    assert calls[-1] == (len(data), len(data))
+    assert [read for read, _ in calls] == sorted(read for read, _ in calls)
+    assert read_header(io.BytesIO(data))['next_id'] == 9
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 1 << 16])
+def test_legacy_files_without_checksum(chunk_size):
+    # Formato antigo: json.dump indentado, com chaves depois do array
+    data = json.dumps({'restaurants': RECORDS, 'next_id': 5, 'version': '1.0'},
+                      ensure_ascii=False, indent=2).encode('utf-8')
+    assert read_all(data, chunk_size) == (RECORDS, {'next_id': 5, 'version': '1.0'})
+    assert read_all(b'{"restaurants": []}', chunk_size) == ([], {})
+    assert read_all(b' { } ', chunk_size) == ([], {})
+
+
+@pytest.mark.parametrize('chunk_size', [1, 1 << 16])
+def test_corruption_is_detected(chunk_size):
+    file = io.BytesIO()
+    write_restaurants(file, RECORDS, {'next_id': 5})
+    data = file.getvalue()
+    with pytest.raises(ValueError):
+        read_all(data.replace('Praia'.encode(), b'Prata'), chunk_size)
+    with pytest.raises(ValueError):
+        read_all(data[:len(data) // 2], chunk_size)
+
+
+def test_manager_reports_load_progress(catalog):
+    calls = []
+    manager = RestaurantManager(catalog.filename, compact=True,
+                                progress=lambda read, total: calls.append((read, total)))
+    size = os.path.getsize(catalog.filename)
+    assert calls[-1] == (size, size)
+    assert list(map(dict, manager.get_all_restaurants())) == list(map(dict, catalog.get_all_restaurants()))
@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+import restaurant_validation
+from restaurant_manager import RestaurantManager
+from restaurant_validation import _CNPJ_WEIGHTS_1, _CNPJ_WEIGHTS_2, _check_digit, validate_batch
+
+
+def valid_cnpj(rng):
+    digits = [rng.randint(0, 9) for _ in range(12)]
+    digits.append(_check_digit(digits, _CNPJ_WEIGHTS_1))
+    digits.append(_check_digit(digits, _CNPJ_WEIGHTS_2))
+    return ''.join(map(str, digits))
+
+
+def random_cnpj(rng):
+    cnpj = valid_cnpj(rng)
+    kind = rng.randrange(8)
+    if kind == 1:
+        return f'{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}'
+    if kind == 2:
+        position = rng.randrange(14)
+        return cnpj[:position] + str((int(cnpj[position]) + 1) % 10) + cnpj[position + 1:]
+    if kind == 3:
+        return cnpj[:rng.randint(0, 13)]
+    if kind == 4:
+        return str(rng.randint(0, 9)) * 14
+    if kind == 5:
+        # Dígitos arábico-índicos também casam com \d
+        return ''.join(chr(0x660 + int(digit)) for digit in cnpj)
+    if kind == 6:
+        return rng.choice(['', ' ', 'abc', cnpj + '0'])
+    return cnpj
+
+
+def random_email(rng):
+    email = f"{random_text(rng, 'ab.%+-_1')}@{random_text(rng, 'xy-.')}.{random_text(rng, 'comb')}"
+    position = rng.randrange(len(email))
+    return rng.choice([email, email[:position] + email[position + 1:], email.upper(), ''])
+
+
+def random_text(rng, alphabet):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+
+
+@pytest.fixture
+def columns():
+    rng = random.Random(11)
+    count = 3000
+    return {
+        'names': [rng.choice(['', '  ', 'Bar', random_text(rng, 'ab ')]) for _ in range(count)],
+        'categories': [rng.choice(['', '\t', 'Pizzaria']) for _ in range(count)],
+        'phones': [random_text(rng, '0123456789()- +x') for _ in range(count)],
+        'emails': [random_email(rng) for _ in range(count)],
+        'cnpjs': [random_cnpj(rng) for _ in range(count)],
+    }
+
+
+def expected_errors(path, columns):
+    manager = RestaurantManager(path)
+    return [manager.validate_restaurant_data(*row)[1]
+            for row in zip(columns['names'], columns['categories'], columns['phones'],
+                           columns['emails'], columns['cnpjs'])]
+
+
+def test_batch_matches_scalar_validators(path, columns):
+    expected = expected_errors(path, columns)
+    assert any(expected) and not all(expected)
+    assert validate_batch(**columns, workers=1) == expected
+
+
+def test_batch_without_numpy_matches(path, columns, monkeypatch):
+    monkeypatch.setattr(restaurant_validation, 'numpy', None)
+    assert validate_batch(**columns, workers=1) == expected_errors(path, columns)
+
+
+def test_parallel_batch_matches(path, columns, monkeypatch):
+    monkeypatch.setattr(restaurant_validation, 'PARALLEL_MIN_ROWS', 100)
+    assert validate_batch(**columns, workers=2) == expected_errors(path, columns)
+
+
+def test_omitted_columns_are_not_checked():
+    assert validate_batch() == []
+    assert validate_batch(cnpjs=['123', '']) == [['CNPJ inválido'], []]
+    with pytest.raises(ValueError):
+        validate_batch(names=['A'], cnpjs=[])